@@ -7,10 +7,14 @@ from .client import Client
 from .list import *
 from .get import *
 import os
+import json
+from dataclasses import asdict
 from flask import Flask
 from .dashboard_metadata import dashboard_app
 import validators
 import urllib.request
+from .format import format_rows
+from .local_cache_warmer import WARM_ORDER
 
 resource_types = [
     "feature",
@@ -221,6 +225,183 @@ def search(query, host, cert, insecure, local):
             format_rows(r["name"], r["variant"], r["resource_type"])
 
 
+@cli.group()
+def cache():
+    """
+    Inspect and prune the local mode cache.
+    """
+
+
+@cache.command()
+@click.option(
+    "--resources",
+    "by_resource",
+    is_flag=True,
+    help="Also report the metrics of every resource, most expensive to compute first",
+)
+@click.option(
+    "--json",
+    "as_json",
+    is_flag=True,
+    help="Print the metrics of every resource as JSON lines instead",
+)
+def stats(by_resource, as_json):
+    """
+    Shows the size and hit rate of the local mode cache by resource type.
+    """
+    from rich.console import Console
+    from rich.table import Table
+
+    from .local_cache import LocalCache
+    from .local_cache_index import format_size
+    from .sqlite_metadata import SQLiteMetadata
+
+    local_cache = LocalCache(SQLiteMetadata())
+    entries = local_cache.entries()
+    metrics = local_cache.metrics()
+    if as_json:
+        for resource_metrics in metrics:
+            click.echo(json.dumps(asdict(resource_metrics)))
+        return
+
+    totals = {}
+    for entry in entries:
+        count, size_bytes = totals.get(entry.resource_type, (0, 0))
+        totals[entry.resource_type] = (count + 1, size_bytes + entry.size_bytes)
+    activity = {}
+    for resource_metrics in metrics:
+        hits, misses = activity.get(resource_metrics.resource_type, (0, 0))
+        activity[resource_metrics.resource_type] = (
+            hits + resource_metrics.hits,
+            misses + resource_metrics.misses,
+        )
+
+    format_rows("TYPE", "ENTRIES", "SIZE", "HITS", "MISSES")
+    for resource_type in sorted(set(totals) | set(activity)):
+        count, size_bytes = totals.get(resource_type, (0, 0))
+        hits, misses = activity.get(resource_type, (0, 0))
+        format_rows(
+            resource_type,
+            str(count),
+            format_size(size_bytes),
+            str(hits),
+            str(misses),
+        )
+    total_bytes = sum(entry.size_bytes for entry in entries)
+    budget = (
+        format_size(local_cache.max_bytes)
+        if local_cache.max_bytes is not None
+        else "unlimited"
+    )
+    click.echo(f"\nTotal: {len(entries)} entries, {format_size(total_bytes)}")
+    click.echo(f"Budget: {budget} ({local_cache.eviction_policy} eviction)")
+
+    if by_resource:
+        table = Table(show_header=True, header_style="bold", box=None)
+        for column in ["Resource", "Hits", "Misses", "Invalidations"]:
+            table.add_column(column)
+        for column in ["Compute", "Load", "Size"]:
+            table.add_column(column, justify="right")
+        for m in sorted(metrics, key=lambda m: m.compute_seconds, reverse=True):
+            table.add_row(
+                f"{m.resource_type} {m.name} ({m.variant})",
+                str(m.hits),
+                str(m.misses),
+                str(m.invalidations),
+                f"{m.compute_seconds:.2f}s",
+                f"{m.load_seconds:.2f}s",
+                format_size(m.size_bytes),
+            )
+        click.echo()
+        Console().print(table)
+
+
+@cache.command()
+@click.option(
+    "--max-bytes",
+    "max_bytes",
+    help="Size to shrink the cache to, e.g. 10GB. Defaults to FEATUREFORM_CACHE_MAX_BYTES",
+)
+@click.option("--all", "prune_all", is_flag=True, help="Removes every cache entry")
+def prune(max_bytes, prune_all):
+    """
+    Evicts local mode cache entries until the cache fits its budget.
+    """
+    from .local_cache import LocalCache
+    from .local_cache_index import format_size, parse_size
+    from .sqlite_metadata import SQLiteMetadata
+
+    db = SQLiteMetadata()
+    local_cache = LocalCache(db)
+    if prune_all:
+        budget = 0
+    elif max_bytes is not None:
+        budget = parse_size(max_bytes)
+    else:
+        budget = local_cache.max_bytes
+    evicted = local_cache.evict(budget) if budget is not None else []
+    records = db.prune_file_records()
+    freed = sum(entry.size_bytes for entry in evicted)
+    click.echo(
+        f"Removed {len(evicted)} cache entries ({format_size(freed)}) and {records} stale file records"
+    )
+
+
+@cache.command()
+@click.option(
+    "--workers",
+    type=int,
+    required=False,
+    help="Number of resources computed at once. Defaults to FEATUREFORM_LOCAL_WORKERS",
+)
+@click.option(
+    "--type",
+    "resource_types",
+    multiple=True,
+    type=click.Choice(WARM_ORDER),
+    help="Only warm resources of this type. Can be repeated",
+)
+def warm(workers, resource_types):
+    """
+    Precomputes the local mode cache for every registered resource.
+    """
+    from rich.progress import Progress
+
+    from .local_cache_warmer import CacheWarmer
+    from .local_remote_cache import flush_uploads
+    from .serving import LocalClientImpl
+
+    warmer = CacheWarmer(LocalClientImpl(), workers)
+    resources = warmer.resources(resource_types or WARM_ORDER)
+    with Progress() as progress:
+        task = progress.add_task("Warming cache", total=len(resources))
+        results = warmer.warm(
+            resources, on_result=lambda result: progress.advance(task)
+        )
+    # Entries computed here are meant for other machines, so finish sharing them
+    flush_uploads()
+
+    format_rows("TYPE", "NAME", "VARIANT", "TIME", "STATUS")
+    for result in results:
+        if result.error is not None:
+            status = f"failed: {result.error}"
+        else:
+            status = "cached" if result.cached else "computed"
+        format_rows(
+            result.resource_type,
+            result.name,
+            result.variant,
+            f"{result.seconds:.2f}s",
+            status,
+        )
+    failed = [result for result in results if result.error is not None]
+    click.echo(
+        f"\nWarmed {len(results) - len(failed)} of {len(results)} resources in {sum(r.seconds for r in results):.2f}s of compute"
+    )
+    if failed:
+        raise click.ClickException(f"{len(failed)} resources failed to warm")
+
+
 def read_file(file):
     with open(file, "r") as py:
         exec_file(py, file)
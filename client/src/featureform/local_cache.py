@@ -1,23 +1,141 @@
+import hashlib
 import json
 import os
-from functools import lru_cache
-from typing import Callable, Set
+import time
+import types
+import warnings
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
 
-import pandas as pd
+import dill
 from featureform import SQLiteMetadata  # fix to do client.source.import
+from featureform.local_cache_index import (
+    LOCK_EXTENSION,
+    CacheEntry,
+    CacheIndex,
+    CacheMetrics,
+    cache_dir_from_env,
+    eviction_order,
+    max_bytes_from_env,
+    parse_size,
+)
+from featureform.local_cache_storage import (
+    ARROW_FORMAT,
+    EXTENSIONS,
+    cache_compression,
+    existing_entry,
+    read_entry,
+    write_entry,
+)
+from featureform.local_file_lock import FileLock
+from featureform.local_ingest_cache import ingest_dir_from_env
+from featureform.local_memory_cache import MemoryLRU
+from featureform.local_remote_cache import (
+    remote_cache_from_env,
+    upload_enabled,
+    upload_in_background,
+)
+from featureform.local_sql import provider_sql_engine
 from featureform.local_utils import get_sql_transformation_sources
 from featureform.resources import SourceType  # fix to do client.source.import
 from pandas.core.generic import NDFrame
 from typeguard import typechecked
 
+# Bytes read at a time when hashing a source file
+HASH_BLOCK_SIZE = 1 << 20
+
+# Size the cache directory is evicted down to after each write, e.g. 20GB
+CACHE_MAX_BYTES_ENV = "FEATUREFORM_CACHE_MAX_BYTES"
+# lru, or cost to evict what is cheapest to recompute per byte first
+CACHE_EVICTION_ENV = "FEATUREFORM_CACHE_EVICTION"
+# Size of the in-process tier of recently used frames; 0 turns it off
+MEMORY_CACHE_MAX_BYTES_ENV = "FEATUREFORM_MEMORY_CACHE_MAX_BYTES"
+DEFAULT_MEMORY_CACHE_MAX_BYTES = "512MB"
+# File every hit and miss is appended to as a JSON line
+CACHE_METRICS_LOG_ENV = "FEATUREFORM_CACHE_METRICS_LOG"
+
+
+def hash_key(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+
+
+def code_fingerprint(code: types.CodeType) -> str:
+    """
+    Hashes what a function's code does, leaving out the file and line it was defined at.
+    """
+    return hash_key(
+        code.co_code.hex(),
+        [canonical_const(const) for const in code.co_consts],
+        code.co_names,
+        code.co_varnames,
+        code.co_freevars,
+        code.co_cellvars,
+        code.co_argcount,
+        code.co_kwonlyargcount,
+        code.co_flags,
+    )
+
+
+def canonical_const(const) -> str:
+    """
+    Returns a representation of a code constant that is the same in every process. Set literals
+    compile to frozensets, whose repr follows the per-process string hash seed, so their members
+    are sorted.
+    """
+    if isinstance(const, types.CodeType):
+        return code_fingerprint(const)
+    if isinstance(const, tuple):
+        members = [canonical_const(c) for c in const]
+        return f"({', '.join(members)}{',' if len(members) == 1 else ''})"
+    if isinstance(const, (frozenset, set)):
+        members = sorted(canonical_const(c) for c in const)
+        return f"{type(const).__name__}({{{', '.join(members)}}})"
+    return repr(const)
+
+
+def file_version(file_path: str):
+    """
+    Returns the modification time of a cache file, or None if it doesn't exist.
+    """
+    try:
+        return os.stat(file_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def is_arrow_entry(file_path: str) -> bool:
+    return file_path.endswith(EXTENSIONS[ARROW_FORMAT])
+
 
 class LocalCache:
+    """
+    Caches local resources in files keyed by a hash of their definitions and the contents of the
+    files they read, with a memory tier in front and an optional shared remote tier behind.
+    Settings are listed under "Local Cache" in docs/deployment/local-mode.md.
+    """
+
     def __init__(self, db: SQLiteMetadata):
         self.db = db
-        feature_form_dir = os.environ.get("FEATUREFORM_DIR", ".featureform")
-        self.cache_dir = os.environ.get(
-            "FEATUREFORM_CACHE_DIR", os.path.join(feature_form_dir, "cache")
+        self.cache_dir = cache_dir_from_env()
+        self.ingest_dir = ingest_dir_from_env()
+        self.compression = cache_compression()
+        self.max_bytes = max_bytes_from_env(CACHE_MAX_BYTES_ENV)
+        self.eviction_policy = os.environ.get(CACHE_EVICTION_ENV, "lru")
+        self._index = None
+        self.memory = MemoryLRU(
+            parse_size(
+                os.environ.get(
+                    MEMORY_CACHE_MAX_BYTES_ENV, DEFAULT_MEMORY_CACHE_MAX_BYTES
+                )
+            )
         )
+        self.remote = remote_cache_from_env()
+        self.upload = upload_enabled()
+        self.metrics_log = os.environ.get(CACHE_METRICS_LOG_ENV)
+        self._log_lock = Lock()
+        self._fingerprints: Dict[Tuple[str, int, int], str] = {}
+        self._definitions = {}
+        self._fingerprint_lock = Lock()
 
     @typechecked
     def get_or_put(
@@ -25,41 +143,172 @@ class LocalCache:
         resource_type: str,
         resource_name: str,
         resource_variant: str,
-        source_name: str,
-        source_variant: str,
         func: Callable[[], NDFrame],
     ) -> NDFrame:
         """
-        Caches the result of a callable to a local file. If the source files have changed, the cache is invalidated.
+        Returns the cached frame of a resource, computing and caching it with func on a miss.
+
+        Only one process computes a missing entry at a time: the others wait on a lock file next
+        to the entry and then read what it wrote.
         """
-        cache_file_path = self._cache_file_path(
-            resource_type, resource_name, resource_variant
+        resource = (resource_type, resource_name, resource_variant)
+        file_path = self.cache_file_path(*resource)
+        df = self._load(file_path, resource)
+        if df is not None:
+            return df
+        base_path = os.path.splitext(file_path)[0]
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with FileLock(base_path + LOCK_EXTENSION):
+            # Another process may have written the entry while this one waited
+            df = self._load(existing_entry(base_path) or file_path, resource)
+            if df is None:
+                df = self._load_remote(base_path, resource)
+            if df is not None:
+                return df
+            start = time.perf_counter()
+            df = func()
+            compute_seconds = time.perf_counter() - start
+            file_path = write_entry(file_path, df, self.compression)
+            invalidated = self.index.record(file_path, *resource, compute_seconds)
+            self.memory.put(file_path, df, file_version(file_path))
+        if self.remote is not None and self.upload and is_arrow_entry(file_path):
+            upload_in_background(self.remote, file_path, os.path.basename(file_path))
+        self._log_event(
+            "miss",
+            resource,
+            file_path,
+            compute_seconds,
+            invalidated=invalidated,
+            size_bytes=os.path.getsize(file_path),
         )
+        if self.max_bytes is not None:
+            self.evict(self.max_bytes, keep={file_path})
+        return df
 
-        # check db for source files
-        source_files_from_db = self.db.get_source_files_for_resource(
-            resource_type, resource_name, resource_variant
-        )
-        if source_files_from_db:
-            self._invalidate_cache_if_source_files_changed(
-                source_files_from_db, cache_file_path
-            )
+    def _load(
+        self,
+        file_path: str,
+        resource: Tuple[str, str, str],
+        start: float = None,
+        tier: str = None,
+    ) -> Optional[NDFrame]:
+        """
+        Returns the frame of a cache entry, or None if there is no entry at file_path, and
+        records the hit.
+        """
+        start = start or time.perf_counter()
+        version = file_version(file_path)
+        if version is None:
+            return None
+        df = self.memory.get(file_path, version)
+        if df is not None:
+            tier = tier or "memory"
+        else:
+            tier = tier or "disk"
+            try:
+                df = read_entry(file_path)
+            except FileNotFoundError:
+                # Evicted by another process since the stat
+                return None
+            self.memory.put(file_path, df, version)
+        load_seconds = time.perf_counter() - start
+        self.index.hit(file_path, *resource, load_seconds)
+        self._log_event("hit", resource, file_path, load_seconds, tier=tier)
+        return df
 
-        # get source files from db or compute the sources
-        source_files: Set[str] = (
-            set(map(lambda x: x["file_path"], source_files_from_db))
-            if source_files_from_db
-            else self.get_source_files_for_source(source_name, source_variant)
-        )
+    def _load_remote(
+        self, base_path: str, resource: Tuple[str, str, str]
+    ) -> Optional[NDFrame]:
+        """
+        Downloads a resource's Arrow entry from the remote cache into the local one and returns
+        its frame, or None if the remote cache doesn't have it or can't be reached. Pickled
+        entries are never downloaded, since unpickling a file from a shared store would run any
+        code it holds.
+        """
+        if self.remote is None:
+            return None
+        start = time.perf_counter()
+        file_path = base_path + EXTENSIONS[ARROW_FORMAT]
+        try:
+            found = self.remote.download(os.path.basename(file_path), file_path)
+        except Exception as e:
+            warnings.warn(f"Could not read the remote cache: {e}")
+            return None
+        if not found:
+            return None
+        self.index.add(file_path, *resource)
+        df = self._load(file_path, resource, start, tier="remote")
+        if self.max_bytes is not None:
+            self.evict(self.max_bytes, keep={file_path})
+        return df
 
-        return self._get_or_put(
-            resource_type,
-            resource_name,
-            resource_variant,
-            cache_file_path,
-            source_files,
-            func,
-        )
+    def _log_event(self, event, resource, file_path, seconds, **fields):
+        if not self.metrics_log:
+            return
+        resource_type, name, variant = resource
+        record = {
+            "time": time.time(),
+            "event": event,
+            "resource_type": resource_type,
+            "name": name,
+            "variant": variant,
+            "key": os.path.basename(file_path),
+            "seconds": seconds,
+            **fields,
+        }
+        with self._log_lock, open(self.metrics_log, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def metrics(self) -> List[CacheMetrics]:
+        """
+        Returns the hits, misses, invalidations, compute and load time and size on disk of every
+        resource read through the cache, from this and earlier processes.
+        """
+        if not os.path.exists(self.cache_dir):
+            return []
+        return self.index.metrics()
+
+    def reset_metrics(self):
+        if os.path.exists(self.cache_dir):
+            self.index.clear_metrics()
+
+    @property
+    def index(self) -> CacheIndex:
+        if self._index is None:
+            self._index = CacheIndex(self.cache_dir, self.ingest_dir)
+        return self._index
+
+    def entries(self) -> List[CacheEntry]:
+        """
+        Returns a record of every cache entry on disk.
+        """
+        if not os.path.exists(self.cache_dir):
+            return []
+        self.index.sync()
+        return self.index.entries()
+
+    def evict(self, max_bytes: int, keep=()) -> List[CacheEntry]:
+        """
+        Removes entries until the cache takes at most max_bytes and returns the removed entries.
+        Entries in keep are never removed.
+        """
+        entries = self.entries()
+        total_bytes = sum(entry.size_bytes for entry in entries)
+        evicted = []
+        for entry in eviction_order(entries, self.eviction_policy):
+            if total_bytes <= max_bytes:
+                break
+            if entry.file_path in keep:
+                continue
+            # The entry's lock file stays, since other processes may be waiting on it; removing
+            # it would let a new process lock a fresh file while they hold the old one
+            if os.path.exists(entry.file_path):
+                os.remove(entry.file_path)
+            self.index.remove(entry.file_path)
+            self.memory.discard(entry.file_path)
+            total_bytes -= entry.size_bytes
+            evicted.append(entry)
+        return evicted
 
     @typechecked
     def get_or_put_training_set(
@@ -68,143 +317,159 @@ class LocalCache:
         training_set_variant: str,
         func: Callable[[], NDFrame],
     ) -> NDFrame:
-        """
-        Caches the result of a training set to a local file. Difference between this one and the one above
-        is how this needs to fetch all the source files for the training set.
-        """
-        resource_type = "training_set"
-
-        file_path = self._cache_file_path(
-            resource_type, training_set_name, training_set_variant
+        return self.get_or_put(
+            "training_set", training_set_name, training_set_variant, func
         )
 
-        # check db for source files
-        source_files_from_db = self.db.get_source_files_for_resource(
-            resource_type, training_set_name, training_set_variant
+    def is_cached(
+        self, resource_type: str, resource_name: str, resource_variant: str
+    ) -> bool:
+        """
+        Returns True if the resource has a cache entry for its current definition and inputs.
+        """
+        return os.path.exists(
+            self.cache_file_path(resource_type, resource_name, resource_variant)
         )
 
-        # Only check to invalidate the cache if we have source files in the db
-        if source_files_from_db:
-            self._invalidate_cache_if_source_files_changed(
-                source_files_from_db, file_path
-            )
+    def cache_file_path(self, resource_type: str, name: str, variant: str) -> str:
+        """
+        Returns the path of the resource's cache entry, or where an Arrow entry would be written.
+        """
+        key = self.resource_key(resource_type, name, variant)
+        base_path = os.path.join(self.cache_dir, f"{resource_type}__{key}")
+        return existing_entry(base_path) or base_path + EXTENSIONS[ARROW_FORMAT]
 
-        source_files = set()
-        if source_files_from_db:
-            source_files.update(
-                set(map(lambda x: x["file_path"], source_files_from_db))
+    def resource_key(self, resource_type: str, name: str, variant: str) -> str:
+        if resource_type in ("transformation", "source"):
+            return self.source_key(name, variant)
+        if resource_type == "feature":
+            feature = self.db.get_feature_variant(name, variant)
+            # The value column is renamed after the feature, so the name is part of the output
+            return hash_key(
+                "feature",
+                name,
+                variant,
+                self._mapping(feature),
+                self.source_key(feature["source_name"], feature["source_variant"]),
             )
-        else:
-            ts_variant = self.db.get_training_set_variant(
-                training_set_name, training_set_variant
-            )
-            label_variant = self.db.get_label_variant(
-                ts_variant["label_name"], ts_variant["label_variant"]
-            )
-            source_files.update(
-                self.get_source_files_for_source(
-                    label_variant["source_name"], label_variant["source_variant"]
-                )
+        if resource_type == "label":
+            label = self.db.get_label_variant(name, variant)
+            return hash_key(
+                "label",
+                self._mapping(label),
+                self.source_key(label["source_name"], label["source_variant"]),
             )
+        if resource_type == "training_set":
+            return self._training_set_key(name, variant)
+        raise ValueError(f"Unknown resource type: {resource_type}")
+
+    def source_key(self, source_name: str, source_variant: str) -> str:
+        source = self.db.get_source_variant(source_name, source_variant)
+        transform_type = self.db.is_transformation(source_name, source_variant)
+
+        if transform_type == SourceType.PRIMARY_SOURCE.value:
+            return hash_key("primary", self.file_fingerprint(source["definition"]))
 
-            features = self.db.get_training_set_features(
-                training_set_name, training_set_variant
+        # Parsing a definition means unpickling DF transformations, so it is done once per
+        # version of the definition rather than on every lookup
+        memo_key = (source_name, source_variant)
+        memo = self._definitions.get(memo_key)
+        version = (transform_type, source["definition"], source["inputs"])
+        if memo is None or memo[0] != version:
+            memo = (
+                version,
+                self._parse_definition(source, transform_type),
             )
-            for feature in features:
-                feature_variant = self.db.get_feature_variant(
-                    feature["feature_name"], feature["feature_variant"]
-                )
-                source_files.update(
-                    self.get_source_files_for_source(
-                        feature_variant["source_name"],
-                        feature_variant["source_variant"],
-                    )
-                )
+            self._definitions[memo_key] = memo
+        definition, inputs = memo[1]
 
-        return self._get_or_put(
-            resource_type,
-            training_set_name,
-            training_set_variant,
-            file_path,
-            source_files,
-            func,
+        # Engines disagree on some results, such as integer division
+        engine = (
+            provider_sql_engine(self.db, source["provider"])
+            if transform_type == SourceType.SQL_TRANSFORMATION.value
+            else None
+        )
+        return hash_key(
+            transform_type,
+            definition,
+            engine,
+            [self.source_key(name, variant) for name, variant in inputs],
         )
 
-    def _get_or_put(
-        self,
-        resource_type,
-        resource_name,
-        resource_variant,
-        file_path,
-        source_files,
-        func,
-    ) -> NDFrame:
-        if os.path.exists(file_path):
-            return pd.read_pickle(file_path)
-        else:
-            # create the dir if not exists and write the file
-            df = func()
-            os.makedirs(self.cache_dir, exist_ok=True)
-            df.to_pickle(file_path)
-            for source_file in source_files:
-                self.db.insert_or_update(
-                    "resource_source_files",
-                    ["resource_type", "name", "variant", "file_path"],
-                    ["updated_at"],
-                    resource_type,
-                    resource_name,
-                    resource_variant,
-                    source_file,
-                    str(os.path.getmtime(source_file)),
-                )
-            return df
+    @staticmethod
+    def _parse_definition(source, transform_type):
+        if transform_type == SourceType.SQL_TRANSFORMATION.value:
+            query = source["definition"]
+            return query, get_sql_transformation_sources(query)
+        elif transform_type == SourceType.DF_TRANSFORMATION.value:
+            code = dill.loads(bytearray(source["definition"]))
+            return code_fingerprint(code), json.loads(source["inputs"])
+        raise Exception(f"Unknown source type: {transform_type}")
 
-    @lru_cache(maxsize=128)
-    def get_source_files_for_source(self, source_name, source_variant) -> Set[str]:
+    def file_fingerprint(self, file_path: str) -> str:
         """
-        Recursively gets the source files for a given source. Each call is cached.
+        Returns the size and a hash of the contents of a file. The hash is only recomputed when
+        the file's size or modification time changes.
         """
-        source = self.db.get_source_variant(source_name, source_variant)
-        transform_type = self.db.is_transformation(source_name, source_variant)
-
-        sources = set()
-        if transform_type == SourceType.PRIMARY_SOURCE.value:
-            return {source["definition"]}
-        elif transform_type == SourceType.SQL_TRANSFORMATION.value:
-            query = source["definition"]
-            transformation_sources = get_sql_transformation_sources(query)
-            for source_name, source_variant in transformation_sources:
-                sources.update(
-                    self.get_source_files_for_source(source_name, source_variant)
+        stat = os.stat(file_path)
+        memo_key = (file_path, stat.st_size, stat.st_mtime_ns)
+        fingerprint = self._fingerprints.get(memo_key)
+        if fingerprint is not None:
+            return fingerprint
+        with self._fingerprint_lock:
+            fingerprint = self.db.get_file_fingerprint(*memo_key)
+            if fingerprint is None:
+                digest = hashlib.blake2b(digest_size=16)
+                with open(file_path, "rb") as f:
+                    for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                        digest.update(block)
+                fingerprint = f"{stat.st_size}:{digest.hexdigest()}"
+                self.db.insert_or_update(
+                    "file_fingerprints",
+                    ["file_path"],
+                    ["size", "modified_at", "fingerprint"],
+                    file_path,
+                    str(stat.st_size),
+                    str(stat.st_mtime_ns),
+                    fingerprint,
                 )
-        elif transform_type == SourceType.DF_TRANSFORMATION.value:
-            dependencies = json.loads(source["inputs"])
-            for name, variant in dependencies:
-                sources.update(self.get_source_files_for_source(name, variant))
-        else:
-            raise Exception(f"Unknown source type: {transform_type}")
-
-        return sources
-
-    def _invalidate_cache_if_source_files_changed(
-        self, source_files_from_db, cache_file_path
-    ):
-        if any(
-            self._file_has_changed(source_file["updated_at"], source_file["file_path"])
-            for source_file in source_files_from_db
-        ):
-            if os.path.exists(cache_file_path):
-                os.remove(cache_file_path)
+            self._fingerprints[memo_key] = fingerprint
+        return fingerprint
 
-    def _cache_file_path(self, resource_type: str, name: str, variant: str):
-        key = f"{resource_type}__{name}__{variant}"
-        return f"{self.cache_dir}/{key}.pkl"
+    def _training_set_key(self, name, variant):
+        ts_variant = self.db.get_training_set_variant(name, variant)
+        features = [
+            (
+                feature["feature_name"],
+                feature["feature_variant"],
+                self.resource_key(
+                    "feature", feature["feature_name"], feature["feature_variant"]
+                ),
+            )
+            for feature in self.db.get_training_set_features(name, variant)
+        ]
+        lag_features = [
+            (
+                lag_feature["feature_name"],
+                lag_feature["feature_variant"],
+                lag_feature["feature_new_name"],
+                lag_feature["feature_lag"],
+            )
+            for lag_feature in self.db.get_training_set_lag_features(name, variant)
+        ]
+        return hash_key(
+            "training_set",
+            self.resource_key(
+                "label", ts_variant["label_name"], ts_variant["label_variant"]
+            ),
+            features,
+            lag_features,
+        )
 
     @staticmethod
-    def _file_has_changed(last_updated_at, file_path):
-        """
-        Currently using last updated at for determining if a file has changed. We can consider using the file hash
-        if this becomes a performance issue.
-        """
-        os_last_updated = os.path.getmtime(file_path)
-        return os_last_updated > float(last_updated_at)
+    def _mapping(resource):
+        return [
+            resource["source_entity"],
+            resource["source_value"],
+            resource["source_timestamp"],
+        ]
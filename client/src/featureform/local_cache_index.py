@@ -0,0 +1,378 @@
+import atexit
+import os
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from featureform.sqlite_metadata import SyncSQLExecutor
+
+INDEX_FILE = "cache_index.db"
+LOCK_EXTENSION = ".lock"
+INGEST_RESOURCE_TYPE = "ingest"
+# Hits are kept in memory and written at most this often, and when the process exits
+HIT_FLUSH_INTERVAL_SECONDS = 5.0
+
+SIZE_UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+
+def parse_size(size: str) -> int:
+    """
+    Parses a byte count such as 1048576, 512MB or 10G.
+    """
+    match = re.fullmatch(
+        r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*", str(size).upper()
+    )
+    if match is None:
+        raise ValueError(f"Invalid size: {size}. Expected a byte count such as 512MB")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+def format_size(num_bytes: int) -> str:
+    for unit in ["B", "KB", "MB", "GB"]:
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unit}" if unit != "B" else f"{num_bytes} B"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} TB"
+
+
+@dataclass
+class CacheEntry:
+    file_path: str
+    resource_type: str
+    name: str
+    variant: str
+    size_bytes: int
+    compute_seconds: float
+    created_at: float
+    last_accessed_at: float
+    hits: int
+
+
+@dataclass
+class CacheMetrics:
+    """
+    Cache activity of one resource. file_path is the entry for the resource's current key and
+    size_bytes is 0 once that entry has been evicted. A miss that replaces an entry the resource
+    had under an earlier key, because its definition or inputs changed, is an invalidation.
+    """
+
+    resource_type: str
+    name: str
+    variant: str
+    file_path: str
+    hits: int
+    misses: int
+    invalidations: int
+    compute_seconds: float
+    load_seconds: float
+    size_bytes: int
+
+
+class CacheIndex:
+    """
+    Records the size, recompute cost and last access time of every LocalCache entry in a SQLite
+    file next to the entries, along with hit and miss metrics for every resource. It is kept
+    apart from the metadata database so recording a cache hit doesn't invalidate metadata
+    snapshots.
+
+    Parquet copies in ingest_dir are recorded as entries of the "ingest" type, so they count
+    towards the byte budget and can be evicted like any other entry.
+
+    Hits are counted in memory and written in one transaction every HIT_FLUSH_INTERVAL_SECONDS,
+    before the entries or metrics are read, and at exit, so a hit costs no database write.
+    Other processes see them once they are flushed.
+    """
+
+    def __init__(self, cache_dir: str, ingest_dir: str = None):
+        self.cache_dir = cache_dir
+        self.ingest_dir = ingest_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        raw_conn = sqlite3.connect(
+            os.path.join(cache_dir, INDEX_FILE), timeout=30, check_same_thread=False
+        )
+        raw_conn.row_factory = sqlite3.Row
+        self._conn = SyncSQLExecutor(raw_conn)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS cache_entries(
+            file_path text PRIMARY KEY NOT NULL,
+            resource_type text,
+            name text,
+            variant text,
+            size_bytes integer NOT NULL,
+            compute_seconds real NOT NULL,
+            created_at real NOT NULL,
+            last_accessed_at real NOT NULL,
+            hits integer NOT NULL)"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS cache_metrics(
+            resource_type text NOT NULL,
+            name text NOT NULL,
+            variant text NOT NULL,
+            file_path text NOT NULL,
+            hits integer NOT NULL DEFAULT 0,
+            misses integer NOT NULL DEFAULT 0,
+            invalidations integer NOT NULL DEFAULT 0,
+            compute_seconds real NOT NULL DEFAULT 0,
+            load_seconds real NOT NULL DEFAULT 0,
+            PRIMARY KEY(resource_type, name, variant))"""
+        )
+        self._conn.commit()
+        self._pending_lock = threading.Lock()
+        # file_path -> (last_accessed_at, hits)
+        self._pending_entries: Dict[str, Tuple[float, int]] = {}
+        # (resource_type, name, variant) -> [file_path, hits, load_seconds]
+        self._pending_metrics: Dict[Tuple[str, str, str], list] = {}
+        self._flushed_at = time.monotonic()
+        _indexes.add(self)
+
+    def record(
+        self,
+        file_path: str,
+        resource_type: str,
+        name: str,
+        variant: str,
+        compute_seconds: float,
+    ) -> bool:
+        """
+        Records a newly written entry and a miss for the resource that computed it. Returns True
+        if the miss invalidated an entry the resource had under a different key.
+        """
+        # Pending hits would otherwise point the metrics back at the previous entry
+        self.flush()
+        previous = self._conn.execute_stmt(
+            "SELECT file_path FROM cache_metrics WHERE resource_type = ? AND name = ? AND variant = ?",
+            (resource_type, name, variant),
+        ).fetchone()
+        invalidated = previous is not None and previous["file_path"] != file_path
+        self._insert_entry(file_path, resource_type, name, variant, compute_seconds)
+        self._conn.execute_stmt(
+            """INSERT INTO cache_metrics
+            (resource_type, name, variant, file_path, misses, invalidations, compute_seconds)
+            VALUES (?, ?, ?, ?, 1, ?, ?)
+            ON CONFLICT(resource_type, name, variant) DO UPDATE SET
+            file_path = excluded.file_path,
+            misses = misses + 1,
+            invalidations = invalidations + excluded.invalidations,
+            compute_seconds = compute_seconds + excluded.compute_seconds""",
+            (
+                resource_type,
+                name,
+                variant,
+                file_path,
+                int(invalidated),
+                compute_seconds,
+            ),
+        )
+        self._conn.commit()
+        return invalidated
+
+    def add(self, file_path: str, resource_type: str, name: str, variant: str):
+        """
+        Records an entry fetched from a remote cache. Its compute time is unknown, so it is
+        recorded as 0, which makes it the first to go under cost eviction.
+        """
+        self._insert_entry(file_path, resource_type, name, variant, 0)
+        self._conn.commit()
+
+    def _insert_entry(self, file_path, resource_type, name, variant, compute_seconds):
+        now = time.time()
+        self._conn.execute_stmt(
+            "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+            (
+                file_path,
+                resource_type,
+                name,
+                variant,
+                os.path.getsize(file_path),
+                compute_seconds,
+                now,
+                now,
+            ),
+        )
+
+    def hit(
+        self,
+        file_path: str,
+        resource_type: str,
+        name: str,
+        variant: str,
+        load_seconds: float,
+    ):
+        """
+        Records a read of an entry by a resource that found it cached.
+        """
+        now = time.time()
+        with self._pending_lock:
+            _, hits = self._pending_entries.get(file_path, (now, 0))
+            self._pending_entries[file_path] = (now, hits + 1)
+            metrics = self._pending_metrics.setdefault(
+                (resource_type, name, variant), [file_path, 0, 0.0]
+            )
+            metrics[0] = file_path
+            metrics[1] += 1
+            metrics[2] += load_seconds
+            due = time.monotonic() - self._flushed_at >= HIT_FLUSH_INTERVAL_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the hits counted since the last flush.
+        """
+        with self._pending_lock:
+            entries, self._pending_entries = self._pending_entries, {}
+            metrics, self._pending_metrics = self._pending_metrics, {}
+            self._flushed_at = time.monotonic()
+        if not entries and not metrics:
+            return
+        self._conn.executemany(
+            """UPDATE cache_entries
+            SET last_accessed_at = MAX(last_accessed_at, ?), hits = hits + ?
+            WHERE file_path = ?""",
+            [
+                (accessed_at, hits, file_path)
+                for file_path, (accessed_at, hits) in entries.items()
+            ],
+        )
+        self._conn.executemany(
+            """INSERT INTO cache_metrics
+            (resource_type, name, variant, file_path, hits, load_seconds)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(resource_type, name, variant) DO UPDATE SET
+            file_path = excluded.file_path,
+            hits = hits + excluded.hits,
+            load_seconds = load_seconds + excluded.load_seconds""",
+            [
+                (*resource, file_path, hits, load_seconds)
+                for resource, (file_path, hits, load_seconds) in metrics.items()
+            ],
+        )
+        self._conn.commit()
+
+    def remove(self, file_path: str):
+        self._conn.execute_stmt(
+            "DELETE FROM cache_entries WHERE file_path = ?", (file_path,)
+        )
+        self._conn.commit()
+
+    def entries(self) -> List[CacheEntry]:
+        self.flush()
+        rows = self._conn.execute("SELECT * FROM cache_entries").fetchall()
+        return [CacheEntry(**dict(row)) for row in rows]
+
+    def metrics(self) -> List[CacheMetrics]:
+        self.flush()
+        rows = self._conn.execute(
+            """SELECT m.*, COALESCE(e.size_bytes, 0) AS size_bytes
+            FROM cache_metrics m
+            LEFT JOIN cache_entries e ON e.file_path = m.file_path
+            ORDER BY m.resource_type, m.name, m.variant"""
+        ).fetchall()
+        return [CacheMetrics(**dict(row)) for row in rows]
+
+    def clear_metrics(self):
+        with self._pending_lock:
+            self._pending_metrics = {}
+        self._conn.execute("DELETE FROM cache_metrics")
+        self._conn.commit()
+
+    def sync(self):
+        """
+        Drops the records of entries that were deleted and records entries written without one,
+        such as those from older versions, using their modification time as the last access.
+        """
+        on_disk = entry_files(self.cache_dir)
+        ingested = set()
+        if self.ingest_dir is not None and os.path.isdir(self.ingest_dir):
+            ingested = entry_files(self.ingest_dir)
+            on_disk |= ingested
+        recorded = set()
+        for entry in self.entries():
+            if entry.file_path in on_disk:
+                recorded.add(entry.file_path)
+            else:
+                self.remove(entry.file_path)
+        for file_path in on_disk - recorded:
+            if file_path in ingested:
+                resource_type = INGEST_RESOURCE_TYPE
+            else:
+                resource_type = os.path.basename(file_path).split("__")[0]
+            modified_at = os.path.getmtime(file_path)
+            self._conn.execute_stmt(
+                "INSERT OR IGNORE INTO cache_entries VALUES (?, ?, '', '', ?, 0, ?, ?, 0)",
+                (
+                    file_path,
+                    resource_type,
+                    os.path.getsize(file_path),
+                    modified_at,
+                    modified_at,
+                ),
+            )
+        self._conn.commit()
+
+    def close(self):
+        self.flush()
+        _indexes.discard(self)
+        self._conn.close()
+
+
+_indexes = weakref.WeakSet()
+
+
+@atexit.register
+def flush_indexes():
+    """
+    Writes the pending hits of every open CacheIndex.
+    """
+    for index in list(_indexes):
+        try:
+            index.flush()
+        except sqlite3.Error:
+            # The cache directory may have been removed while the process ran
+            pass
+
+
+def entry_files(directory: str) -> Set[str]:
+    return {
+        os.path.join(directory, file_name)
+        for file_name in os.listdir(directory)
+        if not file_name.startswith(INDEX_FILE)
+        and not file_name.endswith((".tmp", LOCK_EXTENSION))
+        and os.path.isfile(os.path.join(directory, file_name))
+    }
+
+
+def eviction_order(entries: List[CacheEntry], policy: str) -> List[CacheEntry]:
+    """
+    Orders entries from first to last evicted. "lru" evicts the least recently used entries
+    first; "cost" evicts the entries that are cheapest to recompute per byte first, breaking
+    ties by last access.
+    """
+    if policy == "lru":
+        return sorted(entries, key=lambda e: e.last_accessed_at)
+    if policy == "cost":
+        return sorted(
+            entries,
+            key=lambda e: (
+                e.compute_seconds / max(e.size_bytes, 1),
+                e.last_accessed_at,
+            ),
+        )
+    raise ValueError(f"Unknown eviction policy: {policy}. Expected lru or cost")
+
+
+def max_bytes_from_env(env: str) -> Optional[int]:
+    max_bytes = os.environ.get(env)
+    return parse_size(max_bytes) if max_bytes else None
+
+
+def cache_dir_from_env() -> str:
+    feature_form_dir = os.environ.get("FEATUREFORM_DIR", ".featureform")
+    return os.environ.get(
+        "FEATUREFORM_CACHE_DIR", os.path.join(feature_form_dir, "cache")
+    )
@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pandas.core.generic import NDFrame
+
+CACHE_FORMAT_ENV = "FEATUREFORM_CACHE_FORMAT"
+CACHE_COMPRESSION_ENV = "FEATUREFORM_CACHE_COMPRESSION"
+
+ARROW_FORMAT = "arrow"
+PICKLE_FORMAT = "pickle"
+EXTENSIONS = {ARROW_FORMAT: ".arrow", PICKLE_FORMAT: ".pkl"}
+COMPRESSIONS = ("zstd", "lz4")
+# A Series is stored as a table with this one column, and its name in the schema metadata
+SERIES_COLUMN = "__series__"
+SERIES_NAME_METADATA = b"featureform.series_name"
+
+
+def cache_format() -> str:
+    cache_format = os.environ.get(CACHE_FORMAT_ENV, ARROW_FORMAT)
+    if cache_format not in EXTENSIONS:
+        raise ValueError(
+            f"Unknown cache format: {cache_format}. Supported formats: {', '.join(EXTENSIONS)}"
+        )
+    return cache_format
+
+
+def cache_compression() -> Optional[str]:
+    compression = os.environ.get(CACHE_COMPRESSION_ENV, "")
+    if compression in ("", "none"):
+        return None
+    if compression not in COMPRESSIONS:
+        raise ValueError(
+            f"Unknown cache compression: {compression}. Supported compressions: {', '.join(COMPRESSIONS)}"
+        )
+    return compression
+
+
+def existing_entry(base_path: str) -> Optional[str]:
+    """
+    Returns the path of the cache entry stored under base_path in either format, if there is one.
+    """
+    for extension in EXTENSIONS.values():
+        if os.path.exists(base_path + extension):
+            return base_path + extension
+    return None
+
+
+def read_entry(path: str) -> NDFrame:
+    """
+    Reads a cache entry. Arrow entries are memory-mapped, so numeric columns without missing
+    values are read-only views of the page cache rather than copies. Frames returned to users
+    are copied first.
+    """
+    if not path.endswith(EXTENSIONS[ARROW_FORMAT]):
+        return pd.read_pickle(path)
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    df = table.to_pandas(split_blocks=True)
+    # Missing strings come back as None where the cached frame held NaN
+    for column in df.columns:
+        if df[column].dtype == object and df[column].isna().any():
+            df[column] = df[column].fillna(np.nan)
+    metadata = table.schema.metadata or {}
+    if SERIES_NAME_METADATA in metadata:
+        return df[SERIES_COLUMN].rename(json.loads(metadata[SERIES_NAME_METADATA]))
+    return df
+
+
+def write_entry(path: str, df: NDFrame, compression: Optional[str] = None) -> str:
+    """
+    Writes a cache entry under path, ignoring its extension, and returns the path written.
+    Frames Arrow can't round-trip, such as object columns holding anything but strings, are
+    pickled instead. The entry is written to a temporary file and renamed into place, so readers
+    never see a partly written entry.
+    """
+    base_path = os.path.splitext(path)[0]
+    table = to_arrow(df) if cache_format() == ARROW_FORMAT else None
+    if table is not None:
+        path = base_path + EXTENSIONS[ARROW_FORMAT]
+    else:
+        path = base_path + EXTENSIONS[PICKLE_FORMAT]
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        if table is not None:
+            options = pa.ipc.IpcWriteOptions(compression=compression)
+            with pa.OSFile(tmp_path, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                    writer.write_table(table)
+        else:
+            df.to_pickle(tmp_path, compression=None)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    # An entry written in the other format is now out of date
+    for extension in EXTENSIONS.values():
+        if base_path + extension != path and os.path.exists(base_path + extension):
+            os.remove(base_path + extension)
+    return path
+
+
+def to_arrow(df: NDFrame) -> Optional[pa.Table]:
+    if isinstance(df, pd.Series):
+        return series_to_arrow(df)
+    if not isinstance(df, pd.DataFrame):
+        return None
+    if not all(isinstance(column, str) for column in df.columns):
+        return None
+    for column in df.columns:
+        if df[column].dtype == object and pd.api.types.infer_dtype(
+            df[column], skipna=True
+        ) not in ("string", "empty"):
+            return None
+    try:
+        return pa.Table.from_pandas(df)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, ValueError):
+        return None
+
+
+def series_to_arrow(series: pd.Series) -> Optional[pa.Table]:
+    # Names that JSON can't round-trip, such as tuples, are pickled with the Series
+    if not isinstance(series.name, (str, int, float, type(None))):
+        return None
+    table = to_arrow(series.to_frame(SERIES_COLUMN))
+    if table is None:
+        return None
+    metadata = {**table.schema.metadata, SERIES_NAME_METADATA: json.dumps(series.name)}
+    return table.replace_schema_metadata(metadata)
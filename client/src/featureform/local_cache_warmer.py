@@ -0,0 +1,115 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from featureform.enums import SourceType
+from featureform.local_scheduler import default_max_workers
+
+# Resource types warmed together, each stage reading what the previous one cached
+WARM_STAGES = (("transformation",), ("feature", "label"), ("training_set",))
+WARM_ORDER = tuple(t for stage in WARM_STAGES for t in stage)
+
+VARIANT_TABLES = {
+    "transformation": "source_variant",
+    "feature": "feature_variant",
+    "label": "label_variant",
+    "training_set": "training_set_variant",
+}
+
+Resource = Tuple[str, str, str]
+
+
+@dataclass
+class WarmResult:
+    resource_type: str
+    name: str
+    variant: str
+    seconds: float
+    # True if the resource was already cached before warming
+    cached: bool
+    error: Optional[str] = None
+
+
+class CacheWarmer:
+    """
+    Populates the LocalCache with every registered transformation, feature, label and training
+    set ahead of time, so the first training_set() or features() call reads from the cache.
+
+    Resources are warmed one type at a time on a thread pool: transformations first, then the
+    features and labels built from them, then the training sets that join those. Resources
+    sharing an input wait on each other's cache entry rather than computing it twice.
+    """
+
+    def __init__(self, client, max_workers: int = None):
+        self._client = client
+        self._db = client.db
+        self._cache = client.local_cache
+        self.max_workers = max_workers or default_max_workers()
+
+    def resources(self, resource_types: Iterable[str] = WARM_ORDER) -> List[Resource]:
+        """
+        Returns the registered resources of the given types, in the order they are warmed.
+        """
+        resource_types = set(resource_types)
+        resources = []
+        for resource_type in WARM_ORDER:
+            if resource_type not in resource_types:
+                continue
+            for row in self._db.get_type_table(VARIANT_TABLES[resource_type]):
+                if (
+                    resource_type == "transformation"
+                    and self._db.is_transformation(row["name"], row["variant"])
+                    == SourceType.PRIMARY_SOURCE.value
+                ):
+                    continue
+                resources.append((resource_type, row["name"], row["variant"]))
+        return resources
+
+    def warm(
+        self,
+        resources: List[Resource],
+        on_result: Callable[[WarmResult], None] = None,
+    ) -> List[WarmResult]:
+        """
+        Computes and caches each resource, calling on_result as each one finishes. A resource
+        that fails is reported in its result and doesn't stop the others.
+        """
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for stage_types in WARM_STAGES:
+                stage = [r for r in resources if r[0] in stage_types]
+                futures = [pool.submit(self._warm, *resource) for resource in stage]
+                for future in as_completed(futures):
+                    result = future.result()
+                    results.append(result)
+                    if on_result is not None:
+                        on_result(result)
+        return results
+
+    def _warm(self, resource_type: str, name: str, variant: str) -> WarmResult:
+        start = time.perf_counter()
+        cached = False
+        error = None
+        try:
+            cached = self._cache.is_cached(resource_type, name, variant)
+            self._materialize(resource_type, name, variant)
+        except Exception as e:
+            error = str(e)
+        return WarmResult(
+            resource_type, name, variant, time.perf_counter() - start, cached, error
+        )
+
+    def _materialize(self, resource_type: str, name: str, variant: str):
+        if resource_type == "transformation":
+            self._client.process_transformation(name, variant)
+        elif resource_type == "feature":
+            self._client.get_feature_dataframe(
+                self._db.get_feature_variant(name, variant)
+            )
+        elif resource_type == "label":
+            self._client.get_label_dataframe(self._db.get_label_variant(name, variant))
+        elif resource_type == "training_set":
+            self._client.materialize_training_set(name, variant)
+        else:
+            raise ValueError(f"Unknown resource type: {resource_type}")
@@ -0,0 +1,127 @@
+import contextlib
+import glob
+import hashlib
+import os
+import threading
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from featureform.local_cache_index import LOCK_EXTENSION, cache_dir_from_env
+from featureform.local_file_lock import FileLock
+
+INGEST_DIR_ENV = "FEATUREFORM_INGEST_DIR"
+INGEST_CACHE_ENV = "FEATUREFORM_INGEST_CACHE"
+
+
+def ingest_cache_enabled() -> bool:
+    return os.environ.get(INGEST_CACHE_ENV, "true").lower() not in ("false", "0")
+
+
+def ingest_dir_from_env() -> str:
+    return os.environ.get(INGEST_DIR_ENV, os.path.join(cache_dir_from_env(), "ingest"))
+
+
+class IngestCache:
+    """
+    Parquet copies of CSV primary sources, holding the schema pandas inferred when the CSV was
+    parsed. Copies are keyed by the file's path, size and modification time, so a CSV is parsed
+    once per version of the file and an edited file is ingested again on its next read.
+
+    Copies live in the cache directory, where LocalCache counts them towards its byte budget and
+    may evict them; an evicted copy is ingested again on the next read.
+    """
+
+    def __init__(self, ingest_dir: str = None):
+        self.ingest_dir = ingest_dir or ingest_dir_from_env()
+        self._lock = threading.Lock()
+        self._path_locks = {}
+        # Fingerprints of files whose values Arrow can't hold, which are read from the CSV
+        self._unsupported = set()
+
+    def path(self, csv_path: str) -> str:
+        stat = os.stat(csv_path)
+        fingerprint = hashlib.sha1(
+            f"{stat.st_size}:{stat.st_mtime_ns}".encode()
+        ).hexdigest()[:16]
+        return os.path.join(
+            self.ingest_dir, f"{self._path_key(csv_path)}__{fingerprint}.parquet"
+        )
+
+    def read(
+        self, csv_path: str, columns: Optional[Iterable[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Reads a CSV source through its Parquet copy, ingesting it first if needed. When columns
+        is set only those columns are read; any that don't exist in the file are left out.
+        """
+        with self._lock:
+            path_lock = self._path_locks.setdefault(csv_path, threading.Lock())
+        with path_lock:
+            cached_path = self.path(csv_path)
+            if not os.path.exists(cached_path) and cached_path not in self._unsupported:
+                os.makedirs(self.ingest_dir, exist_ok=True)
+                lock_path = os.path.join(
+                    self.ingest_dir, self._path_key(csv_path) + LOCK_EXTENSION
+                )
+                # Processes ingesting the same file wait for each other, then find its copy
+                with FileLock(lock_path):
+                    cached_path = self.path(csv_path)
+                    if (
+                        not os.path.exists(cached_path)
+                        and cached_path not in self._unsupported
+                    ):
+                        self._ingest(csv_path, cached_path)
+        if cached_path in self._unsupported:
+            return read_csv(csv_path, columns)
+        try:
+            if columns is not None:
+                wanted = set(columns)
+                names = pq.read_schema(cached_path).names
+                columns = [c for c in names if c in wanted]
+            return restore_missing_values(pd.read_parquet(cached_path, columns=columns))
+        except FileNotFoundError:
+            # Evicted since it was ingested
+            return read_csv(csv_path, columns)
+
+    def _ingest(self, csv_path, cached_path):
+        df = pd.read_csv(csv_path)
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            self._unsupported.add(cached_path)
+            return
+        # Earlier versions of the file are never read again. Eviction may remove them first
+        for stale in glob.glob(
+            os.path.join(self.ingest_dir, f"{self._path_key(csv_path)}__*.parquet")
+        ):
+            if stale != cached_path:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(stale)
+        tmp_path = f"{cached_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, cached_path)
+
+    @staticmethod
+    def _path_key(csv_path):
+        return hashlib.sha1(os.path.abspath(csv_path).encode()).hexdigest()[:16]
+
+
+def read_csv(path: str, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    if columns is None:
+        return pd.read_csv(path)
+    wanted = set(columns)
+    return pd.read_csv(path, usecols=lambda column: column in wanted)
+
+
+def restore_missing_values(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Arrow returns missing strings as None, where read_csv gives NaN.
+    """
+    for column in df.columns:
+        if df[column].dtype == object and df[column].isna().any():
+            df[column] = df[column].fillna(np.nan)
+    return df
@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+
+from featureform.local_utils import take_or_nan
+
+
+class PointInTimeJoin:
+    """
+    Joins any number of features onto a label frame in a single pass.
+
+    The labels are ranked by (entity, timestamp) once. Every feature is then matched with a binary
+    search over its own (entity, timestamp) order, giving for each label row the position of the
+    latest feature row for the same entity that is not after the label's timestamp. Features without
+    a timestamp contribute the last row per entity. All feature columns are gathered at the end, so
+    no intermediate training set frames are built.
+    """
+
+    def __init__(self, label_df: pd.DataFrame, entity_column: str, timestamp_column=""):
+        if entity_column not in label_df.columns:
+            label_df = label_df.reset_index()
+        else:
+            label_df = label_df.reset_index(drop=True)
+        self._label_df = label_df
+        self._entity_column = entity_column
+        self._timestamp_column = timestamp_column
+        self._features = []
+
+        label_entities = label_df[entity_column]
+        self._label_codes, uniques = pd.factorize(label_entities)
+        self._entities = pd.Index(uniques)
+        self._entities_as_str = None
+        self._entity_dtype = label_entities.dtype
+
+        if timestamp_column != "":
+            label_ts, label_ts_missing = _to_nanoseconds(label_df[timestamp_column])
+            # Feature timestamps are ranked against the distinct label timestamps, which keeps the
+            # combined (entity, rank) key small enough to fit in an int64.
+            self._timestamps = np.unique(label_ts[~label_ts_missing])
+            label_ranks = np.searchsorted(self._timestamps, label_ts)
+        else:
+            # Without a label timestamp every feature row is visible, so the latest one is joined
+            self._timestamps = np.array([], dtype=np.int64)
+            label_ranks = np.zeros(len(label_df), dtype=np.int64)
+            label_ts_missing = np.zeros(len(label_df), dtype=bool)
+        self._rank_width = len(self._timestamps) + 1
+
+        label_keys = self._label_codes * self._rank_width + label_ranks
+        self._label_matchable = (self._label_codes != -1) & ~label_ts_missing
+        self._label_order = np.argsort(label_keys, kind="stable")
+        self._sorted_label_keys = label_keys[self._label_order]
+
+    def add_feature(
+        self,
+        column: str,
+        df: pd.DataFrame,
+        entity_column: str,
+        value_column: str,
+        timestamp_column="",
+    ):
+        """
+        Registers a feature frame whose value_column will be joined as column.
+        """
+        self._features.append(
+            (column, df, entity_column, value_column, timestamp_column)
+        )
+
+    def join(self) -> pd.DataFrame:
+        columns = {name: self._label_df[name] for name in self._label_df.columns}
+        for column, df, entity_column, value_column, timestamp_column in self._features:
+            positions = self._feature_positions(df, entity_column, timestamp_column)
+            columns[column] = take_or_nan(df[value_column], positions)
+        return pd.DataFrame(columns)
+
+    def _feature_positions(self, df, entity_column, timestamp_column):
+        """
+        Returns, for every label row, the position of the matching row in df or -1.
+        """
+        codes = self._entity_codes(df[entity_column])
+        if timestamp_column != "":
+            feature_ts, feature_ts_missing = _to_nanoseconds(df[timestamp_column])
+            ranks = np.searchsorted(self._timestamps, feature_ts)
+        else:
+            feature_ts = np.zeros(len(df), dtype=np.int64)
+            feature_ts_missing = np.zeros(len(df), dtype=bool)
+            ranks = np.zeros(len(df), dtype=np.int64)
+
+        candidates = np.flatnonzero((codes != -1) & ~feature_ts_missing)
+        keys = codes[candidates] * self._rank_width + ranks[candidates]
+        # Several feature timestamps can share a rank, so break ties on the timestamp itself. The
+        # stable sort leaves the last row of equal timestamps last, matching keep="last".
+        order = np.lexsort((feature_ts[candidates], keys))
+        sorted_keys = keys[order]
+        sorted_rows = candidates[order]
+
+        found = np.searchsorted(sorted_keys, self._sorted_label_keys, side="right") - 1
+        matched = found >= 0
+        same_entity = np.zeros(len(found), dtype=bool)
+        same_entity[matched] = (
+            codes[sorted_rows[found[matched]]]
+            == self._label_codes[self._label_order[matched]]
+        )
+
+        positions = np.full(len(self._label_df), -1, dtype=np.int64)
+        positions[self._label_order[same_entity]] = sorted_rows[found[same_entity]]
+        positions[~self._label_matchable] = -1
+        return positions
+
+    def _entity_codes(self, entities: pd.Series) -> np.ndarray:
+        if entities.dtype == self._entity_dtype:
+            return self._entities.get_indexer(entities)
+        # Entity columns of different types are compared as strings
+        if self._entities_as_str is None:
+            self._entities_as_str = pd.Index(self._entities.astype(str))
+        return self._entities_as_str.get_indexer(entities.astype(str))
+
+
+def _to_nanoseconds(timestamps: pd.Series):
+    """
+    Returns the timestamps as int64 nanoseconds along with a mask of missing values.
+    """
+    timestamps = pd.to_datetime(timestamps)
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_convert(None)
+    missing = timestamps.isna().to_numpy()
+    values = timestamps.to_numpy(dtype="datetime64[ns]").view(np.int64)
+    return values, missing
+
+
+def join_lag_features(
+    training_set_df: pd.DataFrame,
+    lag_features,
+    feature_columns,
+    entity_column: str,
+    label_column: str,
+    timestamp_column: str,
+) -> pd.DataFrame:
+    """
+    Adds the lag features to a training set in one point-in-time pass.
+
+    A lag of L seconds is the feature value of the latest training set row for the same entity
+    whose timestamp is at least L seconds before the row's own timestamp. Shifting the lagged
+    rows' timestamps forward by L turns that into a regular as-of match, so all lags are joined
+    together. Rows are deduplicated on (entity, label, timestamp) and sorted by timestamp.
+    """
+    if len(lag_features) == 0:
+        return training_set_df
+
+    df = training_set_df.drop_duplicates(
+        subset=[entity_column, label_column, timestamp_column], keep="last"
+    )
+    df = df.sort_values(timestamp_column, kind="stable", ignore_index=True)
+    timestamps = pd.to_datetime(df[timestamp_column])
+
+    join = PointInTimeJoin(df, entity_column, timestamp_column)
+    lag_columns = []
+    for lag_feature in lag_features:
+        feature_column = (
+            f"{lag_feature['feature_name']}.{lag_feature['feature_variant']}"
+        )
+        lag_column = lag_feature["feature_new_name"]
+        shifted = pd.DataFrame(
+            {
+                entity_column: df[entity_column],
+                feature_column: df[feature_column],
+                timestamp_column: timestamps
+                + pd.Timedelta(seconds=lag_feature["feature_lag"]),
+            }
+        )
+        join.add_feature(
+            lag_column, shifted, entity_column, feature_column, timestamp_column
+        )
+        lag_columns.append(lag_column)
+
+    columns = [
+        entity_column,
+        timestamp_column,
+        *feature_columns,
+        *lag_columns,
+        label_column,
+    ]
+    return join.join()[columns]
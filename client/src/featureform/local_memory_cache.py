@@ -0,0 +1,72 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional
+
+import pandas as pd
+from pandas.core.generic import NDFrame
+
+
+def frame_size(df: NDFrame) -> int:
+    """
+    Returns the bytes a frame holds, counting the Python objects in object columns.
+    """
+    usage = df.memory_usage(deep=True, index=True)
+    return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+
+
+class MemoryLRU:
+    """
+    A byte-bounded, least recently used map from cache file paths to frames. Cache file paths
+    are content addressed, so changed inputs are looked up under a new path and the old entry
+    ages out. Each frame also carries a version, the file's modification time, so an entry
+    rewritten on disk by another process isn't served from memory.
+
+    Frames are handed out as shallow copies, so callers can add, drop or rename columns without
+    changing the cached frame. Writing into the values of a returned frame is not supported.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self._frames = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self):
+        return len(self._frames)
+
+    def __contains__(self, key):
+        return key in self._frames
+
+    def get(self, key: str, version=None) -> Optional[NDFrame]:
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None or entry[2] != version:
+                return None
+            self._frames.move_to_end(key)
+        return entry[0].copy(deep=False)
+
+    def put(self, key: str, df: NDFrame, version=None):
+        size = frame_size(df)
+        # Frames larger than the whole budget would only evict everything else
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._frames.pop(key, None)
+            if previous is not None:
+                self.size_bytes -= previous[1]
+            self._frames[key] = (df.copy(deep=False), size, version)
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._frames.popitem(last=False)
+                self.size_bytes -= evicted_size
+
+    def discard(self, key: str):
+        with self._lock:
+            entry = self._frames.pop(key, None)
+            if entry is not None:
+                self.size_bytes -= entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self.size_bytes = 0
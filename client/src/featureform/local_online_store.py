@@ -0,0 +1,98 @@
+from threading import Lock
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from featureform.local_cache import LocalCache
+from featureform.local_utils import take_or_nan
+
+
+class OnlineFeatureTable:
+    """
+    Holds the latest value of a single feature variant for every entity. Entity values are hashed
+    to a position in a compact NumPy array, so serving a feature is a dict lookup and an index.
+    """
+
+    def __init__(self, entities, values: np.ndarray):
+        self._index = {entity: i for i, entity in enumerate(entities)}
+        self._values = values
+        self._keys = None
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, entity_column: str, value_column: str):
+        """
+        Builds a table from a frame that is already ordered by time; the last row for an entity wins.
+        """
+        df = df.drop_duplicates(subset=[entity_column], keep="last")
+        return cls(df[entity_column].tolist(), df[value_column].to_numpy())
+
+    def __contains__(self, entity) -> bool:
+        return entity in self._index
+
+    def __getitem__(self, entity):
+        return self._values[self._index[entity]]
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def take(self, entities) -> np.ndarray:
+        """
+        Returns the values for many entities with one vectorized hash probe. Entities that are not
+        in the table get NaN, which upcasts integer and boolean values.
+        """
+        if self._keys is None:
+            self._keys = pd.Index(list(self._index.keys()))
+        return take_or_nan(self._values, self._keys.get_indexer(entities))
+
+
+class _TableEntry:
+    def __init__(self, table: OnlineFeatureTable, source_key: str):
+        self.table = table
+        self.source_key = source_key
+
+
+class LocalOnlineStore:
+    """
+    In-memory online store for local mode. A table is built once per feature variant and is only
+    rebuilt when the LocalCache key of its source changes, i.e. when the source's definition or
+    the contents of a file it was built from change.
+    """
+
+    def __init__(self, cache: LocalCache):
+        self._cache = cache
+        self._tables: Dict[Tuple[str, str], _TableEntry] = {}
+        self._lock = Lock()
+
+    def get_or_build(
+        self,
+        name: str,
+        variant: str,
+        source_name: str,
+        source_variant: str,
+        entity_column: str,
+        value_column: str,
+        func: Callable[[], pd.DataFrame],
+    ) -> OnlineFeatureTable:
+        # Taken before reading so writes that land during the build are picked up
+        source_key = self._cache.source_key(source_name, source_variant)
+        entry = self._tables.get((name, variant))
+        if entry is not None and entry.source_key == source_key:
+            return entry.table
+
+        with self._lock:
+            entry = self._tables.get((name, variant))
+            if entry is None or entry.source_key != source_key:
+                table = OnlineFeatureTable.from_dataframe(
+                    func(), entity_column, value_column
+                )
+                entry = _TableEntry(table, source_key)
+                self._tables[(name, variant)] = entry
+            return entry.table
+
+    def invalidate(self, name: str = None, variant: str = None):
+        with self._lock:
+            if name is None:
+                self._tables.clear()
+            else:
+                self._tables.pop((name, variant), None)
@@ -0,0 +1,125 @@
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Set
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from featureform.enums import FileFormat
+from featureform.local_ingest_cache import IngestCache, read_csv
+
+
+def resource_columns(resource) -> List[str]:
+    """
+    Returns the source columns a feature or label variant reads.
+    """
+    columns = [resource["source_entity"], resource["source_value"]]
+    if resource["source_timestamp"] != "":
+        columns.append(resource["source_timestamp"])
+    return columns
+
+
+def is_parquet(path: str) -> bool:
+    return (
+        FileFormat.is_supported(path)
+        and FileFormat.get_format(path) == FileFormat.PARQUET
+    )
+
+
+def read_source(path: str, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Reads a primary source file. When columns is set only those columns are parsed; any that
+    don't exist in the file are left out so callers can report them.
+    """
+    if not is_parquet(path):
+        return read_csv(path, columns)
+    if columns is None:
+        return pd.read_parquet(path)
+    wanted = set(columns)
+    names = pq.read_schema(path).names
+    return pd.read_parquet(path, columns=[c for c in names if c in wanted])
+
+
+class ReadPlan:
+    def __init__(self, columns: Dict[str, Optional[Set[str]]], read_file):
+        """
+        Columns to read for each source path, where None means every column. Each path is read
+        at most once, on first use, and shared by every resource in the plan.
+        """
+        self.columns = columns
+        self._read_file = read_file
+        self._frames = {}
+        self._lock = threading.Lock()
+        self._path_locks = {}
+
+    def __contains__(self, path):
+        return path in self.columns
+
+    def covers(self, path: str, columns: Optional[Iterable[str]] = None) -> bool:
+        if path not in self.columns:
+            return False
+        planned = self.columns[path]
+        return planned is None or (columns is not None and planned.issuperset(columns))
+
+    def read(self, path: str, columns: Optional[Iterable[str]] = None):
+        if not self.covers(path, columns):
+            return self._read_file(path, columns)
+        with self._lock:
+            path_lock = self._path_locks.setdefault(path, threading.Lock())
+        with path_lock:
+            if path not in self._frames:
+                self._frames[path] = self._read_file(path, self.columns[path])
+        df = self._frames[path]
+        if columns is None:
+            return df
+        return df[[c for c in columns if c in df.columns]]
+
+
+class SourceReader:
+    """
+    Reads primary sources for the local client. Inside planned(), reads of the planned paths
+    go through a shared ReadPlan; other reads only parse the columns they ask for. CSV files
+    are read through the ingest cache when one is given. Plans may be active in several threads
+    at once, and a read goes through any active plan that covers it.
+    """
+
+    def __init__(self, ingest_cache: IngestCache = None):
+        self.ingest_cache = ingest_cache
+        self._plans = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def planned(self, columns: Dict[str, Optional[Set[str]]]):
+        plan = ReadPlan(columns, self.read_file)
+        with self._lock:
+            self._plans.append(plan)
+        try:
+            yield plan
+        finally:
+            with self._lock:
+                self._plans.remove(plan)
+
+    def read(self, path: str, columns: Optional[Iterable[str]] = None):
+        path = str(path)
+        with self._lock:
+            plan = next(
+                (plan for plan in self._plans if plan.covers(path, columns)), None
+            )
+        if plan is not None:
+            return plan.read(path, columns)
+        return self.read_file(path, columns)
+
+    def read_file(self, path: str, columns: Optional[Iterable[str]] = None):
+        if self.ingest_cache is not None and not is_parquet(path):
+            return self.ingest_cache.read(path, columns)
+        return read_source(path, columns)
+
+
+def add_columns(plan_columns, path, columns: Optional[Iterable[str]]):
+    """
+    Adds the columns needed from path to a plan, where None needs every column.
+    """
+    if columns is None or plan_columns.get(path, set()) is None:
+        plan_columns[path] = None
+    else:
+        plan_columns.setdefault(path, set()).update(columns)
@@ -0,0 +1,158 @@
+import atexit
+import os
+import shutil
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Optional
+from urllib.parse import urlparse
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+except ImportError:
+    boto3 = None
+
+REMOTE_CACHE_ENV = "FEATUREFORM_REMOTE_CACHE"
+REMOTE_CACHE_ENDPOINT_ENV = "FEATUREFORM_REMOTE_CACHE_ENDPOINT"
+REMOTE_CACHE_UPLOAD_ENV = "FEATUREFORM_REMOTE_CACHE_UPLOAD"
+
+# Uploads running at once across every LocalCache in the process
+UPLOAD_WORKERS = 4
+
+
+class DirectoryRemoteCache:
+    """
+    Cache entries shared through a directory, such as an NFS mount. Entries are copied in and
+    out under a temporary name and renamed into place, so readers never see a partial entry.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def download(self, name: str, path: str) -> bool:
+        source = os.path.join(self.root, name)
+        if not os.path.exists(source):
+            return False
+        copy_into_place(lambda tmp_path: shutil.copyfile(source, tmp_path), path)
+        return True
+
+    def upload(self, path: str, name: str):
+        os.makedirs(self.root, exist_ok=True)
+        copy_into_place(
+            lambda tmp_path: shutil.copyfile(path, tmp_path),
+            os.path.join(self.root, name),
+        )
+
+
+class S3RemoteCache:
+    """
+    Cache entries shared through an S3 bucket, or any S3-compatible store such as MinIO when an
+    endpoint URL is given. Credentials are found the way boto3 finds them.
+    """
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: str = None):
+        if boto3 is None:
+            raise ImportError(
+                "The S3 remote cache requires boto3: pip install featureform[s3]"
+            )
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+
+    def download(self, name: str, path: str) -> bool:
+        try:
+            copy_into_place(
+                lambda tmp_path: self.client.download_file(
+                    self.bucket, self._key(name), tmp_path
+                ),
+                path,
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                return False
+            raise
+        return True
+
+    def upload(self, path: str, name: str):
+        self.client.upload_file(path, self.bucket, self._key(name))
+
+    def _key(self, name):
+        return f"{self.prefix}/{name}" if self.prefix else name
+
+
+def copy_into_place(copy, path: str):
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        copy(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def remote_cache_from_env():
+    """
+    Returns the remote cache set through FEATUREFORM_REMOTE_CACHE, either a directory or an
+    s3://bucket/prefix URL, or None if there isn't one.
+    """
+    url = os.environ.get(REMOTE_CACHE_ENV)
+    if not url:
+        return None
+    if "://" not in url:
+        return DirectoryRemoteCache(url)
+    parsed = urlparse(url)
+    if parsed.scheme == "file":
+        return DirectoryRemoteCache(parsed.path)
+    if parsed.scheme == "s3":
+        return S3RemoteCache(
+            parsed.netloc,
+            parsed.path,
+            os.environ.get(REMOTE_CACHE_ENDPOINT_ENV),
+        )
+    raise ValueError(
+        f"Unsupported remote cache: {url}. Expected a directory or an s3://bucket/prefix URL"
+    )
+
+
+def upload_enabled() -> bool:
+    return os.environ.get(REMOTE_CACHE_UPLOAD_ENV, "true").lower() not in (
+        "false",
+        "0",
+    )
+
+
+_uploads = None
+_pending = set()
+_uploads_lock = threading.Lock()
+
+
+def upload_in_background(remote, path: str, name: str):
+    """
+    Uploads an entry without making the caller wait. A failed upload only warns, since the
+    entry is still cached locally.
+    """
+    global _uploads
+    with _uploads_lock:
+        if _uploads is None:
+            _uploads = ThreadPoolExecutor(max_workers=UPLOAD_WORKERS)
+        future = _uploads.submit(_upload, remote, path, name)
+        _pending.add(future)
+    future.add_done_callback(_pending.discard)
+
+
+def _upload(remote, path, name):
+    try:
+        remote.upload(path, name)
+    except Exception as e:
+        warnings.warn(f"Could not upload {name} to the remote cache: {e}")
+
+
+@atexit.register
+def flush_uploads(timeout: Optional[float] = None):
+    """
+    Waits for every pending upload to finish.
+    """
+    with _uploads_lock:
+        pending = list(_pending)
+    wait(pending, timeout=timeout)
@@ -0,0 +1,132 @@
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, Set, Tuple
+
+from pandas.core.generic import NDFrame
+
+from featureform.enums import SourceType
+from featureform.local_utils import get_sql_transformation_sources
+
+WORKERS_ENV = "FEATUREFORM_LOCAL_WORKERS"
+
+# A node is a ("source", name, variant) or ("feature", name, variant) tuple
+Node = Tuple[str, str, str]
+
+
+def source_node(name: str, variant: str) -> Node:
+    return ("source", name, variant)
+
+
+def feature_node(name: str, variant: str) -> Node:
+    return ("feature", name, variant)
+
+
+def default_max_workers() -> int:
+    workers = os.environ.get(WORKERS_ENV)
+    if workers is not None:
+        return max(1, int(workers))
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+class LocalDAGScheduler:
+    """
+    Materializes local sources and features together with everything they depend on.
+
+    The dependency graph is resolved from the metadata store and every node is submitted to a
+    bounded thread pool as soon as its inputs are ready, so independent branches are computed
+    concurrently and the wall time follows the critical path. Resources with a valid LocalCache
+    entry are loaded from the cache without rebuilding their inputs. Each node runs once per call,
+    so a source shared by several transformations is only read once.
+    """
+
+    def __init__(self, client, max_workers: int = None):
+        self._client = client
+        self._db = client.db
+        self._cache = client.local_cache
+        self.max_workers = max_workers or default_max_workers()
+
+    def run(self, targets: List[Node]) -> Dict[Node, NDFrame]:
+        """
+        Returns the frames of the targets and of every node computed along the way.
+        """
+        dependencies = self.resolve(targets)
+        remaining = {node: set(deps) for node, deps in dependencies.items()}
+        dependents = defaultdict(list)
+        for node, deps in dependencies.items():
+            for dependency in deps:
+                dependents[dependency].append(node)
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            running = {
+                pool.submit(self._compute, node, results): node
+                for node, deps in remaining.items()
+                if len(deps) == 0
+            }
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    results[node] = future.result()
+                    for dependent in dependents[node]:
+                        remaining[dependent].discard(node)
+                        if len(remaining[dependent]) == 0:
+                            future = pool.submit(self._compute, dependent, results)
+                            running[future] = dependent
+        return results
+
+    def resolve(self, targets: List[Node]) -> Dict[Node, Set[Node]]:
+        """
+        Returns the dependencies of every node reachable from the targets.
+        """
+        dependencies = {}
+        stack = list(targets)
+        while stack:
+            node = stack.pop()
+            if node in dependencies:
+                continue
+            dependencies[node] = self._dependencies(node)
+            stack.extend(dependencies[node])
+        return dependencies
+
+    def _dependencies(self, node: Node) -> Set[Node]:
+        resource_type, name, variant = node
+        if resource_type == "feature":
+            if self._cache.is_cached("feature", name, variant):
+                return set()
+            feature = self._db.get_feature_variant(name, variant)
+            source_name, source_variant = (
+                feature["source_name"],
+                feature["source_variant"],
+            )
+            # Features on primary sources read the file themselves
+            if (
+                self._db.is_transformation(source_name, source_variant)
+                == SourceType.PRIMARY_SOURCE.value
+            ):
+                return set()
+            return {source_node(source_name, source_variant)}
+
+        transform_type = self._db.is_transformation(name, variant)
+        if transform_type == SourceType.PRIMARY_SOURCE.value or self._cache.is_cached(
+            "transformation", name, variant
+        ):
+            return set()
+        source = self._db.get_source_variant(name, variant)
+        if transform_type == SourceType.SQL_TRANSFORMATION.value:
+            inputs = get_sql_transformation_sources(source["definition"])
+        else:
+            inputs = json.loads(source["inputs"])
+        return {
+            source_node(input_name, input_variant)
+            for input_name, input_variant in inputs
+        }
+
+    def _compute(self, node: Node, results: Dict[Node, NDFrame]) -> NDFrame:
+        resource_type, name, variant = node
+        if resource_type == "feature":
+            feature = self._db.get_feature_variant(name, variant)
+            return self._client.get_feature_dataframe(feature, results)
+        return self._client.get_input_df(name, variant, results)
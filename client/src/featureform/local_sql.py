@@ -0,0 +1,118 @@
+import json
+import os
+from typing import Dict
+
+import pandas as pd
+from pandasql import sqldf
+
+SQL_ENGINE_ENV = "FEATUREFORM_LOCAL_SQL_ENGINE"
+AUTO_ENGINE = "auto"
+DEFAULT_ENGINE = "pandasql"
+
+
+class PandasSQLEngine:
+    """
+    Runs queries with pandasql, which copies every input frame into a fresh SQLite database.
+    Always available and the reference for the SQLite dialect local transformations are written in.
+    """
+
+    name = "pandasql"
+
+    def execute(self, query: str, tables: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        return sqldf(query, tables)
+
+
+def import_duckdb():
+    """
+    Imports duckdb, or returns None if it isn't installed. It is only imported once an engine
+    that uses it is created, so nothing loads it unless it was opted into.
+    """
+    try:
+        import duckdb
+    except ImportError:
+        return None
+    return duckdb
+
+
+class DuckDBEngine:
+    """
+    Runs queries with DuckDB, which scans the registered pandas frames in place instead of copying
+    them into a database first.
+    """
+
+    name = "duckdb"
+
+    def __init__(self):
+        self._duckdb = import_duckdb()
+        if self._duckdb is None:
+            raise ImportError(
+                "The duckdb SQL engine requires duckdb: pip install duckdb"
+            )
+
+    def execute(self, query: str, tables: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        conn = self._duckdb.connect()
+        try:
+            for table_name, df in tables.items():
+                conn.register(table_name, df)
+            return conn.execute(query).df()
+        finally:
+            conn.close()
+
+
+class AutoSQLEngine:
+    """
+    Uses DuckDB when it is installed and falls back to pandasql for queries DuckDB can't run, such
+    as ones using SQLite-only functions. Opt-in only: DuckDB's dialect differs from SQLite's, e.g.
+    integer division returns decimals and row order isn't preserved without ORDER BY.
+    """
+
+    name = AUTO_ENGINE
+
+    def __init__(self):
+        self._fallback = PandasSQLEngine()
+        self._duckdb = import_duckdb()
+        self._engine = DuckDBEngine() if self._duckdb is not None else None
+
+    def execute(self, query: str, tables: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        if self._engine is not None:
+            try:
+                return self._engine.execute(query, tables)
+            except self._duckdb.Error:
+                pass
+        return self._fallback.execute(query, tables)
+
+
+SQL_ENGINES = {
+    PandasSQLEngine.name: PandasSQLEngine,
+    DuckDBEngine.name: DuckDBEngine,
+    AutoSQLEngine.name: AutoSQLEngine,
+}
+
+
+def sql_engine_name(name: str = "") -> str:
+    """
+    Returns the name of the SQL engine for local transformations. An engine set on the provider
+    takes precedence over the FEATUREFORM_LOCAL_SQL_ENGINE environment variable, which defaults
+    to pandasql.
+    """
+    name = name or os.environ.get(SQL_ENGINE_ENV, DEFAULT_ENGINE)
+    if name not in SQL_ENGINES:
+        raise ValueError(
+            f"Unsupported SQL engine {name}; expected one of {', '.join(SQL_ENGINES)}"
+        )
+    return name
+
+
+def provider_sql_engine(db, provider: str) -> str:
+    """
+    Returns the name of the SQL engine that runs transformations on a local provider.
+    """
+    sql_engine = ""
+    if provider != "":
+        config = db.get_provider(provider, False)["serialized_config"]
+        sql_engine = json.loads(config or "{}").get("SQLEngine", "")
+    return sql_engine_name(sql_engine)
+
+
+def get_sql_engine(name: str = ""):
+    return SQL_ENGINES[sql_engine_name(name)]()
@@ -2,72 +2,41 @@ import re
 
 import pandas as pd
 
+from featureform.local_read_planner import read_source, resource_columns
+
 
 def get_sql_transformation_sources(query_string):
     # Use regex to parse query inputs in double curly braces {{ }}
     return [ts[2:-2].split(".") for ts in re.findall("(?={{).*?(?<=}})", query_string)]
 
 
-def merge_feature_into_ts(feature_row, label_row, df, trainingset_df):
-    if feature_row["source_timestamp"] != "":
-        trainingset_df = pd.merge_asof(
-            trainingset_df,
-            df.sort_values(feature_row["source_timestamp"]),
-            direction="backward",
-            left_on=label_row["source_timestamp"],
-            right_on=feature_row["source_timestamp"],
-            left_by=label_row["source_entity"],
-            right_by=feature_row["source_entity"],
-        )
-        if feature_row["source_timestamp"] != label_row["source_timestamp"]:
-            trainingset_df.drop(columns=feature_row["source_timestamp"], inplace=True)
-    else:
-        df.drop_duplicates(
-            subset=[feature_row["source_entity"]], keep="last", inplace=True
+def take_or_nan(values, positions):
+    """
+    Takes values at positions, where a position of -1 yields the missing value for the dtype.
+    Integer and boolean values are upcast as needed to hold the missing value.
+    """
+    if isinstance(values, pd.Series):
+        values = (
+            values.array
+            if pd.api.types.is_extension_array_dtype(values.dtype)
+            else values.to_numpy()
         )
-        trainingset_df.reset_index(inplace=True)
-        trainingset_df[label_row["source_entity"]] = trainingset_df[
-            label_row["source_entity"]
-        ].astype("string")
-        df[label_row["source_entity"]] = df[label_row["source_entity"]].astype("string")
-        trainingset_df = trainingset_df.join(
-            df.set_index(label_row["source_entity"]),
-            how="left",
-            on=label_row["source_entity"],
-            lsuffix="_left",
-        )
-        if "index" in trainingset_df.columns:
-            trainingset_df.drop(columns="index", inplace=True)
-    return trainingset_df
-
-
-def list_to_combined_df(features_list, entity_id):
-    all_feature_df = None
-    try:
-        for feature in features_list:
-            if all_feature_df is None:
-                all_feature_df = feature
-            else:
-                all_feature_df = all_feature_df.join(
-                    feature.set_index(entity_id), on=entity_id, lsuffix="_left"
-                )
-        return all_feature_df
-    except TypeError:
-        print("Set is empty")
-
-
-def get_features_for_entity(entity_id, entity_value, all_feature_df):
-    entity = all_feature_df.loc[all_feature_df[entity_id] == entity_value].copy()
-    entity.drop(columns=entity_id, inplace=True)
-    if len(entity.values) > 0:
-        return entity.values[0]
-    else:
-        raise Exception(f"No matching entities for {entity_id}: {entity_value}")
+    return pd.api.extensions.take(values, positions, allow_fill=True)
+
+
+def read_resource_columns(resource, source_path, reader=None):
+    """
+    Reads only the columns of a source file that a feature or label needs.
+    """
+    columns = resource_columns(resource)
+    if reader is not None:
+        return reader.read(str(source_path), columns)
+    return read_source(str(source_path), columns)
 
 
-def feature_df_with_entity(source_path, entity_id, feature):
+def feature_df_with_entity(source_path, entity_id, feature, reader=None):
     name_variant = f"{feature['name']}.{feature['variant']}"
-    df = pd.read_csv(str(source_path))
+    df = read_resource_columns(feature, source_path, reader)
     check_missing_values(feature, df)
     if feature["source_timestamp"] != "":
         df = df[
@@ -107,8 +76,8 @@ def check_missing_values(resource, df):
         )
 
 
-def label_df_from_csv(label, file_name):
-    df = pd.read_csv(file_name)
+def label_df_from_csv(label, file_name, reader=None):
+    df = read_resource_columns(label, file_name, reader)
     check_missing_values(label, df)
     if label["source_timestamp"] != "":
         df = df[
@@ -127,8 +96,8 @@ def label_df_from_csv(label, file_name):
     return df
 
 
-def feature_df_from_csv(feature, filename):
-    df = pd.read_csv(str(filename))
+def feature_df_from_csv(feature, filename, reader=None):
+    df = read_resource_columns(feature, filename, reader)
     check_missing_values(feature, df)
     if feature["source_timestamp"] != "":
         df = df[
@@ -0,0 +1,60 @@
+import hashlib
+import types
+from threading import Lock
+from typing import Callable, Dict, Tuple, Union
+
+
+class OnDemandFunctionCache:
+    """
+    Process-wide cache of compiled on-demand feature functions. Entries are keyed by the feature's
+    name, variant and a hash of its serialized code, so re-registering a variant with new code
+    can never serve a stale function.
+    """
+
+    def __init__(self):
+        self._functions: Dict[Tuple[str, str, str], types.FunctionType] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        name: str,
+        variant: str,
+        serialized: Union[bytes, str],
+        loader: Callable[[Union[bytes, str]], types.FunctionType],
+    ) -> types.FunctionType:
+        """
+        Returns the compiled function for the serialized code, calling loader(serialized) to
+        deserialize it only on a miss.
+        """
+        content = serialized.encode() if isinstance(serialized, str) else serialized
+        key = (name, variant, hashlib.sha256(content).hexdigest())
+        with self._lock:
+            func = self._functions.get(key)
+            if func is not None:
+                self.hits += 1
+                return func
+            self.misses += 1
+
+        func = loader(serialized)
+        with self._lock:
+            self._functions[key] = func
+        return func
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._functions),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._functions.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+ondemand_function_cache = OnDemandFunctionCache()
@@ -2606,17 +2606,20 @@ class Registrar:
         self.__resources.append(provider)
         return OfflineK8sProvider(self, provider)
 
-    def register_local(self):
+    def register_local(self, sql_engine: str = ""):
         """Register a Local provider.
 
         **Examples**:
         ```
             local = register_local()
         ```
+        Args:
+            sql_engine (str): Engine that runs SQL transformations: "pandasql", "duckdb" or "auto" (DuckDB with a pandasql fallback). Defaults to the FEATUREFORM_LOCAL_SQL_ENGINE environment variable, then "pandasql". DuckDB's SQL dialect can give different results, e.g. for integer division.
+
         Returns:
             local (LocalProvider): Provider
         """
-        config = LocalConfig()
+        config = LocalConfig(sql_engine=sql_engine)
         provider = Provider(
             name="local-mode",
             function="LOCAL_ONLINE",
@@ -408,6 +408,8 @@ class MongoDBConfig:
 @typechecked
 @dataclass
 class LocalConfig:
+    sql_engine: str = ""
+
     def software(self) -> str:
         return "localmode"
 
@@ -416,6 +418,8 @@ class LocalConfig:
 
     def serialize(self) -> bytes:
         config = {}
+        if self.sql_engine != "":
+            config["SQLEngine"] = self.sql_engine
         return bytes(json.dumps(config), "utf-8")
 
 
@@ -1885,6 +1889,7 @@ class ResourceState:
             if resource.operation_type() is OperationType.CREATE:
                 print("Creating", resource.type(), resource.name)
                 resource._create_local(db)
+        db.bump_version()
         db.close()
         return
 
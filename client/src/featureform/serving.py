@@ -12,24 +12,36 @@ import math
 import types
 import base64
 import random
+from collections import deque
+from collections.abc import Sequence
+from itertools import islice
 
 import numpy as np
 import pandas as pd
 from pandas.core.generic import NDFrame
-from pandasql import sqldf
 from featureform.proto import serving_pb2
 
 from .local_cache import LocalCache
+from .local_join import PointInTimeJoin, join_lag_features
+from .local_ingest_cache import IngestCache, ingest_cache_enabled
+from .local_online_store import LocalOnlineStore
+from .local_read_planner import SourceReader, add_columns, resource_columns
+from .local_scheduler import LocalDAGScheduler, feature_node, source_node
+from .local_sql import get_sql_engine, provider_sql_engine
+from .ondemand_cache import ondemand_function_cache
 from .local_utils import (
     get_sql_transformation_sources,
     feature_df_with_entity,
-    list_to_combined_df,
-    get_features_for_entity,
     feature_df_from_csv,
     label_df_from_csv,
-    merge_feature_into_ts,
 )
 from .sqlite_metadata import SQLiteMetadata
+from .training_data_decoder import (
+    DEFAULT_CHUNK_SIZE,
+    TrainingDataDecoder,
+    stack_columns,
+)
+from .training_set_spool import TrainingSetSpool
 from featureform.proto import serving_pb2_grpc
 
 from .resources import Model, SourceType, ComputationMode
@@ -97,6 +109,9 @@ class ServingClient:
         variant="default",
         include_label_timestamp=False,
         model: Union[str, Model] = None,
+        spool=False,
+        shard_index=0,
+        num_shards=1,
     ):
         """Return an iterator that iterates through the specified training set.
 
@@ -111,11 +126,23 @@ class ServingClient:
         Args:
             name (str): Name of training set to be retrieved
             variant (str): Variant of training set to be retrieved
+            spool (bool): Hosted only. Writes the training set to a local file on the first pass so later epochs and calls read it from disk instead of the server. The directory can be set with FEATUREFORM_SPOOL_DIR.
+            shard_index (int): Index of the shard to return, for data loader workers or distributed ranks
+            num_shards (int): Number of shards the training set is split into. Local training sets are split into contiguous row ranges; hosted ones take every num_shards-th row.
 
         Returns:
             training set (Dataset): A training set iterator
         """
-        return self.impl.training_set(name, variant, include_label_timestamp, model)
+        check_shard(shard_index, num_shards)
+        return self.impl.training_set(
+            name,
+            variant,
+            include_label_timestamp,
+            model,
+            spool,
+            shard_index,
+            num_shards,
+        )
 
     def features(self, features, entities, model: Union[str, Model] = None):
         """Returns the feature values for the specified entities.
@@ -136,6 +163,25 @@ class ServingClient:
         features = check_feature_type(features)
         return self.impl.features(features, entities, model)
 
+    def features_batch(self, features, entities, model: Union[str, Model] = None):
+        """Returns the feature values for many entities at once.
+
+        **Examples**:
+        ``` py
+            client = ff.ServingClient(local=True)
+            fpf = client.features_batch([("avg_transactions", "quickstart")], {"user": ["C1410926", "C8837983"]})
+            # Run features through model, one row per entity
+        ```
+        Args:
+            features (list[(str, str)], list[str]): List of Name Variant Tuples
+            entities (dict): Dictionary of entity name to a list of entity values
+
+        Returns:
+            features (numpy.Array): A 2-D Numpy array with one row per entity value and one column per feature
+        """
+        features = check_feature_type(features)
+        return self.impl.features_batch(features, entities, model)
+
 
 class HostedClientImpl:
     def __init__(self, host=None, insecure=False, cert_path=None):
@@ -148,6 +194,7 @@ class HostedClientImpl:
         check_up_to_date(False, "serving")
         channel = self._create_channel(host, insecure, cert_path)
         self._stub = serving_pb2_grpc.FeatureStub(channel)
+        self._spool = TrainingSetSpool()
 
     def _create_channel(self, host, insecure, cert_path):
         if insecure:
@@ -156,13 +203,63 @@ class HostedClientImpl:
             return secure_channel(host, cert_path)
 
     def training_set(
-        self, name, variation, include_label_timestamp, model: Union[str, Model] = None
+        self,
+        name,
+        variation,
+        include_label_timestamp,
+        model: Union[str, Model] = None,
+        spool=False,
+        shard_index=0,
+        num_shards=1,
     ):
-        return Dataset(self._stub).from_stub(name, variation, model)
+        shard = (shard_index, num_shards)
+        if not spool:
+            return Dataset(Stream(self._stub, name, variation, model, *shard))
+        if self._spool.exists(name, variation, *shard):
+            return Dataset.from_dataframe(
+                self._spool.read(name, variation, *shard), False
+            )
+        stream = SpooledStream(self._stub, name, variation, self._spool, model, *shard)
+        return Dataset(stream)
+
+    # Upper bound on FeatureServe requests in flight for a single features_batch call
+    MAX_IN_FLIGHT_REQUESTS = 64
 
     def features(
         self, features, entities, model: Union[str, Model] = None, params: list = None
     ):
+        req = self._feature_serve_request(features, entities, model)
+        resp = self._stub.FeatureServe(req)
+        return self._parse_feature_values(resp, features, entities, params)
+
+    def features_batch(
+        self, features, entities, model: Union[str, Model] = None, params: list = None
+    ):
+        """
+        Serves every entity with its own FeatureServe call. Calls are issued asynchronously with up to
+        MAX_IN_FLIGHT_REQUESTS outstanding so the round trips overlap instead of running back to back.
+        """
+        entity_rows = entity_rows_from_batch(entities)
+        in_flight = deque()
+        rows = []
+        for row_entities in entity_rows:
+            if len(in_flight) == self.MAX_IN_FLIGHT_REQUESTS:
+                rows.append(
+                    self._resolve_feature_future(*in_flight.popleft(), features, params)
+                )
+            req = self._feature_serve_request(features, row_entities, model)
+            in_flight.append((self._stub.FeatureServe.future(req), row_entities))
+        while in_flight:
+            rows.append(
+                self._resolve_feature_future(*in_flight.popleft(), features, params)
+            )
+        return rows_to_matrix(rows, len(features))
+
+    def _resolve_feature_future(self, future, entities, features, params):
+        return self._parse_feature_values(future.result(), features, entities, params)
+
+    @staticmethod
+    def _feature_serve_request(features, entities, model: Union[str, Model] = None):
         req = serving_pb2.FeatureServeRequest()
         for name, value in entities.items():
             entity_proto = req.entities.add()
@@ -174,16 +271,18 @@ class HostedClientImpl:
             feature_id.version = variation
         if model is not None:
             req.model.name = model if isinstance(model, str) else model.name
-        resp = self._stub.FeatureServe(req)
+        return req
 
+    def _parse_feature_values(self, resp, features, entities, params):
         feature_values = []
-        for val in resp.values:
+        for (name, variant), val in zip(features, resp.values):
             parsed_value = parse_proto_value(val)
 
             is_ondemand_feature = type(parsed_value) == bytes
             if is_ondemand_feature:
-                code = dill.loads(bytearray(parsed_value))
-                func = types.FunctionType(code, globals(), "transformation")
+                func = ondemand_function_cache.get(
+                    name, variant, parsed_value, load_ondemand_function
+                )
                 parsed_value = func(self, params, entities)
 
             feature_values.append(parsed_value)
@@ -201,6 +300,11 @@ class LocalClientImpl:
     def __init__(self):
         self.db = SQLiteMetadata()
         self.local_cache = LocalCache(self.db)
+        self.online_store = LocalOnlineStore(self.local_cache)
+        self.scheduler = LocalDAGScheduler(self)
+        self.source_reader = SourceReader(
+            IngestCache() if ingest_cache_enabled() else None
+        )
         check_up_to_date(True, "serving")
 
     def get_training_set_dataframe(
@@ -209,22 +313,38 @@ class LocalClientImpl:
         def get() -> pd.DataFrame:
             feature_columns = []
 
-            # We will build the training set DF by merging each feature one by one into it.
-            training_set_df = label_df
+            # Every feature is joined onto the labels at once by the point-in-time join engine.
+            join = PointInTimeJoin(
+                label_df, label["source_entity"], label["source_timestamp"]
+            )
             features = self.db.get_training_set_features(
                 training_set_name, training_set_variant
             )
+            # Feature frames and the transformations behind them are built concurrently
+            feature_dfs = self.scheduler.run(
+                [
+                    feature_node(feature["feature_name"], feature["feature_variant"])
+                    for feature in features
+                ]
+            )
             for feature in features:
                 feature_variant = self.db.get_feature_variant(
                     feature["feature_name"], feature["feature_variant"]
                 )
-                feature_df = self.get_feature_dataframe(feature_variant)
-                training_set_df = merge_feature_into_ts(
-                    feature_variant, label, feature_df, training_set_df
-                )
-                feature_columns.append(
-                    f"{feature['feature_name']}.{feature['feature_variant']}"
+                name_variant = f"{feature['feature_name']}.{feature['feature_variant']}"
+                join.add_feature(
+                    name_variant,
+                    feature_dfs[
+                        feature_node(
+                            feature["feature_name"], feature["feature_variant"]
+                        )
+                    ],
+                    feature_variant["source_entity"],
+                    name_variant,
+                    feature_variant["source_timestamp"],
                 )
+                feature_columns.append(name_variant)
+            training_set_df = join.join()
 
             lag_features = self.db.get_training_set_lag_features(
                 training_set_name, training_set_variant
@@ -233,7 +353,8 @@ class LocalClientImpl:
                 timestamp_column = label["source_timestamp"]
                 entity_column = label["source_entity"]
                 label_column = "label"
-                lag_sql_query = self.get_lag_features_sql_query(
+                training_set_df = join_lag_features(
+                    training_set_df,
                     lag_features,
                     feature_columns,
                     entity_column,
@@ -241,10 +362,6 @@ class LocalClientImpl:
                     timestamp_column,
                 )
 
-                globals()["source_0"] = training_set_df
-                mysql = lambda q: sqldf(q, globals())
-                training_set_df = mysql(lag_sql_query)
-
             return training_set_df
 
         return self.local_cache.get_or_put_training_set(
@@ -259,16 +376,15 @@ class LocalClientImpl:
         training_set_variant,
         include_label_timestamp,
         model: Union[str, Model] = None,
+        spool=False,
+        shard_index=0,
+        num_shards=1,
     ):
-        training_set = self.db.get_training_set_variant(
+        # Local training sets are already cached on disk, so spool has no effect
+        label, training_set_df = self.materialize_training_set(
             training_set_name, training_set_variant
         )
 
-        label = self.db.get_label_variant(
-            training_set["label_name"], training_set["label_variant"]
-        )
-        label_df = self.get_label_dataframe(label)
-
         if model is not None:
             self._register_model(
                 model,
@@ -277,107 +393,108 @@ class LocalClientImpl:
                 association_variant=training_set_variant,
             )
 
-        training_set_df = self.get_training_set_dataframe(
-            label, label_df, training_set_name, training_set_variant
-        )
+        # Cached frames are shared with the memory tier and may be read-only views of the cache
+        # file, so callers get their own copy
+        if num_shards > 1:
+            start, stop = shard_bounds(len(training_set_df), shard_index, num_shards)
+            training_set_df = training_set_df.iloc[start:stop].copy()
+        else:
+            training_set_df = training_set_df.copy()
 
         return self.convert_ts_df_to_dataset(
             label, training_set_df, include_label_timestamp
         )
 
-    def get_lag_features_sql_query(
-        self, lag_features, feature_columns, entity, label, ts
-    ):
+    def materialize_training_set(self, training_set_name, training_set_variant):
         """
-        Returns the SQL query to compute the lag features.
-        Input:
-        - lag_features: dict
-
-        Returns:
-        - sql_query: string
+        Returns the label variant and the joined frame of a training set, computing and caching
+        them together with their inputs where needed.
         """
-
-        if len(lag_features) == 0:
-            return "SELECT * FROM source_0"
-
-        features = ""
-        for f in feature_columns:
-            features = f'{features}, "{f}"' if features != "" else f'"{f}"'
-
-        MAIN_SELECT = f"SELECT {entity}, {ts}, {features}"
-        SUBQUERY = "FROM (SELECT * FROM (SELECT *, row_number FROM ("
-        INNER_QUERY = "FROM (( SELECT * FROM source_0 )"
-        CLOSING_QUERY = f") tt ) WHERE row_number=1 ORDER BY {ts} ASC ))"
-
-        lag_columns = []
-        lag_timestamps = []
-
-        LAG_QUERIES = ""
-        for i, lag_feature in enumerate(lag_features):
-            feature_column_name = (
-                f"{lag_feature['feature_name']}.{lag_feature['feature_variant']}"
+        training_set = self.db.get_training_set_variant(
+            training_set_name, training_set_variant
+        )
+        label = self.db.get_label_variant(
+            training_set["label_name"], training_set["label_variant"]
+        )
+        features = [
+            self.db.get_feature_variant(f["feature_name"], f["feature_variant"])
+            for f in self.db.get_training_set_features(
+                training_set_name, training_set_variant
             )
-            lag_feature_column_name = lag_feature["feature_new_name"]
-            lag = lag_feature["feature_lag"]
-
-            lag_query = f"""
-                         LEFT OUTER JOIN ( SELECT * FROM ( SELECT {entity} AS t{i}_entity, \"{feature_column_name}\" AS \"{lag_feature_column_name}\", {ts} AS t{i}_ts
-                         FROM source_0) 
-                         ORDER BY t{i}_ts ASC) t{i}
-                         ON (t{i}_entity = {entity} AND DATETIME(t{i}_ts, \"+{lag} seconds\") <= {ts})
-                        """
-
-            LAG_QUERIES = (
-                f"{LAG_QUERIES} {lag_query}" if LAG_QUERIES != "" else lag_query
+        ]
+        with self.source_reader.planned(self.plan_source_reads([label] + features)):
+            label_df = self.get_label_dataframe(label)
+            training_set_df = self.get_training_set_dataframe(
+                label, label_df, training_set_name, training_set_variant
             )
-            MAIN_SELECT = f'{MAIN_SELECT}, "{lag_feature_column_name}"'
+        return label, training_set_df
 
-            lag_columns.append(f'"{lag_feature_column_name}"')
-            lag_timestamps.append(f"t{i}_ts")
-
-        lag_columns = ", ".join(lag_columns)
-        lag_timestamps = " DESC, ".join(lag_timestamps)
-
-        INNER_SELECT = f"SELECT {entity}, {ts}, {label}, {features}, {lag_columns}, ROW_NUMBER() over (PARTITION BY {entity}, {label}, {ts} ORDER BY {ts} DESC, {lag_timestamps} DESC) as row_number"
-        FULL_QUERY = f"{MAIN_SELECT}, {label} {SUBQUERY} {INNER_SELECT} {INNER_QUERY} {LAG_QUERIES} {CLOSING_QUERY}"
-
-        return FULL_QUERY
+    def plan_source_reads(self, resources):
+        """
+        Returns the columns each primary source file must provide to build the given feature and
+        label variants. Files read by the transformations behind them need every column.
+        """
+        columns = {}
+        for resource in resources:
+            name, variant = resource["source_name"], resource["source_variant"]
+            if self.is_primary_source(name, variant):
+                path = self.db.get_source_variant(name, variant)["definition"]
+                add_columns(columns, path, resource_columns(resource))
+                continue
+            for _, input_name, input_variant in self.scheduler.resolve(
+                [source_node(name, variant)]
+            ):
+                if self.is_primary_source(input_name, input_variant):
+                    source = self.db.get_source_variant(input_name, input_variant)
+                    add_columns(columns, source["definition"], None)
+        return columns
+
+    def is_primary_source(self, name, variant):
+        return (
+            self.db.is_transformation(name, variant) == SourceType.PRIMARY_SOURCE.value
+        )
 
-    def get_input_df(self, source_name, source_variant):
+    def get_input_df(self, source_name, source_variant, inputs=None):
+        """
+        Returns the frame of a source. inputs holds frames already computed by the scheduler.
+        """
+        if inputs is not None and source_node(source_name, source_variant) in inputs:
+            return inputs[source_node(source_name, source_variant)]
         if (
             self.db.is_transformation(source_name, source_variant)
             == SourceType.PRIMARY_SOURCE
         ):
             source = self.db.get_source_variant(source_name, source_variant)
             file_path = source["definition"]
-            if FileFormat.get_format(file_path) == FileFormat.CSV:
-                df = pd.read_csv(file_path)
-            elif FileFormat.get_format(file_path) == FileFormat.PARQUET:
-                df = pd.read_parquet(file_path)
-            else:
+            if not FileFormat.is_supported(file_path):
                 raise ValueError(f"Unsupported file format for {file_path}")
-            return df
+            return self.source_reader.read(file_path)
         else:
-            df = self.process_transformation(source_name, source_variant)
+            df = self.process_transformation(source_name, source_variant, inputs)
         return df
 
-    def sql_transformation(self, query):
+    def sql_transformation(self, query, provider="", inputs=None):
+        tables = {}
         transformation_sources = get_sql_transformation_sources(query)
         for i, (source_name, source_variant) in enumerate(transformation_sources):
-            # Creates a variable called dataframes_i which stores the corresponding df for each input
+            # Each input is exposed to the engine as a table called dataframes_i
             df_variable = f"dataframes_{i}"
-            # globals()[df_variable]:
-            # 1. Converts a string "dataframes_i" to a variable name
-            # 2. Assigns a global scope to the variable, to access it outside the loop
-            globals()[df_variable] = self.get_input_df(source_name, source_variant)
+            tables[df_variable] = self.get_input_df(source_name, source_variant, inputs)
 
             # using '+' signs for readability
             query_source_to_replace = "{{" + f"{source_name}.{source_variant}" + "}}"
             query = query.replace(query_source_to_replace, df_variable)
 
-        return sqldf(query, globals())
+        return self.get_sql_engine(provider).execute(query, tables)
+
+    def get_sql_engine(self, provider):
+        return get_sql_engine(provider_sql_engine(self.db, provider))
+
+    def process_transformation(self, name, variant, inputs=None):
+        if inputs is None:
+            node = source_node(name, variant)
+            return self.scheduler.run([node])[node]
 
-    def process_transformation(self, name, variant):
         def get():
             source = self.db.get_source_variant(name, variant)
             if (
@@ -385,17 +502,20 @@ class LocalClientImpl:
                 == SourceType.SQL_TRANSFORMATION.value
             ):
                 query = source["definition"]
-                new_data = self.sql_transformation(query)
+                new_data = self.sql_transformation(query, source["provider"], inputs)
             else:
                 code = dill.loads(bytearray(source["definition"]))
-                inputs = json.loads(source["inputs"])
+                dependencies = json.loads(source["inputs"])
                 dataframes = []
-                for input in inputs:
+                for input in dependencies:
                     source_name, source_variant = (
                         input[0],
                         input[1],
                     )
-                    dataframes.append(self.get_input_df(source_name, source_variant))
+                    df = self.get_input_df(source_name, source_variant, inputs)
+                    # Scheduled inputs can be shared with other transformations, which
+                    # must not see this one's in-place changes
+                    dataframes.append(df.copy())
                 func = types.FunctionType(code, globals(), "transformation")
                 new_data = func(*dataframes)
             return new_data
@@ -404,8 +524,6 @@ class LocalClientImpl:
             resource_type="transformation",
             resource_name=name,
             resource_variant=variant,
-            source_name=name,
-            source_variant=variant,
             func=get,
         )
 
@@ -423,7 +541,9 @@ class LocalClientImpl:
                 label_source = self.db.get_source_variant(
                     label["source_name"], label["source_variant"]
                 )
-                label_df = label_df_from_csv(label, label_source["definition"])
+                label_df = label_df_from_csv(
+                    label, label_source["definition"], self.source_reader
+                )
             label_df.rename(columns={label["source_value"]: "label"}, inplace=True)
             return label_df
 
@@ -431,8 +551,6 @@ class LocalClientImpl:
             resource_type="label",
             resource_name=label["name"],
             resource_variant=label["variant"],
-            source_name=label["source_name"],
-            source_variant=label["source_variant"],
             func=get,
         )
 
@@ -454,7 +572,7 @@ class LocalClientImpl:
         df.set_index(label["source_entity"])
         return df
 
-    def get_feature_dataframe(self, feature) -> NDFrame:
+    def get_feature_dataframe(self, feature, inputs=None) -> NDFrame:
         def get() -> pd.DataFrame:
             name_variant = feature["name"] + "." + feature["variant"]
             transform_type = self.db.is_transformation(
@@ -464,12 +582,14 @@ class LocalClientImpl:
                 transform_type == SourceType.SQL_TRANSFORMATION.value
                 or transform_type == SourceType.DF_TRANSFORMATION.value
             ):
-                feature_df = self.feature_df_from_transformation(feature)
+                feature_df = self.feature_df_from_transformation(feature, inputs)
             else:
                 source = self.db.get_source_variant(
                     feature["source_name"], feature["source_variant"]
                 )
-                feature_df = feature_df_from_csv(feature, source["definition"])
+                feature_df = feature_df_from_csv(
+                    feature, source["definition"], self.source_reader
+                )
             feature_df.set_index(feature["source_entity"])
             feature_df.rename(
                 columns={feature["source_value"]: name_variant}, inplace=True
@@ -480,14 +600,12 @@ class LocalClientImpl:
             resource_type="feature",
             resource_name=feature["name"],
             resource_variant=feature["variant"],
-            source_name=feature["source_name"],
-            source_variant=feature["source_variant"],
             func=get,
         )
 
-    def feature_df_from_transformation(self, feature):
-        df = self.process_transformation(
-            feature["source_name"], feature["source_variant"]
+    def feature_df_from_transformation(self, feature, inputs=None):
+        df = self.get_input_df(
+            feature["source_name"], feature["source_variant"], inputs
         )
         if isinstance(df, pd.Series):
             df = df.to_frame()
@@ -523,11 +641,22 @@ class LocalClientImpl:
         # This code assumes that the entities dictionary only has one entity
         entity_id = list(entities.keys())[0]
         entity_value = entities[entity_id]
-        all_features_list = self.add_feature_dfs_to_list(
-            feature_variant_list, entity_id
-        )
-        all_features_df = list_to_combined_df(all_features_list, entity_id)
-        features = get_features_for_entity(entity_id, entity_value, all_features_df)
+        feature_values = []
+        for i, (f_name, f_variant) in enumerate(feature_variant_list):
+            f_mode = self.db.get_feature_variant_mode(f_name, f_variant)
+            if f_mode == ComputationMode.CLIENT_COMPUTED:
+                feature_values.append(
+                    self.calculate_ondemand_feature(f_name, f_variant)
+                )
+                continue
+
+            table = self.get_online_table(f_name, f_variant, entity_id)
+            if entity_value in table:
+                feature_values.append(table[entity_value])
+            elif i == 0:
+                raise Exception(f"No matching entities for {entity_id}: {entity_value}")
+            else:
+                feature_values.append(np.nan)
 
         if model is not None:
             for feature_name, feature_variant in feature_variant_list:
@@ -538,48 +667,91 @@ class LocalClientImpl:
                     association_variant=feature_variant,
                 )
 
-        return features
+        return to_row_array(feature_values)
 
-    def add_feature_dfs_to_list(self, feature_variant_list, entity_id):
-        feature_df_list = []
+    def features_batch(
+        self,
+        feature_variant_list,
+        entities,
+        model: Union[str, Model] = None,
+        params: list = None,
+    ):
+        """
+        Looks up every entity value for a feature with a single vectorized probe of its online table.
+        Entity values that a feature has no value for are returned as NaN.
+        """
+        if len(feature_variant_list) == 0:
+            raise Exception("No features provided")
 
-        for feature_variant in feature_variant_list:
-            f_name = feature_variant[0]
-            f_variant = feature_variant[1]
-            f_mode = self.db.get_feature_variant_mode(f_name, f_variant)
+        params = params if params else []
+        # As with features, only the first entity is used for the lookup
+        entity_id = list(entities.keys())[0]
+        entity_values = list(entities[entity_id])
+        modes = [
+            self.db.get_feature_variant_mode(f_name, f_variant)
+            for f_name, f_variant in feature_variant_list
+        ]
+        # Online tables built by this call share one read of each source file
+        planned = [
+            self.db.get_feature_variant(f_name, f_variant)
+            for (f_name, f_variant), f_mode in zip(feature_variant_list, modes)
+            if f_mode != ComputationMode.CLIENT_COMPUTED
+        ]
+        columns = []
+        with self.source_reader.planned(self.plan_source_reads(planned)):
+            for (f_name, f_variant), f_mode in zip(feature_variant_list, modes):
+                if f_mode == ComputationMode.CLIENT_COMPUTED:
+                    func = self.get_ondemand_function(f_name, f_variant)
+                    columns.append(
+                        to_row_array(
+                            [func(self, params, {entity_id: v}) for v in entity_values]
+                        )
+                    )
+                else:
+                    table = self.get_online_table(f_name, f_variant, entity_id)
+                    columns.append(table.take(entity_values))
 
-            if f_mode == ComputationMode.CLIENT_COMPUTED:
-                feature_df = self.calculate_ondemand_feature(
-                    f_name, f_variant, entity_id
+        if model is not None:
+            for feature_name, feature_variant in feature_variant_list:
+                self._register_model(
+                    model,
+                    look_up_table="model_features",
+                    association_name=feature_name,
+                    association_variant=feature_variant,
                 )
-            else:
-                feature_df = self.get_precomputed_feature(f_name, f_variant, entity_id)
 
-            feature_df_list.append(feature_df)
+        return columns_to_matrix(columns, len(entity_values))
 
-        return feature_df_list
-
-    def get_precomputed_feature(self, f_name, f_variant, entity_id):
+    def get_online_table(self, f_name, f_variant, entity_id):
         feature = self.db.get_feature_variant(f_name, f_variant)
         source_name, source_variant = feature["source_name"], feature["source_variant"]
         if feature["entity"] != entity_id:
             raise ValueError(
                 f"Invalid entity {entity_id} for feature {source_name}-{source_variant}"
             )
-        if (
-            self.db.is_transformation(source_name, source_variant)
-            != SourceType.PRIMARY_SOURCE.value
-        ):
-            feature_df = self.process_non_primary_df_transformation(
-                feature, source_name, source_variant, entity_id
-            )
-        else:
+
+        def get() -> pd.DataFrame:
+            if (
+                self.db.is_transformation(source_name, source_variant)
+                != SourceType.PRIMARY_SOURCE.value
+            ):
+                return self.process_non_primary_df_transformation(
+                    feature, source_name, source_variant, entity_id
+                )
             source = self.db.get_source_variant(source_name, source_variant)
-            feature_df = feature_df_with_entity(
-                source["definition"], entity_id, feature
+            return feature_df_with_entity(
+                source["definition"], entity_id, feature, self.source_reader
             )
 
-        return feature_df
+        return self.online_store.get_or_build(
+            name=f_name,
+            variant=f_variant,
+            source_name=source_name,
+            source_variant=source_variant,
+            entity_column=entity_id,
+            value_column=f"{f_name}.{f_variant}",
+            func=get,
+        )
 
     def process_non_primary_df_transformation(
         self, feature, source_name, source_variant, entity_id
@@ -609,23 +781,18 @@ class LocalClientImpl:
         feature_df.set_index(entity_id)
         return feature_df
 
-    def calculate_ondemand_feature(self, f_name, f_variant, entity_id):
+    def calculate_ondemand_feature(self, f_name, f_variant):
+        func = self.get_ondemand_function(f_name, f_variant)
+        return func(self, self.params, self.entities)
+
+    def get_ondemand_function(self, f_name, f_variant):
         query = self.db.get_ondemand_feature_query(f_name, f_variant)
-        base64_bytes = query.encode("ascii")
-        query = base64.b64decode(base64_bytes)
-
-        code = dill.loads(bytearray(query))
-        func = types.FunctionType(code, globals(), "transformation")
-        output_value = func(self, self.params, self.entities)
-
-        feature_col_name = f"{f_name}.{f_variant}"
-        df = pd.DataFrame.from_dict(
-            {
-                entity_id: [self.entities.get(entity_id, "")],
-                feature_col_name: [output_value],
-            }
+        return ondemand_function_cache.get(
+            f_name,
+            f_variant,
+            query,
+            lambda q: load_ondemand_function(base64.b64decode(q.encode("ascii"))),
         )
-        return df
 
     @staticmethod
     def convert_ts_df_to_dataset(label_row, trainingset_df, include_label_timestamp):
@@ -654,11 +821,20 @@ class LocalClientImpl:
         self.db.insert(look_up_table, name, association_name, association_variant)
 
     def get_source_as_df(self, name, variant):
-        return self.get_input_df(name, variant)
+        # A copy, as in training_set, so the caller can modify it
+        return self.get_input_df(name, variant).copy()
 
 
 class Stream:
-    def __init__(self, stub, name, version, model: Union[str, Model] = None):
+    def __init__(
+        self,
+        stub,
+        name,
+        version,
+        model: Union[str, Model] = None,
+        shard_index=0,
+        num_shards=1,
+    ):
         req = serving_pb2.TrainingDataRequest()
         req.id.name = name
         req.id.version = version
@@ -666,9 +842,18 @@ class Stream:
             req.model.name = model if isinstance(model, str) else model.name
         self.name = name
         self.version = version
+        self.shard_index = shard_index
+        self.num_shards = num_shards
         self._stub = stub
         self._req = req
-        self._iter = stub.TrainingData(req)
+        self._iter = self._open()
+        self._decoder = TrainingDataDecoder()
+
+    def _open(self):
+        rows = self._stub.TrainingData(self._req)
+        if self.num_shards == 1:
+            return rows
+        return islice(rows, self.shard_index, None, self.num_shards)
 
     def __iter__(self):
         return self
@@ -676,24 +861,146 @@ class Stream:
     def __next__(self):
         return Row(next(self._iter))
 
+    def next_batch(self, batch_size):
+        """
+        Decodes up to batch_size rows into typed column buffers and returns them as one BatchRow.
+        """
+        chunk = self._decoder.decode(islice(self._iter, batch_size), batch_size)
+        if chunk is None:
+            raise StopIteration
+        return BatchRow(chunk.columns)
+
+    def chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Yields the rest of the stream as DecodedChunks of typed column arrays. Each chunk can also
+        be converted to a 2-D array with to_numpy() or an Arrow record batch with to_arrow().
+        """
+        decoder = TrainingDataDecoder(chunk_size)
+        return decoder.chunks(self._iter)
+
+    def restart(self):
+        self._iter = self._open()
+
+
+class SpooledStream(Stream):
+    def __init__(
+        self,
+        stub,
+        name,
+        version,
+        spool,
+        model: Union[str, Model] = None,
+        shard_index=0,
+        num_shards=1,
+    ):
+        """
+        Streams a hosted training set once while writing it to the spool. When the first pass
+        completes, restarts read the spooled copy instead of fetching the training set again.
+        """
+        super().__init__(stub, name, version, model, shard_index, num_shards)
+        self._spool = spool
+        self._shard = (shard_index, num_shards)
+        self._writer = spool.writer(name, version, *self._shard)
+        self._local = None
+
+    def __next__(self):
+        if self._local is not None:
+            return next(self._local)
+        try:
+            proto_row = next(self._iter)
+        except StopIteration:
+            self._finish_spool()
+            raise
+        self._writer.add_row(decode_proto_row(proto_row))
+        return Row(proto_row)
+
+    def next_batch(self, batch_size):
+        if self._local is not None:
+            return self._local.next_batch(batch_size)
+        try:
+            batch = super().next_batch(batch_size)
+        except StopIteration:
+            self._finish_spool()
+            raise
+        self._writer.add_columns(batch.columns())
+        return batch
+
+    def _finish_spool(self):
+        if self._writer.close():
+            df = self._spool.read(self.name, self.version, *self._shard)
+            self._local = LocalStream(frame_columns(df), False)
+            self._local._index = len(df)
+
     def restart(self):
-        self._iter = self._stub.TrainingData(self._req)
+        if self._local is not None:
+            self._local.restart()
+            return
+        # A partial first pass can't be reused, so spool the next one from scratch
+        self._writer.abort()
+        self._writer = self._spool.writer(self.name, self.version, *self._shard)
+        super().restart()
 
 
 class LocalStream:
-    def __init__(self, datalist, include_label_timestamp):
-        self._datalist = datalist
-        self._iter = iter(datalist)
+    def __init__(self, data, include_label_timestamp):
+        """
+        Streams a training set held as a 2-D array, or as a list of column arrays when its columns
+        have different dtypes. Batches are slices of the columns, so they keep each column's dtype.
+        Rows are views of a 2-D array, which is only built from the columns on first row access.
+        """
+        if isinstance(data, np.ndarray):
+            self._rows = data
+            self._columns = None
+            self._length = len(data)
+        else:
+            self._rows = None
+            self._columns = list(data)
+            self._length = len(self._columns[0]) if self._columns else 0
+        self._index = 0
         self._include_label_timestamp = include_label_timestamp
 
     def __iter__(self):
-        return iter(self._iter)
+        return self
 
     def __next__(self):
-        return LocalRow(next(self._iter), self._include_label_timestamp)
+        if self._index >= self._length:
+            raise StopIteration
+        row = self.row(self._index)
+        self._index += 1
+        return row
+
+    def row(self, index):
+        if self._rows is None:
+            self._rows = stack_columns(self._columns)
+        return LocalRow(self._rows[index], self._include_label_timestamp)
+
+    def take(self, indices):
+        """
+        Returns the rows at indices as a BatchRow; unlike next_batch this copies them.
+        """
+        return BatchRow(self._select(indices), self._include_label_timestamp)
+
+    def next_batch(self, batch_size):
+        """
+        Returns the next batch_size rows as a BatchRow over a slice of the data.
+        """
+        if self._index >= self._length:
+            raise StopIteration
+        stop = min(self._index + batch_size, self._length)
+        rows = self._select(slice(self._index, stop))
+        self._index = stop
+        return BatchRow(rows, self._include_label_timestamp)
+
+    def _select(self, rows):
+        if self._columns is None:
+            return self._rows[rows]
+        return [column[rows] for column in self._columns]
+
+    def __len__(self):
+        return self._length
 
     def restart(self):
-        self._iter = iter(self._datalist)
+        self._index = 0
 
 
 class Repeat:
@@ -717,15 +1024,27 @@ class Repeat:
 
         return next_val
 
+    def next_batch(self, batch_size):
+        try:
+            return self._stream.next_batch(batch_size)
+        except StopIteration:
+            self.repeat_num -= 1
+            if self.repeat_num >= 0:
+                self._stream.restart()
+                return self._stream.next_batch(batch_size)
+            raise
+
 
 class Shuffle:
-    def __init__(self, buffer_size, stream):
+    def __init__(self, buffer_size, stream, seed=None):
         self.buffer_size = buffer_size
         self._shuffled_data_list = []
         self._stream = stream
+        self._random = random.Random(seed)
         self.__setup_buffer()
 
     def __setup_buffer(self):
+        self._shuffled_data_list = []
         try:
             for _ in range(self.buffer_size):
                 self._shuffled_data_list.append(next(self._stream))
@@ -742,16 +1061,64 @@ class Shuffle:
     def __next__(self):
         if len(self._shuffled_data_list) == 0:
             raise StopIteration
-        random_index = random.randrange(len(self._shuffled_data_list))
-        next_row = self._shuffled_data_list.pop(random_index)
+        random_index = self._random.randrange(len(self._shuffled_data_list))
+        next_row = self._shuffled_data_list[random_index]
 
+        # The next row takes the slot of the one returned; once the stream is drained the last
+        # row is swapped in instead, so both cases are O(1)
         try:
-            self._shuffled_data_list.append(next(self._stream))
+            self._shuffled_data_list[random_index] = next(self._stream)
         except StopIteration:
-            pass
+            self._shuffled_data_list[random_index] = self._shuffled_data_list[-1]
+            self._shuffled_data_list.pop()
 
         return next_row
 
+    def next_batch(self, batch_size):
+        rows = list(islice(self, batch_size))
+        if len(rows) == 0:
+            raise StopIteration
+        return BatchRow.from_rows(rows)
+
+
+class LocalShuffle:
+    def __init__(self, stream, seed=None):
+        """
+        Shuffles a LocalStream by visiting its rows in a random permutation that is redrawn for every
+        epoch. Rows and batches are gathered by index from the stream's array, and a seed makes the
+        sequence of permutations reproducible.
+        """
+        self._stream = stream
+        self._rng = np.random.default_rng(seed)
+        self.__permute()
+
+    def __permute(self):
+        self._order = self._rng.permutation(len(self._stream))
+        self._index = 0
+
+    def restart(self):
+        self.__permute()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._index >= len(self._order):
+            raise StopIteration
+        row = self._stream.row(self._order[self._index])
+        self._index += 1
+        return row
+
+    def next_batch(self, batch_size):
+        if self._index >= len(self._order):
+            raise StopIteration
+        indices = self._order[self._index : self._index + batch_size]
+        self._index += len(indices)
+        return self._stream.take(indices)
+
+    def __len__(self):
+        return len(self._stream)
+
 
 class Batch:
     def __init__(self, batch_size, stream):
@@ -765,16 +1132,19 @@ class Batch:
         return self
 
     def __next__(self):
-        rows = BatchRow()
-        for _ in range(self.batch_size):
+        # A batch can span several calls when it crosses the end of a repeated stream
+        batches = []
+        count = 0
+        while count < self.batch_size:
             try:
-                next_row = next(self._stream)
-                rows.append(next_row)
+                batch = self._stream.next_batch(self.batch_size - count)
             except StopIteration:
-                if len(rows) == 0:
-                    raise
-                return rows
-        return rows
+                break
+            batches.append(batch)
+            count += len(batch)
+        if len(batches) == 0:
+            raise StopIteration
+        return BatchRow.concat(batches)
 
 
 class Dataset:
@@ -789,17 +1159,25 @@ class Dataset:
         """
         self._stream = stream
         self._dataframe = dataframe
+        self._plan = DataframePlan()
 
     def from_stub(self, name, version, model: Union[str, Model] = None):
         stream = Stream(self._stream, name, version, model)
         return Dataset(stream)
 
     def from_dataframe(dataframe, include_label_timestamp):
-        stream = LocalStream(dataframe.values.tolist(), include_label_timestamp)
+        # A frame with a single dtype is streamed as a view of its values; mixed frames keep
+        # one array per column so batches don't box every value
+        if dataframe.dtypes.nunique() <= 1:
+            stream = LocalStream(dataframe.to_numpy(), include_label_timestamp)
+        else:
+            stream = LocalStream(frame_columns(dataframe), include_label_timestamp)
         return Dataset(stream, dataframe)
 
     def pandas(self):
-        return self._dataframe
+        if self._dataframe is None:
+            return None
+        return self._plan.apply(self._dataframe)
 
     def repeat(self, num):
         """Repeats the Dataset for the specified number of times
@@ -821,15 +1199,15 @@ class Dataset:
         if num <= 0:
             raise Exception("Must repeat 1 or more times")
         self._stream = Repeat(num, self._stream)
-        if self._dataframe is not None:
-            temp_df = self._dataframe
-            for i in range(num):
-                self._dataframe = self._dataframe.append(temp_df)
+        self._plan.repeat(num)
         return self
 
-    def shuffle(self, buffer_size):
+    def shuffle(self, buffer_size, seed: int = None):
         """Swaps random rows within the Dataset.
 
+        Local datasets are shuffled with a full random permutation that is redrawn every epoch, so
+        buffer_size only limits how far rows can move in hosted datasets.
+
         **Examples**:
         ``` py
             client = ff.ServingClient()
@@ -840,15 +1218,23 @@ class Dataset:
         ```
         Args:
             buffer_size (int): The number of Dataset rows to be randomly swapped
+            seed (int): Seed that makes the order of the rows reproducible
 
         Returns:
             self (Dataset): Returns the current Dataset
         """
         if buffer_size <= 0:
             raise Exception("Buffer size must be greater than or equal to 1")
-        self._stream = Shuffle(buffer_size, self._stream)
-        if self._dataframe is not None:
-            self._dataframe = self._dataframe.sample(frac=1)
+        if isinstance(self._stream, LocalStream):
+            self._stream = LocalShuffle(self._stream, seed)
+        elif isinstance(self._stream, Repeat) and isinstance(
+            self._stream._stream, LocalStream
+        ):
+            # Each repeat restarts the shuffle, which draws a new permutation for that epoch
+            self._stream._stream = LocalShuffle(self._stream._stream, seed)
+        else:
+            self._stream = Shuffle(buffer_size, self._stream, seed)
+        self._plan.shuffle(seed)
         return self
 
     def batch(self, batch_size):
@@ -871,10 +1257,7 @@ class Dataset:
         if batch_size <= 0:
             raise Exception("Batch size must be greater than or equal to 1")
         self._stream = Batch(batch_size, self._stream)
-        if self._dataframe is not None:
-            self._dataframe = np.array_split(
-                self._dataframe, math.ceil(len(self._dataframe) // batch_size)
-            )
+        self._plan.batch(batch_size)
         return self
 
     def __iter__(self):
@@ -885,13 +1268,75 @@ class Dataset:
         return next_val
 
 
+class DataframePlan:
+    def __init__(self):
+        """
+        Records the repeat, shuffle and batch steps of a Dataset so pandas() can apply them on
+        demand. The steps only ever rearrange row positions; the frame itself is indexed once at
+        the end, and batches are sliced when they are accessed.
+        """
+        self._steps = []
+
+    def repeat(self, num):
+        self._steps.append(("repeat", num))
+
+    def shuffle(self, seed=None):
+        self._steps.append(("shuffle", seed))
+
+    def batch(self, batch_size):
+        self._steps.append(("batch", batch_size))
+
+    def apply(self, dataframe):
+        if len(self._steps) == 0:
+            return dataframe
+
+        positions = np.arange(len(dataframe))
+        batches = None
+        for step, arg in self._steps:
+            if step == "repeat" and batches is None:
+                positions = np.tile(positions, arg + 1)
+            elif step == "repeat":
+                batches = batches * (arg + 1)
+            elif step == "shuffle" and batches is None:
+                positions = np.random.default_rng(arg).permutation(positions)
+            elif step == "shuffle":
+                order = np.random.default_rng(arg).permutation(len(batches))
+                batches = [batches[i] for i in order]
+            else:
+                if batches is not None:
+                    positions = np.concatenate(batches)
+                num_batches = max(1, math.ceil(len(positions) / arg))
+                batches = np.array_split(positions, num_batches)
+
+        if batches is None:
+            return dataframe.iloc[positions]
+        return DataframeBatches(dataframe, batches)
+
+
+class DataframeBatches(Sequence):
+    def __init__(self, dataframe, batches):
+        """
+        A list-like view of a frame split into batches of row positions. Each batch is only
+        materialized as a DataFrame when it is accessed.
+        """
+        self._dataframe = dataframe
+        self._batches = batches
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return DataframeBatches(self._dataframe, self._batches[index])
+        return self._dataframe.iloc[self._batches[index]]
+
+    def __len__(self):
+        return len(self._batches)
+
+
 class Row:
     def __init__(self, proto_row):
-        features = np.array(
-            [parse_proto_value(feature) for feature in proto_row.features]
-        )
-        self._label = parse_proto_value(proto_row.label)
-        self._row = np.append(features, self._label)
+        values = decode_proto_row(proto_row)
+        self._label = values[-1]
+        self._row = to_row_array(values)
+        self.include_label_timestamp = False
 
     def features(self):
         return [self._row[:-1]]
@@ -907,15 +1352,17 @@ class Row:
 
 
 class LocalRow:
-    def __init__(self, row_list, include_label_timestamp):
+    def __init__(self, row: np.ndarray, include_label_timestamp):
         """
         If include_label_timestamp is true then we want the label to equal to the
-        last two columns in the list. Otherwise, just the label will be the last column only.
+        last two columns in the row. Otherwise, just the label will be the last column only.
+        The features and the label are views of the row.
         """
 
-        self._features = row_list[:-2] if include_label_timestamp else row_list[:-1]
-        self._row = row_list
-        self._label = row_list[-2:] if include_label_timestamp else row_list[-1]
+        self._features = row[:-2] if include_label_timestamp else row[:-1]
+        self._row = row
+        self._label = row[-2:] if include_label_timestamp else row[-1]
+        self.include_label_timestamp = include_label_timestamp
 
     def features(self):
         return [self._features]
@@ -924,38 +1371,167 @@ class LocalRow:
         return [self._label]
 
     def to_numpy(self):
-        return np.array(self._row)
+        return self._row
 
     def __repr__(self):
         return "Features: {} , Label: {}".format(self.features(), self.label())
 
 
 class BatchRow:
-    def __init__(self, rows=None):
-        self._features = []
-        self._labels = []
-        if rows is None:
-            rows = []
-        self._rows = rows
-        for row in rows:
-            self.append(row)
-
-    def append(self, row):
-        self._features.append(row.features()[0])
-        self._labels.append(row.label()[0])
-        self._rows.append(row)
+    def __init__(self, rows, include_label_timestamp=False):
+        """
+        A batch of rows stored as one (batch_size, n_columns) array, or as a list of column arrays
+        that keep their own dtypes. features() and label() are shaped (batch_size, n_features) and
+        (batch_size,), or (batch_size, 2) when the label timestamp is included; they are views of
+        a 2-D array, while column lists are only combined when features() or to_numpy() is
+        called. A label column is returned with its own dtype.
+        """
+        if isinstance(rows, np.ndarray):
+            self._rows = rows
+            self._columns = None
+        else:
+            self._rows = None
+            self._columns = list(rows)
+        self._include_label_timestamp = include_label_timestamp
+
+    @staticmethod
+    def from_rows(rows):
+        return BatchRow(
+            np.stack([row.to_numpy() for row in rows]),
+            rows[0].include_label_timestamp,
+        )
+
+    @staticmethod
+    def concat(batches):
+        if len(batches) == 1:
+            return batches[0]
+        include_label_timestamp = batches[0]._include_label_timestamp
+        if all(batch._columns is None for batch in batches):
+            return BatchRow(
+                np.concatenate([batch.to_numpy() for batch in batches]),
+                include_label_timestamp,
+            )
+        columns = zip(*[batch.columns() for batch in batches])
+        return BatchRow(
+            [np.concatenate(column) for column in columns], include_label_timestamp
+        )
+
+    def _label_width(self):
+        return 2 if self._include_label_timestamp else 1
+
+    def columns(self):
+        """
+        Returns one array per column, features first, each with the column's own dtype.
+        """
+        if self._columns is None:
+            return [self._rows[:, i] for i in range(self._rows.shape[1])]
+        return self._columns
 
     def features(self):
-        return self._features
+        if self._columns is None:
+            return self._rows[:, : -self._label_width()]
+        return stack_columns(self._columns[: -self._label_width()])
 
     def label(self):
-        return self._labels
+        if self._columns is None:
+            return (
+                self._rows[:, -2:]
+                if self._include_label_timestamp
+                else self._rows[:, -1]
+            )
+        if self._include_label_timestamp:
+            return stack_columns(self._columns[-2:])
+        return self._columns[-1]
 
-    def to_list(self):
+    def to_numpy(self):
+        if self._rows is None:
+            self._rows = stack_columns(self._columns)
         return self._rows
 
+    def to_list(self):
+        return [LocalRow(row, self._include_label_timestamp) for row in self.to_numpy()]
+
     def __len__(self):
-        return len(self._rows)
+        if self._columns is None:
+            return len(self._rows)
+        return len(self._columns[0]) if self._columns else 0
+
+
+def frame_columns(df: pd.DataFrame):
+    return [df.iloc[:, i].to_numpy() for i in range(df.shape[1])]
+
+
+def to_row_array(values):
+    """
+    Converts a list of feature values to a NumPy array, keeping mixed and string values as objects
+    the same way a DataFrame row would.
+    """
+    row = np.array(values)
+    if row.dtype.kind in "US":
+        row = np.array(values, dtype=object)
+    return row
+
+
+def entity_rows_from_batch(entities):
+    """
+    Turns {"user": ["a", "b"], "item": ["x", "y"]} into [{"user": "a", "item": "x"}, {"user": "b", "item": "y"}].
+    """
+    names = list(entities.keys())
+    values = [list(entities[name]) for name in names]
+    if len(set(len(v) for v in values)) > 1:
+        raise ValueError("All entities in a batch must have the same number of values")
+    return [dict(zip(names, row)) for row in zip(*values)]
+
+
+def columns_to_matrix(columns, num_rows):
+    """
+    Stacks per-feature value arrays into a (num_rows, num_features) array. Numeric columns keep a
+    numeric dtype; anything else is stored as objects.
+    """
+    if all(column.dtype.kind in "biuf" for column in columns):
+        return np.column_stack(columns) if columns else np.empty((num_rows, 0))
+    matrix = np.empty((num_rows, len(columns)), dtype=object)
+    for i, column in enumerate(columns):
+        matrix[:, i] = column
+    return matrix
+
+
+def rows_to_matrix(rows, num_columns):
+    if len(rows) == 0:
+        return np.empty((0, num_columns))
+    return columns_to_matrix(
+        [to_row_array([row[i] for row in rows]) for i in range(num_columns)], len(rows)
+    )
+
+
+def check_shard(shard_index, num_shards):
+    if num_shards < 1:
+        raise ValueError("num_shards must be greater than or equal to 1")
+    if shard_index < 0 or shard_index >= num_shards:
+        raise ValueError(f"shard_index must be between 0 and {num_shards - 1}")
+
+
+def shard_bounds(num_rows, shard_index, num_shards):
+    """
+    Returns the [start, stop) row range of a shard. Shard sizes differ by at most one row.
+    """
+    start = num_rows * shard_index // num_shards
+    stop = num_rows * (shard_index + 1) // num_shards
+    return start, stop
+
+
+def decode_proto_row(proto_row):
+    """
+    Returns the decoded feature values of a TrainingDataRow followed by its label.
+    """
+    values = [parse_proto_value(feature) for feature in proto_row.features]
+    values.append(parse_proto_value(proto_row.label))
+    return values
+
+
+def load_ondemand_function(serialized_code):
+    code = dill.loads(bytearray(serialized_code))
+    return types.FunctionType(code, globals(), "transformation")
 
 
 def parse_proto_value(value):
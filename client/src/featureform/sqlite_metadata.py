@@ -1,8 +1,24 @@
+import functools
 import json
 import sqlite3
 from threading import Lock
 import os
 
+# Tables whose rows are served from the in-memory snapshot, any write to them invalidates it
+SNAPSHOT_TABLES = {
+    "feature_variant",
+    "feature_computation_mode",
+    "ondemand_feature_variant",
+    "training_set_variant",
+    "training_set_features",
+    "training_set_lag_features",
+    "label_variant",
+    "providers",
+    "source_variant",
+    "tags",
+    "properties",
+}
+
 
 class SyncSQLExecutor:
     def __init__(self, conn):
@@ -30,16 +46,91 @@ class SyncSQLExecutor:
             return self.__conn.commit()
 
 
+class WriteCounter:
+    """
+    Process-wide counter that is bumped whenever resource definitions are written. Snapshots
+    compare it against the value they were filled at to know when they are stale.
+    """
+
+    def __init__(self):
+        self.__value = 0
+        self.__lock = Lock()
+
+    def bump(self):
+        with self.__lock:
+            self.__value += 1
+
+    @property
+    def value(self):
+        return self.__value
+
+
+write_counter = WriteCounter()
+
+
+def snapshot_read(method):
+    """
+    Serves the decorated read from the SQLiteMetadata snapshot, only querying SQLite on a miss.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        return self._read_through(
+            (method.__name__,) + args, lambda: method(self, *args)
+        )
+
+    return wrapper
+
+
 class SQLiteMetadata:
     def __init__(self):
         self.path = ".featureform/SQLiteDB"
         if not os.path.exists(self.path):
             os.makedirs(self.path)
-        raw_conn = sqlite3.connect(self.path + "/metadata.db", check_same_thread=False)
+        self.db_file = self.path + "/metadata.db"
+        raw_conn = sqlite3.connect(self.db_file, check_same_thread=False)
         raw_conn.row_factory = sqlite3.Row
         self.__conn = SyncSQLExecutor(raw_conn)
+        self.__snapshot = {}
+        self.__snapshot_version = None
+        self.__snapshot_lock = Lock()
         self.createTables()
 
+    @staticmethod
+    def bump_version():
+        """
+        Marks every in-memory snapshot in this process as stale.
+        """
+        write_counter.bump()
+
+    def _snapshot_version(self):
+        # The file's mtime catches writes made by other processes (e.g. `featureform apply`)
+        try:
+            mtime = os.stat(self.db_file).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        return write_counter.value, mtime
+
+    def _read_through(self, key, fetch):
+        """
+        Returns the snapshot entry for key, calling fetch to fill it from SQLite on a miss. The
+        snapshot is dropped as soon as the write counter or the database file changes.
+        """
+        version = self._snapshot_version()
+        if version is None:
+            return fetch()
+        with self.__snapshot_lock:
+            if version != self.__snapshot_version:
+                self.__snapshot = {}
+                self.__snapshot_version = version
+            elif key in self.__snapshot:
+                return self.__snapshot[key]
+        value = fetch()
+        with self.__snapshot_lock:
+            if version == self.__snapshot_version:
+                self.__snapshot[key] = value
+        return value
+
     def createTables(self):
         # Features variant table
         self.__conn.execute(
@@ -274,6 +365,16 @@ class SQLiteMetadata:
             PRIMARY KEY(resource_type, name, variant, file_path))"""
         )
 
+        # content fingerprints of local source files, so unchanged files aren't hashed again
+        self.__conn.execute(
+            """CREATE TABLE IF NOT EXISTS file_fingerprints(
+            file_path text NOT NULL,
+            size text NOT NULL,
+            modified_at text NOT NULL,
+            fingerprint text NOT NULL,
+            PRIMARY KEY(file_path))"""
+        )
+
         # full-text search table
         self.__conn.execute(
             """CREATE VIRTUAL TABLE IF NOT EXISTS resources_fts USING fts5(
@@ -481,11 +582,13 @@ class SQLiteMetadata:
             "models", "name", name, should_fetch_tags_properties
         )[0]
 
+    @snapshot_read
     def get_provider(self, name, should_fetch_tags_properties):
         return self.query_resource(
             "providers", "name", name, should_fetch_tags_properties
         )[0]
 
+    @snapshot_read
     def get_feature_variant(self, name, variant):
         query = """SELECT fv.*, t.tag_list as tags, p.property_list as properties
         FROM feature_variant fv
@@ -512,12 +615,14 @@ class SQLiteMetadata:
     def get_feature_variants_from_feature(self, name):
         return self.query_resource_variant("feature_variant", "name", name)
 
+    @snapshot_read
     def get_feature_variant_mode(self, name, variant):
         query = f"SELECT mode FROM feature_computation_mode WHERE name='{name}' AND variant='{variant}'"
         return self.fetch_data_safe(query, "feature_computation_mode", name, variant)[
             0
         ]["mode"]
 
+    @snapshot_read
     def get_feature_variant_on_demand(self, name, variant):
         query = f"SELECT is_on_demand FROM feature_computation_mode WHERE name='{name}' AND variant='{variant}'"
         return bool(
@@ -526,12 +631,14 @@ class SQLiteMetadata:
             ]
         )
 
+    @snapshot_read
     def get_ondemand_feature_query(self, name, variant):
         query = f"SELECT query FROM ondemand_feature_variant WHERE name='{name}' AND variant='{variant}'"
         return self.fetch_data_safe(query, "ondemand_feature_variant", name, variant)[
             0
         ]["query"]
 
+    @snapshot_read
     def get_training_set_variant(self, name, variant):
         query = f"SELECT * FROM training_set_variant WHERE name = '{name}' AND variant = '{variant}';"
         query = """SELECT v.*, t.tag_list as tags, p.property_list as properties
@@ -558,6 +665,7 @@ class SQLiteMetadata:
         )
         return self.fetch_data_safe(query, "training_set_variant", name, variant)
 
+    @snapshot_read
     def get_label_variant(self, name, variant):
         query = """SELECT v.*, t.tag_list as tags, p.property_list as properties
         FROM label_variant v
@@ -586,6 +694,7 @@ class SQLiteMetadata:
         )
         return self.fetch_data_safe(query, "label_variant", name, variant)
 
+    @snapshot_read
     def get_source_variant(self, name, variant):
         query = """SELECT v.*, t.tag_list as tags, p.property_list as properties
         FROM source_variant v
@@ -622,6 +731,7 @@ class SQLiteMetadata:
         )
         return self.fetch_data_safe(query, "training_set_variant", name, variant)
 
+    @snapshot_read
     def get_training_set_features(self, name, variant):
         query = """SELECT v.*, t.tag_list as tags, p.property_list as properties
         FROM training_set_features v
@@ -633,6 +743,7 @@ class SQLiteMetadata:
         )
         return self.fetch_data(query, "training_set_features", name, variant)
 
+    @snapshot_read
     def get_training_set_lag_features(self, name, variant):
         query = """SELECT v.*, t.tag_list as tags, p.property_list as properties
         FROM training_set_lag_features v
@@ -655,6 +766,7 @@ class SQLiteMetadata:
         )
         return self.fetch_data(query, tablename, source_name, source_variant)
 
+    @snapshot_read
     def is_transformation(self, name, variant):
         query = f"SELECT transformation FROM source_variant WHERE name='{name}' and variant='{variant}';"
         transformation = self.__conn.execute(query)
@@ -677,15 +789,42 @@ class SQLiteMetadata:
         res = result.fetchone()
         return res[0] if res else None
 
+    def get_file_fingerprint(self, file_path, size, modified_at):
+        query = f"SELECT fingerprint FROM file_fingerprints WHERE file_path='{file_path}' and size='{size}' and modified_at='{modified_at}';"
+        result = self.__conn.execute(query)
+        self.__conn.commit()
+        res = result.fetchone()
+        return res[0] if res else None
+
+    def prune_file_records(self):
+        """
+        Deletes the fingerprints of files that no longer exist, along with the resource_source_files
+        rows the cache no longer reads, and returns how many rows were deleted.
+        """
+        rows = self.__conn.execute("SELECT file_path FROM file_fingerprints").fetchall()
+        missing = [(row[0],) for row in rows if not os.path.exists(row[0])]
+        self.__conn.executemany(
+            "DELETE FROM file_fingerprints WHERE file_path = ?", missing
+        )
+        deleted = self.__conn.execute("DELETE FROM resource_source_files").rowcount
+        self.__conn.commit()
+        return len(missing) + max(deleted, 0)
+
     def insert_source(self, tablename, *args):
         stmt = f"INSERT OR IGNORE INTO {tablename} VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
         self.__conn.execute_stmt(stmt, args)
         self.__conn.commit()
+        self._bump_version_on_write(tablename)
 
     def insert(self, tablename, *args):
         query = f"INSERT OR IGNORE INTO {tablename} VALUES {str(args)}"
         self.__conn.execute(query)
         self.__conn.commit()
+        self._bump_version_on_write(tablename)
+
+    def _bump_version_on_write(self, tablename):
+        if tablename in SNAPSHOT_TABLES:
+            self.bump_version()
 
     def insert_or_update(self, tablename, keys, cols, *args):
         """
@@ -709,6 +848,7 @@ class SQLiteMetadata:
         if is_update:
             self.__conn.execute(query)
             self.__conn.commit()
+            self._bump_version_on_write(tablename)
         else:
             self.insert(tablename, *args)
 
@@ -0,0 +1,191 @@
+import itertools
+import os
+from typing import Callable, Iterator, Tuple
+
+import numpy as np
+
+try:
+    import torch
+    from torch.utils.data import IterableDataset
+except ImportError:
+    torch = None
+    IterableDataset = object
+
+try:
+    import tensorflow as tf
+except ImportError:
+    tf = None
+
+
+def combine_shards(outer: Tuple[int, int], inner: Tuple[int, int]) -> Tuple[int, int]:
+    """
+    Splits each outer shard into inner shards, returning the combined (shard_index, num_shards).
+    """
+    outer_index, outer_count = outer
+    inner_index, inner_count = inner
+    return outer_index * inner_count + inner_index, outer_count * inner_count
+
+
+def row_arrays(row):
+    return np.asarray(row.features()[0]), np.asarray(row.label()[0])
+
+
+class ShardedTrainingSet:
+    """
+    Iterates over one shard of a training set as (features, label) arrays.
+
+    The client is built by client_factory, a picklable callable such as
+    functools.partial(ServingClient, host=...), the first time each process iterates. Clients
+    hold gRPC channels, which can't be pickled for spawned workers or reused after a fork.
+    """
+
+    def __init__(
+        self,
+        client_factory,
+        name,
+        variant="default",
+        model=None,
+        shard_index=0,
+        num_shards=1,
+    ):
+        if not callable(client_factory):
+            raise TypeError(
+                "client_factory must be a callable that returns a ServingClient, e.g. "
+                "functools.partial(ServingClient, host=...)"
+            )
+        self.client_factory = client_factory
+        self.name = name
+        self.variant = variant
+        self.model = model
+        self.shard_index = shard_index
+        self.num_shards = num_shards
+        self._client = None
+        self._client_pid = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_client"] = None
+        state["_client_pid"] = None
+        return state
+
+    def client(self):
+        if self._client is None or self._client_pid != os.getpid():
+            self._client = self.client_factory()
+            self._client_pid = os.getpid()
+        return self._client
+
+    def shard(self) -> Tuple[int, int]:
+        return self.shard_index, self.num_shards
+
+    def __iter__(self):
+        shard_index, num_shards = self.shard()
+        dataset = self.client().training_set(
+            self.name,
+            self.variant,
+            model=self.model,
+            shard_index=shard_index,
+            num_shards=num_shards,
+        )
+        for row in dataset:
+            yield row_arrays(row)
+
+
+class TorchTrainingSet(ShardedTrainingSet, IterableDataset):
+    """
+    A PyTorch IterableDataset over a training set that yields (features, label) arrays.
+
+    Each DataLoader worker and each torch.distributed rank reads its own shard, so every row is
+    read exactly once per epoch across the job. shard_index and num_shards split the training set
+    further, on top of the workers and ranks. Each worker builds its own client with
+    client_factory.
+    """
+
+    def __init__(
+        self,
+        client_factory,
+        name,
+        variant="default",
+        model=None,
+        shard_index=0,
+        num_shards=1,
+    ):
+        if torch is None:
+            raise ImportError(
+                "TorchTrainingSet requires PyTorch, install it with: pip install torch"
+            )
+        super().__init__(client_factory, name, variant, model, shard_index, num_shards)
+
+    def shard(self) -> Tuple[int, int]:
+        shard = (self.shard_index, self.num_shards)
+        if torch.distributed.is_available() and torch.distributed.is_initialized():
+            rank = torch.distributed.get_rank()
+            world_size = torch.distributed.get_world_size()
+            shard = combine_shards(shard, (rank, world_size))
+        worker_info = torch.utils.data.get_worker_info()
+        if worker_info is not None:
+            shard = combine_shards(shard, (worker_info.id, worker_info.num_workers))
+        return shard
+
+
+def peek_first_pass(open_pass: Callable[[], Iterator]):
+    """
+    Opens a pass to read its first element and returns that element with a generator function
+    that replays the same pass on its first call and opens a new pass on every later call.
+    """
+    first_pass = iter(open_pass())
+    first = next(first_pass)
+    pending = [itertools.chain([first], first_pass)]
+
+    def passes():
+        if pending:
+            yield from pending.pop()
+        else:
+            yield from open_pass()
+
+    return first, passes
+
+
+def tf_training_set(
+    client_factory,
+    name,
+    variant="default",
+    model=None,
+    shard_index=0,
+    num_shards=1,
+    input_context=None,
+):
+    """
+    Returns a tf.data.Dataset over a training set that yields (features, label) tensors.
+
+    Pass the tf.distribute.InputContext given to distribute_datasets_from_function as
+    input_context to read one shard per input pipeline. The element spec is taken from the
+    first row of the shard, and the pass it was read from is the dataset's first epoch.
+    """
+    if tf is None:
+        raise ImportError(
+            "tf_training_set requires TensorFlow, install it with: pip install tensorflow"
+        )
+    shard = (shard_index, num_shards)
+    if input_context is not None:
+        shard = combine_shards(
+            shard,
+            (input_context.input_pipeline_id, input_context.num_input_pipelines),
+        )
+    training_set = ShardedTrainingSet(client_factory, name, variant, model, *shard)
+    try:
+        (features, label), passes = peek_first_pass(training_set.__iter__)
+    except StopIteration:
+        raise ValueError(
+            f"Training set {name} ({variant}) has no rows in shard {shard}"
+        )
+    signature = (
+        tf.TensorSpec(shape=features.shape, dtype=tensor_dtype(features)),
+        tf.TensorSpec(shape=label.shape, dtype=tensor_dtype(label)),
+    )
+    return tf.data.Dataset.from_generator(passes, output_signature=signature)
+
+
+def tensor_dtype(values: np.ndarray):
+    if values.dtype == object:
+        return tf.string
+    return tf.as_dtype(values.dtype)
@@ -0,0 +1,122 @@
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+DEFAULT_CHUNK_SIZE = 4096
+
+# Buffer dtype for each field of the Value oneof
+VALUE_DTYPES = {
+    "str_value": object,
+    "int_value": np.int32,
+    "float_value": np.float32,
+    "double_value": np.float64,
+    "int64_value": np.int64,
+    "int32_value": np.int32,
+    "bool_value": np.bool_,
+    "on_demand_function": object,
+}
+
+
+def stack_columns(columns: List[np.ndarray]) -> np.ndarray:
+    """
+    Combines column arrays into one (rows, columns) array. Like DataFrame.to_numpy, numeric
+    columns share a common numeric dtype and any other mix becomes objects.
+    """
+    kinds = {column.dtype.kind for column in columns}
+    if kinds and (kinds <= set("iuf") or kinds == {"b"}):
+        return np.column_stack(columns)
+    rows = np.empty((len(columns[0]) if columns else 0, len(columns)), dtype=object)
+    for i, column in enumerate(columns):
+        if column.dtype.kind in "mM":
+            # NumPy boxes nanosecond datetimes as integers, pandas as Timestamps
+            column = pd.Index(column).astype(object).to_numpy()
+        rows[:, i] = column
+    return rows
+
+
+class DecodedChunk:
+    def __init__(self, columns: List[np.ndarray]):
+        """
+        A chunk of training data rows stored column by column: one array per feature, then the label.
+        """
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns[0]) if self.columns else 0
+
+    def features(self) -> List[np.ndarray]:
+        return self.columns[:-1]
+
+    def label(self) -> np.ndarray:
+        return self.columns[-1]
+
+    def to_numpy(self) -> np.ndarray:
+        """
+        Returns the chunk as a (rows, columns) array, numeric when every column is numeric.
+        """
+        return stack_columns(self.columns)
+
+    def to_arrow(self) -> pa.RecordBatch:
+        names = [f"feature_{i}" for i in range(len(self.columns) - 1)] + ["label"]
+        return pa.record_batch([pa.array(column) for column in self.columns], names)
+
+
+class TrainingDataDecoder:
+    """
+    Decodes TrainingDataRow messages into typed column buffers.
+
+    The Value field set in each column is learned from the first row, so later rows read it with a
+    single getattr instead of a WhichOneof lookup. A value whose field differs from the schema
+    always reads as the field's default, so only default-looking values are double checked; a
+    mismatch widens that column of the chunk to objects.
+    """
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self._fields = None
+
+    def chunks(self, proto_rows: Iterable) -> Iterator[DecodedChunk]:
+        proto_rows = iter(proto_rows)
+        while True:
+            chunk = self.decode(islice(proto_rows, self.chunk_size), self.chunk_size)
+            if chunk is None:
+                return
+            yield chunk
+
+    def decode(self, proto_rows: Iterable, max_rows: int) -> Optional[DecodedChunk]:
+        """
+        Decodes up to max_rows rows into one chunk, or returns None if there are no rows.
+        """
+        buffers = None
+        count = 0
+        for proto_row in proto_rows:
+            values = list(proto_row.features)
+            values.append(proto_row.label)
+            if self._fields is None:
+                self._fields = [value.WhichOneof("value") for value in values]
+            if buffers is None:
+                buffers = [
+                    np.empty(max_rows, dtype=VALUE_DTYPES.get(field, object))
+                    for field in self._fields
+                ]
+            for i, value in enumerate(values):
+                field = self._fields[i]
+                parsed = getattr(value, field) if field is not None else None
+                if not parsed:
+                    actual_field = value.WhichOneof("value")
+                    if actual_field != field:
+                        parsed = (
+                            getattr(value, actual_field)
+                            if actual_field is not None
+                            else None
+                        )
+                        if buffers[i].dtype != object:
+                            buffers[i] = buffers[i].astype(object)
+                buffers[i][count] = parsed
+            count += 1
+        if count == 0:
+            return None
+        return DecodedChunk([buffer[:count] for buffer in buffers])
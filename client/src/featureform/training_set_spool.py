@@ -0,0 +1,156 @@
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+
+SPOOL_DIR_ENV = "FEATUREFORM_SPOOL_DIR"
+
+
+class TrainingSetSpool:
+    """
+    Local copies of hosted training sets, stored as Arrow IPC files keyed by name and variant.
+    Training set variants are immutable, so a complete spool file never goes stale.
+    """
+
+    def __init__(self, spool_dir: str = None):
+        feature_form_dir = os.environ.get("FEATUREFORM_DIR", ".featureform")
+        self.spool_dir = spool_dir or os.environ.get(
+            SPOOL_DIR_ENV, os.path.join(feature_form_dir, "spool")
+        )
+
+    def path(self, name: str, variant: str, shard_index=0, num_shards=1) -> str:
+        key = f"training_set__{name}__{variant}"
+        if num_shards > 1:
+            key = f"{key}__shard_{shard_index}_of_{num_shards}"
+        return os.path.join(self.spool_dir, f"{key}.arrow")
+
+    def exists(self, name: str, variant: str, shard_index=0, num_shards=1) -> bool:
+        return os.path.exists(self.path(name, variant, shard_index, num_shards))
+
+    def read(
+        self, name: str, variant: str, shard_index=0, num_shards=1
+    ) -> pd.DataFrame:
+        """
+        Reads a spooled training set through a memory map, one column per feature plus the label.
+        """
+        path = self.path(name, variant, shard_index, num_shards)
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+        return table.to_pandas()
+
+    def writer(
+        self, name: str, variant: str, shard_index=0, num_shards=1
+    ) -> "SpoolWriter":
+        os.makedirs(self.spool_dir, exist_ok=True)
+        return SpoolWriter(self.path(name, variant, shard_index, num_shards))
+
+
+class SpoolWriter:
+    """
+    Writes rows to a temporary file as Arrow record batches and moves it into place on close, so
+    readers never see a partial spool.
+
+    The schema is inferred from the first rows and widened when later rows need it, e.g. from
+    null or int64 to double, by rewriting what was already spooled. Rows that no schema can hold
+    stop the spool; the training set is still streamed, just not kept. A writer that is dropped
+    before close, such as on an abandoned pass, removes its temporary file.
+    """
+
+    CHUNK_SIZE = 4096
+
+    def __init__(self, path: str):
+        self._path = path
+        self._tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self._pending_rows = []
+        self._writer = None
+        self._schema = None
+        self._failed = False
+
+    def add_row(self, values):
+        if self._failed:
+            return
+        self._pending_rows.append(values)
+        if len(self._pending_rows) >= self.CHUNK_SIZE:
+            self._flush()
+
+    def add_columns(self, columns):
+        self._flush()
+        self._write(list(columns))
+
+    def close(self) -> bool:
+        """
+        Finishes the spool and returns True, or returns False if no rows were written or they
+        couldn't be spooled.
+        """
+        self._flush()
+        if self._writer is None or self._failed:
+            self.abort()
+            return False
+        self._writer.close()
+        self._writer = None
+        os.replace(self._tmp_path, self._path)
+        return True
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+        self._writer = None
+        self._pending_rows = []
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def __del__(self):
+        if self._writer is not None:
+            self.abort()
+
+    def _flush(self):
+        if len(self._pending_rows) > 0:
+            self._write([list(column) for column in zip(*self._pending_rows)])
+            self._pending_rows = []
+
+    def _write(self, columns):
+        if self._failed:
+            return
+        names = [f"feature_{i}" for i in range(len(columns) - 1)] + ["label"]
+        try:
+            table = pa.Table.from_arrays(
+                [pa.array(column) for column in columns], names
+            )
+            if self._writer is None:
+                self._schema = table.schema
+                self._writer = pa.ipc.new_file(self._tmp_path, self._schema)
+            elif table.schema != self._schema:
+                schema = unify_schemas(self._schema, table.schema)
+                if schema != self._schema:
+                    self._rewrite(schema)
+                table = table.cast(schema)
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            self._failed = True
+            self.abort()
+            return
+        self._writer.write_table(table)
+
+    def _rewrite(self, schema):
+        """
+        Rewrites the rows spooled so far with a wider schema.
+        """
+        self._writer.close()
+        self._writer = None
+        # Read into memory rather than mapped, since the file is about to be overwritten
+        with pa.OSFile(self._tmp_path) as source:
+            table = pa.ipc.open_file(source).read_all()
+        self._writer = pa.ipc.new_file(self._tmp_path, schema)
+        self._writer.write_table(table.cast(schema))
+        self._schema = schema
+
+
+def unify_schemas(schema: pa.Schema, other: pa.Schema) -> pa.Schema:
+    """
+    Returns a schema that can hold the values of both, promoting numeric types where needed.
+    """
+    try:
+        return pa.unify_schemas([schema, other], promote_options="permissive")
+    except TypeError:
+        # pyarrow before 14 only fills in null types
+        return pa.unify_schemas([schema, other])
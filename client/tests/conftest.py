@@ -5,6 +5,8 @@ import shutil
 from tempfile import NamedTemporaryFile
 
 import dill
+import numpy as np
+import pandas as pd
 import pytest
 
 sys.path.insert(0, "client/src/")
@@ -31,6 +33,7 @@ from featureform.resources import (
     DFTransformation,
 )
 from featureform.enums import FileFormat
+from featureform.local_cache import LocalCache
 import featureform as ff
 
 real_path = os.path.realpath(__file__)
@@ -370,3 +373,36 @@ def hosted_sql_provider_and_source():
         return (provider, source, redis)
 
     return get_hosted
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("FEATUREFORM_CACHE_DIR", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+@pytest.fixture
+def frame():
+    def make_frame(num_rows=1000, start=0):
+        return pd.DataFrame(
+            {"value": np.arange(start, start + num_rows, dtype=np.float64)}
+        )
+
+    return make_frame
+
+
+@pytest.fixture
+def keyed_by_name_cache(monkeypatch):
+    """
+    Builds LocalCaches keyed by resource name, so entries can be told apart without metadata.
+    Passing a directory points the new cache at it instead of the current cache directory.
+    """
+
+    def make_cache(cache_dir=None):
+        if cache_dir is not None:
+            monkeypatch.setenv("FEATUREFORM_CACHE_DIR", str(cache_dir))
+        local_cache = LocalCache(db=None)
+        local_cache.resource_key = lambda resource_type, name, variant: name
+        return local_cache
+
+    return make_cache
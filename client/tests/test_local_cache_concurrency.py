@@ -0,0 +1,117 @@
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+from featureform.local_cache_storage import write_entry
+from featureform.local_file_lock import FileLock
+
+fork = pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="needs fork to share the test setup with workers",
+)
+
+
+def compute_once(computed_dir, results, frame, keyed_by_name_cache):
+    def compute():
+        # Every process that computes leaves a marker behind
+        open(os.path.join(computed_dir, str(os.getpid())), "w").close()
+        time.sleep(0.2)
+        return frame()
+
+    df = keyed_by_name_cache().get_or_put("feature", "a", "v", compute)
+    results.put(df["value"].sum())
+
+
+@fork
+def test_one_process_computes_a_missing_entry(
+    cache_dir, tmp_path, frame, keyed_by_name_cache
+):
+    computed_dir = tmp_path / "computed"
+    computed_dir.mkdir()
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    workers = [
+        context.Process(
+            target=compute_once,
+            args=(str(computed_dir), results, frame, keyed_by_name_cache),
+        )
+        for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=30)
+
+    assert [worker.exitcode for worker in workers] == [0, 0, 0, 0]
+    assert len(os.listdir(computed_dir)) == 1
+    assert [results.get(timeout=5) for _ in workers] == [frame()["value"].sum()] * 4
+    assert len(keyed_by_name_cache().entries()) == 1
+
+
+def test_one_thread_computes_a_missing_entry(cache_dir, frame, keyed_by_name_cache):
+    local_cache = keyed_by_name_cache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return frame()
+
+    threads = [
+        threading.Thread(
+            target=local_cache.get_or_put, args=("feature", "a", "v", compute)
+        )
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+
+
+def test_lock_is_exclusive(tmp_path):
+    path = str(tmp_path / "entry.lock")
+    order = []
+
+    def hold():
+        with FileLock(path):
+            order.append("second")
+
+    with FileLock(path):
+        thread = threading.Thread(target=hold)
+        thread.start()
+        time.sleep(0.1)
+        order.append("first")
+    thread.join()
+
+    assert order == ["first", "second"]
+
+
+def test_failed_writes_leave_no_entry(tmp_path, monkeypatch, frame):
+    path = str(tmp_path / "feature__a.arrow")
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr("featureform.local_cache_storage.os.replace", fail)
+    with pytest.raises(OSError):
+        write_entry(path, frame())
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_lock_files_are_not_cache_entries(cache_dir, frame, keyed_by_name_cache):
+    local_cache = keyed_by_name_cache()
+    local_cache.get_or_put("feature", "a", "v", frame)
+
+    assert any(name.endswith(".lock") for name in os.listdir(cache_dir))
+    assert len(local_cache.entries()) == 1
+
+    local_cache.evict(0)
+    assert local_cache.entries() == []
+    # Processes waiting on an evicted entry's lock keep the same file
+    assert any(name.endswith(".lock") for name in os.listdir(cache_dir))
@@ -0,0 +1,136 @@
+import os
+import time
+
+import pytest
+from click.testing import CliRunner
+from featureform.cli import cache
+from featureform.local_cache import CACHE_EVICTION_ENV, CACHE_MAX_BYTES_ENV
+from featureform.local_cache_index import parse_size
+from featureform.local_ingest_cache import IngestCache
+
+
+@pytest.fixture
+def put(frame):
+    def put_frame(local_cache, name, num_rows=1000):
+        return local_cache.get_or_put("feature", name, "v", lambda: frame(num_rows))
+
+    return put_frame
+
+
+def cached_names(local_cache):
+    return sorted(
+        entry.file_path.split("__")[1][:-6] for entry in local_cache.entries()
+    )
+
+
+def test_least_recently_used_entries_are_evicted(
+    cache_dir, monkeypatch, keyed_by_name_cache, put
+):
+    monkeypatch.setenv(CACHE_MAX_BYTES_ENV, "20KB")
+    local_cache = keyed_by_name_cache()
+    put(local_cache, "a")
+    put(local_cache, "b")
+    put(local_cache, "a")
+
+    put(local_cache, "c")
+
+    assert cached_names(local_cache) == ["a", "c"]
+    hits = {e.file_path.split("__")[1]: e.hits for e in local_cache.entries()}
+    assert hits["a.arrow"] == 1
+
+
+def test_cost_eviction_keeps_expensive_entries(
+    cache_dir, monkeypatch, frame, keyed_by_name_cache, put
+):
+    monkeypatch.setenv(CACHE_MAX_BYTES_ENV, "20KB")
+    monkeypatch.setenv(CACHE_EVICTION_ENV, "cost")
+    local_cache = keyed_by_name_cache()
+
+    def slow():
+        time.sleep(0.05)
+        return frame(1000)
+
+    local_cache.get_or_put("feature", "slow", "v", slow)
+    put(local_cache, "fast")
+    put(local_cache, "new")
+
+    assert cached_names(local_cache) == ["new", "slow"]
+
+
+def test_the_entry_just_written_is_kept(
+    cache_dir, monkeypatch, keyed_by_name_cache, put
+):
+    monkeypatch.setenv(CACHE_MAX_BYTES_ENV, "1KB")
+    local_cache = keyed_by_name_cache()
+
+    put(local_cache, "a")
+    put(local_cache, "big", 10000)
+
+    assert cached_names(local_cache) == ["big"]
+
+
+def test_entries_without_a_record_are_picked_up(
+    cache_dir, frame, keyed_by_name_cache, put
+):
+    local_cache = keyed_by_name_cache()
+    put(local_cache, "a")
+    frame(10).to_pickle(cache_dir / "label__old.pkl")
+
+    entries = {e.resource_type: e for e in local_cache.entries()}
+
+    assert set(entries) == {"feature", "label"}
+    assert entries["label"].size_bytes == os.path.getsize(cache_dir / "label__old.pkl")
+
+
+def test_ingest_copies_are_counted_and_evicted(
+    cache_dir, tmp_path, frame, keyed_by_name_cache, put
+):
+    csv_path = str(tmp_path / "events.csv")
+    frame(100).to_csv(csv_path, index=False)
+    ingest_cache = IngestCache()
+    ingest_cache.read(csv_path)
+    local_cache = keyed_by_name_cache()
+    put(local_cache, "a")
+
+    entries = {e.resource_type: e for e in local_cache.entries()}
+
+    assert set(entries) == {"feature", "ingest"}
+    assert entries["ingest"].file_path == ingest_cache.path(csv_path)
+
+    local_cache.evict(0)
+
+    assert local_cache.entries() == []
+    assert not os.path.exists(ingest_cache.path(csv_path))
+    assert ingest_cache.read(csv_path)["value"].tolist() == list(range(100))
+
+
+@pytest.mark.parametrize(
+    "size, expected",
+    [("1024", 1024), ("512MB", 512 << 20), ("1.5k", 1536), ("10 GiB", 10 << 30)],
+)
+def test_sizes_are_parsed(size, expected):
+    assert parse_size(size) == expected
+
+
+def test_invalid_sizes_are_rejected():
+    with pytest.raises(ValueError):
+        parse_size("lots")
+
+
+def test_cli_reports_and_prunes_the_cache(
+    tmp_path, monkeypatch, keyed_by_name_cache, put
+):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("FEATUREFORM_CACHE_DIR", raising=False)
+    local_cache = keyed_by_name_cache()
+    put(local_cache, "a")
+    put(local_cache, "b")
+    runner = CliRunner()
+
+    result = runner.invoke(cache, ["stats"], catch_exceptions=False)
+    assert "feature" in result.output
+    assert "Total: 2 entries" in result.output
+
+    result = runner.invoke(cache, ["prune", "--all"], catch_exceptions=False)
+    assert "Removed 2 cache entries" in result.output
+    assert local_cache.entries() == []
@@ -0,0 +1,115 @@
+import json
+import sqlite3
+
+import pytest
+from click.testing import CliRunner
+from featureform.cli import cache
+from featureform import local_cache_index
+from featureform.local_cache import CACHE_METRICS_LOG_ENV, LocalCache
+from featureform.local_cache_index import INDEX_FILE
+
+
+def keyed_cache(keys):
+    """
+    A cache whose resource keys are looked up by name in keys, so tests can change them.
+    """
+    local_cache = LocalCache(db=None)
+    local_cache.resource_key = lambda resource_type, name, variant: keys[name]
+    return local_cache
+
+
+def test_hits_and_misses_are_counted(cache_dir, frame):
+    local_cache = keyed_cache({"a": "a1"})
+    for _ in range(3):
+        local_cache.get_or_put("feature", "a", "v", frame)
+
+    [metrics] = local_cache.metrics()
+    assert (metrics.resource_type, metrics.name, metrics.variant) == (
+        "feature",
+        "a",
+        "v",
+    )
+    assert (metrics.hits, metrics.misses, metrics.invalidations) == (2, 1, 0)
+    assert metrics.compute_seconds > 0
+    assert metrics.load_seconds > 0
+    assert metrics.size_bytes > 0
+
+
+def test_changed_keys_count_as_invalidations(cache_dir, frame):
+    keys = {"a": "a1"}
+    local_cache = keyed_cache(keys)
+    local_cache.get_or_put("feature", "a", "v", frame)
+
+    keys["a"] = "a2"
+    local_cache.get_or_put("feature", "a", "v", frame)
+
+    [metrics] = local_cache.metrics()
+    assert (metrics.misses, metrics.invalidations) == (2, 1)
+    assert metrics.file_path.endswith("a2.arrow")
+
+
+def test_metrics_outlive_the_process_and_evicted_entries(cache_dir, frame):
+    keyed_cache({"a": "a1"}).get_or_put("feature", "a", "v", frame)
+    local_cache = keyed_cache({"a": "a1"})
+
+    local_cache.evict(0)
+
+    [metrics] = local_cache.metrics()
+    assert metrics.misses == 1
+    assert metrics.size_bytes == 0
+
+    local_cache.reset_metrics()
+    assert local_cache.metrics() == []
+
+
+def test_hits_are_written_in_batches(cache_dir, frame, monkeypatch):
+    local_cache = keyed_cache({"a": "a1"})
+    for _ in range(3):
+        local_cache.get_or_put("feature", "a", "v", frame)
+
+    # Another process reading the index sees only what was flushed
+    with sqlite3.connect(str(cache_dir / INDEX_FILE)) as conn:
+        assert conn.execute("SELECT hits FROM cache_metrics").fetchall() == [(0,)]
+    [metrics] = local_cache.metrics()
+    assert metrics.hits == 2
+
+    monkeypatch.setattr(local_cache_index, "HIT_FLUSH_INTERVAL_SECONDS", 0)
+    local_cache.get_or_put("feature", "a", "v", frame)
+    with sqlite3.connect(str(cache_dir / INDEX_FILE)) as conn:
+        assert conn.execute("SELECT hits FROM cache_metrics").fetchall() == [(3,)]
+
+
+def test_events_are_logged_as_json_lines(cache_dir, tmp_path, monkeypatch, frame):
+    log_path = tmp_path / "metrics.jsonl"
+    monkeypatch.setenv(CACHE_METRICS_LOG_ENV, str(log_path))
+    local_cache = keyed_cache({"a": "a1"})
+    local_cache.get_or_put("feature", "a", "v", frame)
+    local_cache.get_or_put("feature", "a", "v", frame)
+
+    events = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert [event["event"] for event in events] == ["miss", "hit"]
+    assert events[0]["invalidated"] is False
+    assert events[0]["size_bytes"] > 0
+    assert events[1]["tier"] == "memory"
+    assert all(event["name"] == "a" for event in events)
+
+
+def test_cli_reports_metrics(tmp_path, monkeypatch, frame):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("FEATUREFORM_CACHE_DIR", raising=False)
+    local_cache = keyed_cache({"a": "a1", "b": "b1"})
+    local_cache.get_or_put("feature", "a", "v", frame)
+    local_cache.get_or_put("feature", "a", "v", frame)
+    local_cache.get_or_put("label", "b", "v", frame)
+    runner = CliRunner()
+
+    result = runner.invoke(cache, ["stats", "--resources"], catch_exceptions=False)
+    assert "MISSES" in result.output
+    assert "feature a (v)" in result.output
+
+    result = runner.invoke(cache, ["stats", "--json"], catch_exceptions=False)
+    rows = [json.loads(line) for line in result.output.splitlines()]
+    assert [(row["name"], row["hits"], row["misses"]) for row in rows] == [
+        ("a", 1, 1),
+        ("b", 0, 1),
+    ]
@@ -0,0 +1,97 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from featureform.local_cache_storage import (
+    CACHE_COMPRESSION_ENV,
+    CACHE_FORMAT_ENV,
+    cache_compression,
+    existing_entry,
+    read_entry,
+    write_entry,
+)
+
+
+@pytest.fixture
+def typed_frame():
+    return pd.DataFrame(
+        {
+            "user": ["a", np.nan, "c"],
+            "value": [1.0, 2.0, 3.0],
+            "count": [1, 2, 3],
+            "ts": pd.to_datetime(["2022-01-01", "2022-01-02", "2022-01-03"]),
+        }
+    )
+
+
+def test_frames_are_memory_mapped_arrow_files(tmp_path, typed_frame):
+    path = write_entry(str(tmp_path / "label__key.arrow"), typed_frame)
+
+    df = read_entry(path)
+
+    assert path.endswith(".arrow")
+    pd.testing.assert_frame_equal(df, typed_frame)
+    assert not df["value"].to_numpy().flags.writeable
+
+
+def test_object_columns_fall_back_to_pickle(tmp_path, typed_frame):
+    typed_frame["mixed"] = [1, "b", None]
+
+    path = write_entry(str(tmp_path / "label__key.arrow"), typed_frame)
+
+    assert path.endswith(".pkl")
+    pd.testing.assert_frame_equal(read_entry(path), typed_frame)
+
+
+@pytest.mark.parametrize("name", ["amount", None, 0])
+def test_series_are_stored_as_arrow(tmp_path, name):
+    # The shape of a groupby aggregate
+    series = pd.Series(
+        [1.0, 2.0, 3.0], index=pd.Index(["a", "b", "c"], name="user"), name=name
+    )
+
+    path = write_entry(str(tmp_path / "transformation__key.arrow"), series)
+
+    assert path.endswith(".arrow")
+    pd.testing.assert_series_equal(read_entry(path), series)
+
+
+def test_series_arrow_cannot_hold_fall_back_to_pickle(tmp_path):
+    series = pd.Series([1, "b", None], name=("a", "b"))
+
+    path = write_entry(str(tmp_path / "transformation__key.arrow"), series)
+
+    assert path.endswith(".pkl")
+    pd.testing.assert_series_equal(read_entry(path), series)
+
+
+def test_rewriting_in_another_format_replaces_the_entry(tmp_path, typed_frame):
+    base_path = str(tmp_path / "label__key")
+    write_entry(base_path, typed_frame)
+    typed_frame["mixed"] = [1, "b", None]
+
+    path = write_entry(base_path, typed_frame)
+
+    assert existing_entry(base_path) == path
+    assert os.listdir(tmp_path) == ["label__key.pkl"]
+
+
+@pytest.mark.parametrize("compression", ["zstd", "lz4"])
+def test_compressed_entries_round_trip(tmp_path, typed_frame, compression):
+    path = write_entry(str(tmp_path / "label__key"), typed_frame, compression)
+
+    pd.testing.assert_frame_equal(read_entry(path), typed_frame)
+
+
+def test_pickle_format_can_be_forced(tmp_path, typed_frame, monkeypatch):
+    monkeypatch.setenv(CACHE_FORMAT_ENV, "pickle")
+
+    assert write_entry(str(tmp_path / "label__key"), typed_frame).endswith(".pkl")
+
+
+def test_unknown_compressions_are_rejected(monkeypatch):
+    monkeypatch.setenv(CACHE_COMPRESSION_ENV, "gzip9")
+
+    with pytest.raises(ValueError):
+        cache_compression()
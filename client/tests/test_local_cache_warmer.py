@@ -0,0 +1,149 @@
+import os
+import shutil
+import stat
+import threading
+
+import featureform as ff
+import pytest
+from click.testing import CliRunner
+from featureform import local
+from featureform.cli import cache
+from featureform.local_cache_warmer import CacheWarmer
+from featureform.serving import LocalClientImpl
+
+real_path = os.path.realpath(__file__)
+dir_path = os.path.dirname(real_path)
+SOURCE_FILE = f"{dir_path}/test_files/input_files/transactions.csv"
+
+RESOURCES = [
+    ("transformation", "average_user_transaction", "quickstart"),
+    ("feature", "avg_transactions", "quickstart"),
+    ("label", "fraudulent", "quickstart"),
+    ("training_set", "fraud_training", "quickstart"),
+]
+
+
+@pytest.fixture(scope="function")
+def registered(tmp_path):
+    temp_transactions = tmp_path / "transactions.csv"
+    shutil.copy(SOURCE_FILE, temp_transactions)
+    transactions = local.register_file(
+        name="transactions",
+        variant="quickstart",
+        path=str(temp_transactions),
+    )
+
+    @local.df_transformation(
+        variant="quickstart", inputs=[("transactions", "quickstart")]
+    )
+    def average_user_transaction(transactions):
+        """the average transaction amount for a user"""
+        return transactions.groupby("CustomerID")["TransactionAmount"].mean()
+
+    user = ff.register_entity("user")
+    average_user_transaction.register_resources(
+        entity=user,
+        entity_column="CustomerID",
+        inference_store=local,
+        features=[
+            {
+                "name": "avg_transactions",
+                "variant": "quickstart",
+                "column": "TransactionAmount",
+                "type": "float32",
+            },
+        ],
+    )
+    transactions.register_resources(
+        entity=user,
+        entity_column="CustomerID",
+        timestamp_column="Timestamp",
+        labels=[
+            {
+                "name": "fraudulent",
+                "variant": "quickstart",
+                "column": "IsFraud",
+                "type": "bool",
+            },
+        ],
+    )
+    ff.register_training_set(
+        "fraud_training",
+        "quickstart",
+        label=("fraudulent", "quickstart"),
+        features=[("avg_transactions", "quickstart")],
+    )
+    ff.ResourceClient(local=True).apply()
+
+    yield temp_transactions
+
+    clear_state()
+
+
+def clear_state():
+    ff.clear_state()
+    shutil.rmtree(".featureform", onerror=del_rw)
+
+
+def del_rw(action, name, exc):
+    if os.path.exists(name):
+        os.chmod(name, stat.S_IWRITE)
+        os.remove(name)
+
+
+@pytest.mark.local
+def test_warm_caches_every_resource(registered):
+    result = CliRunner().invoke(cache, ["warm"], catch_exceptions=False)
+
+    assert result.exit_code == 0
+    assert "Warmed 4 of 4 resources" in result.output
+    local_cache = LocalClientImpl().local_cache
+    for resource in RESOURCES:
+        assert local_cache.is_cached(*resource)
+
+
+@pytest.mark.local
+def test_warm_resources_are_ordered_by_stage(registered):
+    warmer = CacheWarmer(LocalClientImpl(), max_workers=2)
+
+    assert warmer.resources() == RESOURCES
+    assert warmer.resources(["feature"]) == [RESOURCES[1]]
+
+
+@pytest.mark.local
+def test_features_and_labels_are_warmed_together(registered, monkeypatch):
+    warmer = CacheWarmer(LocalClientImpl(), max_workers=2)
+    label_started = threading.Event()
+
+    def materialize(resource_type, name, variant):
+        if resource_type == "label":
+            label_started.set()
+        else:
+            # Only finishes if the label runs in the same stage
+            assert label_started.wait(timeout=5)
+
+    monkeypatch.setattr(warmer, "_materialize", materialize)
+    results = warmer.warm(warmer.resources(["feature", "label"]))
+
+    assert [result.error for result in results] == [None, None]
+
+
+@pytest.mark.local
+def test_warm_reports_cached_resources(registered):
+    warmer = CacheWarmer(LocalClientImpl())
+    warmer.warm(warmer.resources())
+
+    results = warmer.warm(warmer.resources())
+
+    assert all(result.cached and result.error is None for result in results)
+
+
+@pytest.mark.local
+def test_warm_reports_failures(registered):
+    os.remove(registered)
+
+    result = CliRunner().invoke(cache, ["warm", "--type", "feature"])
+
+    assert result.exit_code == 1
+    assert "failed" in result.output
+    assert "1 resources failed to warm" in result.output
@@ -0,0 +1,222 @@
+import numpy as np
+import pandas as pd
+import pytest
+from featureform.proto import serving_pb2
+from featureform.serving import Dataset, LocalStream, Shuffle, Stream
+
+
+@pytest.fixture
+def numeric_df():
+    return pd.DataFrame(
+        {
+            "f1.v": np.arange(10, dtype=np.float64),
+            "f2.v": np.arange(10, 20, dtype=np.float64),
+            "label": np.arange(10) % 2 * 1.0,
+        }
+    )
+
+
+@pytest.fixture
+def timestamped_df():
+    return pd.DataFrame(
+        {
+            "f1.v": [1.0, 2.0, 3.0],
+            "label_timestamp": pd.to_datetime(
+                ["2022-01-01", "2022-01-02", "2022-01-03"]
+            ),
+            "label": [True, False, True],
+        }
+    )
+
+
+def test_local_rows_are_views_of_the_training_set(numeric_df):
+    values = numeric_df.to_numpy()
+    stream = LocalStream(values, False)
+
+    rows = list(stream)
+    assert len(rows) == len(stream) == 10
+    for i, row in enumerate(rows):
+        assert np.shares_memory(row.to_numpy(), values)
+        assert np.shares_memory(row.features()[0], values)
+        assert row.features()[0].tolist() == [i, 10 + i]
+        assert row.label() == [i % 2]
+
+
+def test_single_dtype_frames_are_not_copied(numeric_df):
+    dataset = Dataset.from_dataframe(numeric_df, False)
+
+    row = next(dataset)
+    assert row.to_numpy().dtype == np.float64
+    assert np.shares_memory(row.to_numpy(), numeric_df["f1.v"].to_numpy())
+
+
+def test_label_timestamp_is_part_of_the_label(timestamped_df):
+    dataset = Dataset.from_dataframe(timestamped_df, True)
+
+    rows = list(dataset)
+    assert rows[0].features()[0].tolist() == [1.0]
+    assert rows[0].label()[0].tolist() == [pd.Timestamp("2022-01-01"), True]
+
+
+def test_restart_starts_from_the_first_row(numeric_df):
+    stream = LocalStream(numeric_df.to_numpy(), False)
+    list(stream)
+
+    stream.restart()
+
+    assert next(stream).features()[0].tolist() == [0.0, 10.0]
+
+
+def test_batches_are_feature_matrices_and_label_vectors(numeric_df):
+    values = numeric_df.to_numpy()
+    dataset = Dataset(LocalStream(values, False)).batch(4)
+
+    batches = list(dataset)
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    assert batches[0].features().shape == (4, 2)
+    assert batches[0].label().shape == (4,)
+    assert np.shares_memory(batches[0].features(), values)
+    np.testing.assert_array_equal(batches[2].features(), [[8, 18], [9, 19]])
+    np.testing.assert_array_equal(batches[2].label(), [0, 1])
+
+
+def test_batches_span_repeated_epochs(numeric_df):
+    dataset = Dataset(LocalStream(numeric_df.to_numpy(), False)).repeat(1).batch(4)
+
+    batches = list(dataset)
+    assert [len(batch) for batch in batches] == [4, 4, 4, 4, 4]
+    np.testing.assert_array_equal(batches[2].features()[:, 0], [8, 9, 0, 1])
+
+
+def test_shuffled_batches_keep_every_row(timestamped_df):
+    dataset = Dataset.from_dataframe(timestamped_df, True).shuffle(2).batch(2)
+
+    batches = list(dataset)
+    assert [len(batch) for batch in batches] == [2, 1]
+    labels = np.concatenate([batch.label() for batch in batches])
+    assert labels.shape == (3, 2)
+    assert sorted(np.concatenate([b.features()[:, 0] for b in batches])) == [1, 2, 3]
+
+
+def test_hosted_batches_are_decoded_into_arrays():
+    def proto_row(i):
+        row = serving_pb2.TrainingDataRow()
+        row.features.add().double_value = i * 1.5
+        row.features.add().int64_value = i
+        row.label.bool_value = i % 2 == 0
+        return row
+
+    class FakeStub:
+        def TrainingData(self, req):
+            return iter([proto_row(i) for i in range(5)])
+
+    dataset = Dataset(Stream(FakeStub(), "name", "variant")).batch(2)
+
+    batches = list(dataset)
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert batches[0].features().dtype == np.float64
+    np.testing.assert_array_equal(batches[1].features(), [[3.0, 2], [4.5, 3]])
+    np.testing.assert_array_equal(batches[1].label(), [1, 0])
+
+
+def test_mixed_dtype_batches_keep_typed_columns():
+    df = pd.DataFrame(
+        {
+            "f1.v": np.arange(6, dtype=np.float64),
+            "f2.v": [f"user_{i}" for i in range(6)],
+            "label": np.arange(6) % 2 == 0,
+        }
+    )
+    dataset = Dataset.from_dataframe(df, False).batch(4)
+
+    batch = next(dataset)
+    assert [column.dtype for column in batch.columns()] == [
+        np.float64,
+        object,
+        np.bool_,
+    ]
+    assert np.shares_memory(batch.columns()[0], df["f1.v"].to_numpy())
+    assert batch.label().dtype == np.bool_
+    assert batch.to_numpy().tolist()[1] == [1.0, "user_1", False]
+
+    shuffled = Dataset.from_dataframe(df, False).shuffle(1, seed=0).batch(6)
+    assert next(shuffled).columns()[0].dtype == np.float64
+
+
+def first_features(dataset):
+    return [row.features()[0][0] for row in dataset]
+
+
+def test_local_shuffle_is_a_seeded_permutation_per_epoch(numeric_df):
+    def shuffled(seed):
+        return first_features(
+            Dataset.from_dataframe(numeric_df, False).repeat(1).shuffle(1, seed=seed)
+        )
+
+    rows = shuffled(7)
+    assert rows == shuffled(7)
+    assert sorted(rows[:10]) == sorted(rows[10:]) == list(range(10))
+    assert rows[:10] != rows[10:]
+
+
+def test_local_shuffled_batches_are_gathered_by_index(numeric_df):
+    dataset = Dataset.from_dataframe(numeric_df, False).shuffle(1, seed=3).batch(4)
+
+    batches = list(dataset)
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+    features = np.concatenate([batch.features() for batch in batches])
+    np.testing.assert_array_equal(features[:, 1] - features[:, 0], [10] * 10)
+    assert sorted(features[:, 0]) == list(range(10))
+
+
+class ListStream:
+    def __init__(self, rows):
+        self._rows = rows
+        self._iter = iter(rows)
+
+    def __next__(self):
+        return next(self._iter)
+
+    def restart(self):
+        self._iter = iter(self._rows)
+
+
+def test_buffer_shuffle_is_seeded_and_keeps_every_row():
+    def shuffled(seed):
+        return list(Shuffle(4, ListStream(list(range(20))), seed))
+
+    rows = shuffled(11)
+    assert rows == shuffled(11)
+    assert sorted(rows) == list(range(20))
+
+
+def test_buffer_shuffle_restart_clears_the_buffer():
+    shuffle = Shuffle(4, ListStream(list(range(6))), seed=1)
+    next(shuffle)
+
+    shuffle.restart()
+
+    assert sorted(shuffle) == list(range(6))
+
+
+def test_pandas_without_steps_returns_the_training_set(numeric_df):
+    assert Dataset.from_dataframe(numeric_df, False).pandas() is numeric_df
+
+
+def test_pandas_repeat_and_shuffle_are_applied_on_demand(numeric_df):
+    dataset = Dataset.from_dataframe(numeric_df, False).repeat(2).shuffle(1, seed=5)
+
+    df = dataset.pandas()
+    assert len(df) == 30
+    assert sorted(df["f1.v"]) == sorted(list(range(10)) * 3)
+    pd.testing.assert_frame_equal(df, dataset.pandas())
+    assert numeric_df["f1.v"].tolist() == list(range(10))
+
+
+def test_pandas_batches_are_sliced_when_accessed(numeric_df):
+    batches = Dataset.from_dataframe(numeric_df, False).batch(4).pandas()
+
+    assert len(batches) == 3
+    assert [len(batch) for batch in batches] == [4, 3, 3]
+    pd.testing.assert_frame_equal(batches[-1], numeric_df.iloc[7:])
+    assert len(batches[1:]) == 2
@@ -0,0 +1,95 @@
+import os
+import glob
+
+import numpy as np
+import pandas as pd
+import pytest
+from featureform import local_ingest_cache
+from featureform.local_ingest_cache import IngestCache
+
+
+@pytest.fixture
+def events_csv(tmp_path):
+    path = tmp_path / "events.csv"
+    pd.DataFrame(
+        {
+            "user": ["a", "b", None],
+            "value": [1, 2, 3],
+            "score": [0.5, np.nan, 1.5],
+            "flag": [True, False, True],
+        }
+    ).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return IngestCache(str(tmp_path / "ingest"))
+
+
+def test_cached_reads_match_the_csv(cache, events_csv):
+    expected = pd.read_csv(events_csv)
+
+    pd.testing.assert_frame_equal(cache.read(events_csv), expected)
+    assert os.path.exists(cache.path(events_csv))
+    pd.testing.assert_frame_equal(cache.read(events_csv), expected)
+    assert np.isnan(cache.read(events_csv)["user"][2])
+
+
+def test_csv_is_parsed_once_per_file_version(cache, events_csv, monkeypatch):
+    cache.read(events_csv)
+    first_copy = cache.path(events_csv)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("CSV parsed again")
+
+    with monkeypatch.context() as m:
+        m.setattr(pd, "read_csv", fail)
+        assert cache.read(events_csv, ["value"])["value"].tolist() == [1, 2, 3]
+
+    pd.DataFrame({"user": ["c"], "value": [4]}).to_csv(events_csv, index=False)
+    os.utime(events_csv, ns=(0, os.stat(events_csv).st_mtime_ns + 10**9))
+
+    assert cache.read(events_csv)["value"].tolist() == [4]
+    assert cache.path(events_csv) != first_copy
+    assert glob.glob(os.path.join(cache.ingest_dir, "*.parquet")) == [
+        cache.path(events_csv)
+    ]
+
+
+def test_copies_removed_by_another_process_are_skipped(cache, events_csv, monkeypatch):
+    cached_path = cache.path(events_csv)
+    gone = cached_path.replace(".parquet", "0.parquet")
+    find = glob.glob
+
+    def find_copies(pattern):
+        # Another process already removed one stale copy and wrote the current one
+        return [gone, cached_path] + find(pattern)
+
+    monkeypatch.setattr(local_ingest_cache.glob, "glob", find_copies)
+
+    assert cache.read(events_csv)["value"].tolist() == [1, 2, 3]
+    assert os.path.exists(cached_path)
+
+
+def test_only_requested_columns_are_read(cache, events_csv):
+    df = cache.read(events_csv, ["score", "user", "missing"])
+
+    assert df.columns.tolist() == ["user", "score"]
+
+
+def test_values_arrow_cannot_hold_are_read_from_the_csv(cache, tmp_path, monkeypatch):
+    path = str(tmp_path / "mixed.csv")
+    pd.DataFrame({"user": ["u0", "u1"], "value": [0, 1]}).to_csv(path, index=False)
+    read_csv = pd.read_csv
+
+    def read_mixed(csv_path, **kwargs):
+        # Low-memory parsing can leave a column with both ints and strings
+        if kwargs:
+            return read_csv(csv_path, **kwargs)
+        return pd.DataFrame({"user": ["u0", "u1"], "value": [0, "1"]})
+
+    monkeypatch.setattr(pd, "read_csv", read_mixed)
+
+    assert cache.read(path, ["value"])["value"].tolist() == [0, 1]
+    assert not os.path.exists(cache.path(path))
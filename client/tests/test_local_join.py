@@ -0,0 +1,146 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from featureform.local_join import PointInTimeJoin, join_lag_features
+
+
+@pytest.fixture
+def labels():
+    return pd.DataFrame(
+        {
+            "user": ["a", "b", "a", "c", "a"],
+            "label": [1, 0, 1, 0, 1],
+            "ts": pd.to_datetime(
+                [
+                    "2022-01-02",
+                    "2022-01-01",
+                    "2022-01-05",
+                    "2022-01-03",
+                    "2022-01-01",
+                ]
+            ),
+        }
+    )
+
+
+def test_timestamped_feature_uses_latest_value_before_label(labels):
+    feature = pd.DataFrame(
+        {
+            "user": ["a", "a", "b", "a"],
+            "f.v": [10.0, 20.0, 30.0, 40.0],
+            "fts": pd.to_datetime(
+                ["2022-01-01", "2022-01-03", "2022-01-02", "2022-01-05"]
+            ),
+        }
+    )
+    join = PointInTimeJoin(labels, "user", "ts")
+    join.add_feature("f.v", feature, "user", "f.v", "fts")
+    df = join.join()
+
+    assert df.columns.tolist() == ["user", "label", "ts", "f.v"]
+    assert df["user"].tolist() == labels["user"].tolist()
+    np.testing.assert_array_equal(
+        df["f.v"].to_numpy(), [10.0, np.nan, 40.0, np.nan, 10.0]
+    )
+
+
+def test_untimestamped_feature_uses_last_row_per_entity(labels):
+    feature = pd.DataFrame({"id": ["a", "b", "a"], "g.v": [1, 2, 3]})
+    join = PointInTimeJoin(labels.set_index("user"), "user", "ts")
+    join.add_feature("g.v", feature, "id", "g.v")
+    df = join.join()
+
+    np.testing.assert_array_equal(df["g.v"].to_numpy(), [3, 2, 3, np.nan, 3])
+
+
+def test_entities_of_different_types_are_matched_as_strings():
+    labels = pd.DataFrame({"user": [1, 2], "label": [True, False]})
+    feature = pd.DataFrame({"user": ["2", "1"], "f.v": ["x", "y"]})
+    join = PointInTimeJoin(labels, "user")
+    join.add_feature("f.v", feature, "user", "f.v")
+
+    assert join.join()["f.v"].tolist() == ["y", "x"]
+
+
+def test_matches_merge_asof():
+    rng = np.random.default_rng(7)
+    n = 500
+    labels = pd.DataFrame(
+        {
+            "user": rng.integers(0, 20, n),
+            "label": rng.integers(0, 2, n),
+            "ts": pd.to_datetime(rng.integers(0, 10**6, n), unit="s"),
+        }
+    ).sort_values("ts", ignore_index=True)
+    features = [
+        pd.DataFrame(
+            {
+                "user": rng.integers(0, 25, n),
+                f"f{i}": rng.normal(size=n),
+                "fts": pd.to_datetime(rng.choice(10**6, n, replace=False), unit="s"),
+            }
+        )
+        for i in range(3)
+    ]
+
+    join = PointInTimeJoin(labels, "user", "ts")
+    expected = labels
+    for i, feature in enumerate(features):
+        join.add_feature(f"f{i}", feature, "user", f"f{i}", "fts")
+        expected = pd.merge_asof(
+            expected,
+            feature.sort_values("fts"),
+            left_on="ts",
+            right_on="fts",
+            by="user",
+        ).drop(columns="fts")
+
+    pd.testing.assert_frame_equal(join.join(), expected)
+
+
+def test_lag_features_match_a_row_by_row_reference():
+    rng = np.random.default_rng(3)
+    n = 200
+    source_0 = pd.DataFrame(
+        {
+            "user": rng.choice(["a", "b", "c"], n),
+            "ts": pd.to_datetime(rng.choice(10**5, n, replace=False), unit="s"),
+            "f.v": rng.integers(0, 100, n),
+            "label": rng.normal(size=n),
+        }
+    )
+    lag_features = [
+        {
+            "feature_name": "f",
+            "feature_variant": "v",
+            "feature_lag": lag,
+            "feature_new_name": f"lag_{lag}",
+        }
+        for lag in (600.0, 3600.0)
+    ]
+
+    # Each lag is the latest value for the user at least lag seconds before the row
+    expected = source_0.sort_values("ts", ignore_index=True)
+    for lag_feature in lag_features:
+        lag = pd.Timedelta(seconds=lag_feature["feature_lag"])
+        values = []
+        for _, row in expected.iterrows():
+            earlier = expected[
+                (expected["user"] == row["user"]) & (expected["ts"] + lag <= row["ts"])
+            ]
+            values.append(earlier["f.v"].iloc[-1] if len(earlier) else np.nan)
+        expected[lag_feature["feature_new_name"]] = values
+    expected = expected[["user", "ts", "f.v", "lag_600.0", "lag_3600.0", "label"]]
+    df = join_lag_features(source_0, lag_features, ["f.v"], "user", "label", "ts")
+
+    assert df.columns.tolist() == [
+        "user",
+        "ts",
+        "f.v",
+        "lag_600.0",
+        "lag_3600.0",
+        "label",
+    ]
+    assert df["f.v"].dtype == source_0["f.v"].dtype
+    pd.testing.assert_frame_equal(df, expected)
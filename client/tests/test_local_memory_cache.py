@@ -0,0 +1,120 @@
+import pandas as pd
+import pytest
+from featureform import local_cache as local_cache_module
+from featureform.local_cache import MEMORY_CACHE_MAX_BYTES_ENV
+from featureform.local_cache_storage import write_entry
+from featureform.local_memory_cache import MemoryLRU, frame_size
+
+
+def count_reads(monkeypatch):
+    reads = []
+    read_entry = local_cache_module.read_entry
+
+    def counting_read_entry(path):
+        reads.append(path)
+        return read_entry(path)
+
+    monkeypatch.setattr(local_cache_module, "read_entry", counting_read_entry)
+    return reads
+
+
+def test_least_recently_used_frames_are_dropped(frame):
+    size = frame_size(frame(100))
+    memory = MemoryLRU(2 * size)
+    memory.put("a", frame(100))
+    memory.put("b", frame(100))
+    memory.get("a")
+
+    memory.put("c", frame(100))
+
+    assert "a" in memory and "c" in memory and "b" not in memory
+    assert memory.size_bytes == 2 * size
+
+
+def test_frames_larger_than_the_budget_are_not_kept(frame):
+    memory = MemoryLRU(frame_size(frame(10)))
+    memory.put("big", frame(1000))
+    assert len(memory) == 0
+
+
+def test_returned_frames_do_not_share_columns(frame):
+    memory = MemoryLRU(1 << 20)
+    memory.put("a", frame(10))
+
+    df = memory.get("a")
+    df.drop(columns=["value"], inplace=True)
+    df["other"] = 1
+
+    assert list(memory.get("a").columns) == ["value"]
+
+
+def test_stale_versions_are_not_returned(frame):
+    memory = MemoryLRU(1 << 20)
+    memory.put("a", frame(10), version=1)
+    assert memory.get("a", version=2) is None
+    assert memory.get("a", version=1) is not None
+
+
+def test_hits_are_served_from_memory(
+    cache_dir, monkeypatch, frame, keyed_by_name_cache
+):
+    reads = count_reads(monkeypatch)
+    local_cache = keyed_by_name_cache()
+    local_cache.get_or_put("feature", "a", "v", lambda: frame(10))
+
+    df = local_cache.get_or_put("feature", "a", "v", lambda: frame(0))
+
+    assert reads == []
+    pd.testing.assert_frame_equal(df, frame(10))
+    assert local_cache.entries()[0].hits == 1
+
+
+def test_a_new_process_reads_from_disk_once(
+    cache_dir, monkeypatch, frame, keyed_by_name_cache
+):
+    reads = count_reads(monkeypatch)
+    keyed_by_name_cache().get_or_put("feature", "a", "v", lambda: frame(10))
+    local_cache = keyed_by_name_cache()
+
+    local_cache.get_or_put("feature", "a", "v", lambda: frame(0))
+    df = local_cache.get_or_put("feature", "a", "v", lambda: frame(0))
+
+    assert len(reads) == 1
+    pd.testing.assert_frame_equal(df, frame(10))
+
+
+def test_entries_rewritten_on_disk_are_read_again(
+    cache_dir, monkeypatch, frame, keyed_by_name_cache
+):
+    local_cache = keyed_by_name_cache()
+    local_cache.get_or_put("feature", "a", "v", lambda: frame(10))
+
+    file_path = local_cache.cache_file_path("feature", "a", "v")
+    write_entry(file_path, frame(10, start=100))
+    df = local_cache.get_or_put("feature", "a", "v", lambda: frame(0))
+
+    pd.testing.assert_frame_equal(df, frame(10, start=100))
+
+
+def test_memory_tier_can_be_turned_off(
+    cache_dir, monkeypatch, frame, keyed_by_name_cache
+):
+    monkeypatch.setenv(MEMORY_CACHE_MAX_BYTES_ENV, "0")
+    reads = count_reads(monkeypatch)
+    local_cache = keyed_by_name_cache()
+    local_cache.get_or_put("feature", "a", "v", lambda: frame(10))
+
+    local_cache.get_or_put("feature", "a", "v", lambda: frame(0))
+
+    assert len(local_cache.memory) == 0
+    assert len(reads) == 1
+
+
+def test_evicted_entries_leave_memory(cache_dir, frame, keyed_by_name_cache):
+    local_cache = keyed_by_name_cache()
+    local_cache.get_or_put("feature", "a", "v", lambda: frame(10))
+    file_path = local_cache.cache_file_path("feature", "a", "v")
+
+    local_cache.evict(0)
+
+    assert file_path not in local_cache.memory
@@ -0,0 +1,173 @@
+import os
+import shutil
+import stat
+
+import featureform as ff
+import pandas as pd
+import pytest
+from featureform.local_read_planner import SourceReader, read_source
+from featureform.local_utils import feature_df_from_csv
+
+
+@pytest.fixture
+def wide_frame():
+    return pd.DataFrame(
+        {
+            "user": ["a", "b", "c"],
+            "ts": ["2022-01-01", "2022-01-02", "2022-01-03"],
+            "value": [1, 2, 3],
+            "label": [True, False, True],
+            "unused": [0.1, 0.2, 0.3],
+        }
+    )
+
+
+@pytest.fixture
+def wide_csv(tmp_path, wide_frame):
+    path = tmp_path / "wide.csv"
+    wide_frame.to_csv(path, index=False)
+    return str(path)
+
+
+def feature(**columns):
+    resource = {
+        "source_entity": "user",
+        "source_value": "value",
+        "source_timestamp": "",
+    }
+    resource.update(columns)
+    return resource
+
+
+def test_only_requested_columns_are_read(tmp_path, wide_csv, wide_frame):
+    parquet = str(tmp_path / "wide.parquet")
+    wide_frame.to_parquet(parquet)
+
+    assert read_source(wide_csv, ["value", "user"]).columns.tolist() == [
+        "user",
+        "value",
+    ]
+    assert read_source(parquet, ["value", "user"]).columns.tolist() == [
+        "user",
+        "value",
+    ]
+    assert len(read_source(wide_csv).columns) == 5
+
+
+def test_missing_columns_are_still_reported(wide_csv):
+    with pytest.raises(KeyError, match="Value column does not exist: missing"):
+        feature_df_from_csv(feature(source_value="missing"), wide_csv)
+
+
+def count_reads(monkeypatch):
+    reads = []
+
+    read_file = SourceReader.read_file
+
+    def read(self, path, columns=None):
+        reads.append(None if columns is None else sorted(columns))
+        return read_file(self, path, columns)
+
+    monkeypatch.setattr(SourceReader, "read_file", read)
+    return reads
+
+
+def test_planned_sources_are_read_once(monkeypatch, wide_csv):
+    reads = count_reads(monkeypatch)
+    reader = SourceReader()
+
+    with reader.planned({wide_csv: {"user", "value", "ts"}}):
+        first = reader.read(wide_csv, ["user", "value"])
+        second = reader.read(wide_csv, ["user", "ts"])
+
+    assert reads == [["ts", "user", "value"]]
+    assert first.columns.tolist() == ["user", "value"]
+    assert second.columns.tolist() == ["user", "ts"]
+
+
+def test_reads_outside_the_plan_are_not_shared(monkeypatch, wide_csv):
+    reads = count_reads(monkeypatch)
+    reader = SourceReader()
+
+    with reader.planned({wide_csv: {"user", "value"}}):
+        reader.read(wide_csv, ["user", "label"])
+    reader.read(wide_csv, ["user", "value"])
+
+    assert reads == [["label", "user"], ["user", "value"]]
+
+
+@pytest.fixture(scope="function")
+def shared_source_setup(wide_csv):
+    ff.register_user("featureformer").make_default_owner()
+    local = ff.register_local()
+    events = local.register_file(name="events", variant="reads", path=wide_csv)
+    user = ff.register_entity("user")
+    events.register_resources(
+        entity=user,
+        entity_column="user",
+        inference_store=local,
+        features=[
+            {"name": "value", "variant": "reads", "column": "value", "type": "int"},
+        ],
+        labels=[
+            {"name": "label", "variant": "reads", "column": "label", "type": "bool"},
+        ],
+    )
+
+    @local.df_transformation(variant="reads", inputs=[("events", "reads")])
+    def doubled(df):
+        df["doubled"] = df["value"] * 2
+        return df
+
+    doubled.register_resources(
+        entity=user,
+        entity_column="user",
+        inference_store=local,
+        features=[
+            {"name": "doubled", "variant": "reads", "column": "doubled", "type": "int"},
+        ],
+    )
+    ff.register_training_set(
+        "events",
+        "reads",
+        label=("label", "reads"),
+        features=[("value", "reads"), ("doubled", "reads")],
+    )
+    ff.ResourceClient(local=True).apply()
+    client = ff.ServingClient(local=True)
+    yield client
+
+    client.impl.db.close()
+    ff.clear_state()
+    shutil.rmtree(".featureform", onerror=del_rw)
+
+
+def del_rw(action, name, exc):
+    if os.path.exists(name):
+        os.chmod(name, stat.S_IWRITE)
+        os.remove(name)
+
+
+@pytest.mark.local
+def test_training_set_reads_each_source_once(monkeypatch, shared_source_setup):
+    reads = count_reads(monkeypatch)
+
+    df = shared_source_setup.training_set("events", "reads").pandas()
+
+    # The transformation needs every column, so the features and label share its read
+    assert reads == [None]
+    assert df["doubled.reads"].tolist() == [2, 4, 6]
+    assert df["value.reads"].tolist() == [1, 2, 3]
+
+
+@pytest.mark.local
+def test_plan_unions_the_columns_of_each_source(shared_source_setup, wide_csv):
+    impl = shared_source_setup.impl
+    value = impl.db.get_feature_variant("value", "reads")
+    label = impl.db.get_label_variant("label", "reads")
+    doubled = impl.db.get_feature_variant("doubled", "reads")
+
+    assert impl.plan_source_reads([value, label]) == {
+        wide_csv: {"user", "value", "label"}
+    }
+    assert impl.plan_source_reads([value, doubled]) == {wide_csv: None}
@@ -0,0 +1,128 @@
+import os
+
+import pandas as pd
+import pytest
+from featureform.local_remote_cache import (
+    REMOTE_CACHE_ENDPOINT_ENV,
+    REMOTE_CACHE_ENV,
+    REMOTE_CACHE_UPLOAD_ENV,
+    DirectoryRemoteCache,
+    S3RemoteCache,
+    flush_uploads,
+    remote_cache_from_env,
+)
+
+
+def fail():
+    raise AssertionError("the entry should have come from the remote cache")
+
+
+@pytest.fixture
+def remote_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv(REMOTE_CACHE_ENV, str(tmp_path / "remote"))
+    return tmp_path / "remote"
+
+
+def test_entries_computed_elsewhere_are_downloaded(
+    tmp_path, remote_dir, frame, keyed_by_name_cache
+):
+    ci = keyed_by_name_cache(tmp_path / "ci")
+    ci.get_or_put("feature", "a", "v", frame)
+    flush_uploads()
+    assert os.listdir(remote_dir) == ["feature__a.arrow"]
+
+    laptop = keyed_by_name_cache(tmp_path / "laptop")
+    df = laptop.get_or_put("feature", "a", "v", fail)
+
+    pd.testing.assert_frame_equal(df, frame())
+    assert os.path.exists(tmp_path / "laptop" / "feature__a.arrow")
+    [metrics] = laptop.metrics()
+    assert (metrics.hits, metrics.misses) == (1, 0)
+    assert [entry.compute_seconds for entry in laptop.entries()] == [0]
+
+
+def test_uploads_can_be_turned_off(
+    tmp_path, remote_dir, monkeypatch, frame, keyed_by_name_cache
+):
+    monkeypatch.setenv(REMOTE_CACHE_UPLOAD_ENV, "false")
+    keyed_by_name_cache(tmp_path / "laptop").get_or_put("feature", "a", "v", frame)
+    flush_uploads()
+
+    assert not os.path.exists(remote_dir)
+
+
+def test_pickled_entries_stay_local(tmp_path, remote_dir, frame, keyed_by_name_cache):
+    def mixed():
+        # Object columns holding anything but strings fall back to pickle
+        return pd.DataFrame({"value": [1, "b", None]})
+
+    ci = keyed_by_name_cache(tmp_path / "ci")
+    ci.get_or_put("feature", "a", "v", mixed)
+    flush_uploads()
+    assert not os.path.exists(remote_dir)
+
+    remote_dir.mkdir()
+    frame().to_pickle(remote_dir / "feature__b.pkl")
+    laptop = keyed_by_name_cache(tmp_path / "laptop")
+    df = laptop.get_or_put("feature", "b", "v", lambda: frame(10))
+
+    pd.testing.assert_frame_equal(df, frame(10))
+    assert not os.path.exists(tmp_path / "laptop" / "feature__b.pkl")
+
+
+def test_unreachable_remote_caches_fall_back_to_computing(
+    tmp_path, frame, keyed_by_name_cache
+):
+    local_cache = keyed_by_name_cache(tmp_path / "laptop")
+
+    class Unreachable:
+        def download(self, name, path):
+            raise OSError("connection refused")
+
+        def upload(self, path, name):
+            raise OSError("connection refused")
+
+    local_cache.remote = Unreachable()
+    with pytest.warns(UserWarning, match="remote cache"):
+        df = local_cache.get_or_put("feature", "a", "v", frame)
+        flush_uploads()
+
+    pd.testing.assert_frame_equal(df, frame())
+
+
+def test_remote_cache_from_env(tmp_path, monkeypatch):
+    monkeypatch.delenv(REMOTE_CACHE_ENV, raising=False)
+    assert remote_cache_from_env() is None
+
+    monkeypatch.setenv(REMOTE_CACHE_ENV, f"file://{tmp_path}")
+    remote = remote_cache_from_env()
+    assert isinstance(remote, DirectoryRemoteCache)
+    assert remote.root == str(tmp_path)
+
+    monkeypatch.setenv(REMOTE_CACHE_ENV, "ftp://cache")
+    with pytest.raises(ValueError):
+        remote_cache_from_env()
+
+
+def test_s3_remote_cache(tmp_path, monkeypatch, frame, keyed_by_name_cache):
+    moto = pytest.importorskip("moto")
+    boto3 = pytest.importorskip("boto3")
+    mock_s3 = getattr(moto, "mock_aws", None) or moto.mock_s3
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.delenv(REMOTE_CACHE_ENDPOINT_ENV, raising=False)
+    with mock_s3():
+        boto3.client("s3").create_bucket(Bucket="featureform")
+        monkeypatch.setenv(REMOTE_CACHE_ENV, "s3://featureform/local-cache")
+        assert isinstance(remote_cache_from_env(), S3RemoteCache)
+
+        ci = keyed_by_name_cache(tmp_path / "ci")
+        ci.get_or_put("feature", "a", "v", frame)
+        flush_uploads()
+        laptop = keyed_by_name_cache(tmp_path / "laptop")
+        df = laptop.get_or_put("feature", "a", "v", fail)
+        missing = laptop.get_or_put("feature", "b", "v", frame)
+
+    pd.testing.assert_frame_equal(df, frame())
+    pd.testing.assert_frame_equal(missing, frame())
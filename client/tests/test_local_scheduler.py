@@ -0,0 +1,141 @@
+import json
+import os
+import shutil
+import stat
+import threading
+
+import featureform as ff
+import pandas as pd
+import pytest
+from featureform.local_scheduler import (
+    LocalDAGScheduler,
+    feature_node,
+    source_node,
+)
+
+
+class FakeDB:
+    def __init__(self, sources):
+        self.sources = sources
+
+    def is_transformation(self, name, variant):
+        return "DF" if self.sources[name] else "PRIMARY"
+
+    def get_source_variant(self, name, variant):
+        return {"inputs": json.dumps([[i, variant] for i in self.sources[name]])}
+
+    def get_feature_variant(self, name, variant):
+        return {"source_name": name.split("_")[0], "source_variant": variant}
+
+
+class FakeCache:
+    def __init__(self, cached=()):
+        self.cached = set(cached)
+
+    def is_cached(self, resource_type, name, variant):
+        return (resource_type, name) in self.cached
+
+
+class FakeClient:
+    """
+    Both primary sources wait on a barrier, so the run only finishes if they are read concurrently.
+    """
+
+    def __init__(self, sources, cached=()):
+        self.db = FakeDB(sources)
+        self.local_cache = FakeCache(cached)
+        self.barrier = threading.Barrier(2, timeout=5)
+        self.calls = []
+
+    def get_input_df(self, name, variant, inputs):
+        self.calls.append(name)
+        if not self.db.sources[name]:
+            self.barrier.wait()
+            return pd.DataFrame({"x": [len(name)]})
+        dfs = [inputs[source_node(i, variant)] for i in self.db.sources[name]]
+        return pd.concat(dfs, ignore_index=True)
+
+    def get_feature_dataframe(self, feature, inputs):
+        return inputs[source_node(feature["source_name"], feature["source_variant"])]
+
+
+SOURCES = {"a": [], "bb": [], "join": ["a", "bb"], "twice": ["join", "a"]}
+
+
+def test_independent_nodes_run_concurrently():
+    client = FakeClient(SOURCES)
+    scheduler = LocalDAGScheduler(client, max_workers=4)
+
+    results = scheduler.run([feature_node("twice_f", "v")])
+
+    assert results[feature_node("twice_f", "v")]["x"].tolist() == [1, 2, 1]
+    assert sorted(client.calls) == ["a", "bb", "join", "twice"]
+
+
+def test_cached_nodes_do_not_resolve_their_inputs():
+    client = FakeClient(SOURCES, cached=[("transformation", "join")])
+    scheduler = LocalDAGScheduler(client, max_workers=4)
+
+    assert scheduler.resolve([source_node("twice", "v")]) == {
+        source_node("twice", "v"): {source_node("join", "v"), source_node("a", "v")},
+        source_node("join", "v"): set(),
+        source_node("a", "v"): set(),
+    }
+
+
+def test_failures_are_raised():
+    def fail(name, variant, inputs):
+        raise ValueError("boom")
+
+    client = FakeClient({"a": ["missing"], "missing": []})
+    client.get_input_df = fail
+
+    with pytest.raises(ValueError, match="boom"):
+        LocalDAGScheduler(client, max_workers=2).run([source_node("a", "v")])
+
+
+@pytest.fixture(scope="function")
+def shared_input_setup(tmp_path_factory):
+    source_file = tmp_path_factory.mktemp("test_inputs") / "values.csv"
+    pd.DataFrame({"user": ["a", "b"], "value": [1, 2]}).to_csv(source_file, index=False)
+
+    ff.register_user("featureformer").make_default_owner()
+    local = ff.register_local()
+    values = local.register_file(name="values", variant="dag", path=str(source_file))
+
+    @local.df_transformation(variant="dag", inputs=[("values", "dag")])
+    def doubled(df):
+        df["value"] = df["value"] * 2
+        return df
+
+    @local.df_transformation(variant="dag", inputs=[("values", "dag")])
+    def untouched(df):
+        return df
+
+    @local.df_transformation(
+        variant="dag", inputs=[("doubled", "dag"), ("untouched", "dag")]
+    )
+    def combined(doubled, untouched):
+        return doubled.merge(untouched, on="user", suffixes=("_doubled", ""))
+
+    ff.ResourceClient(local=True).apply()
+    client = ff.ServingClient(local=True)
+    yield client
+
+    client.impl.db.close()
+    ff.clear_state()
+    shutil.rmtree(".featureform", onerror=del_rw)
+
+
+def del_rw(action, name, exc):
+    if os.path.exists(name):
+        os.chmod(name, stat.S_IWRITE)
+        os.remove(name)
+
+
+@pytest.mark.local
+def test_transformations_do_not_see_each_others_changes(shared_input_setup):
+    df = shared_input_setup.impl.process_transformation("combined", "dag")
+
+    assert df["value_doubled"].tolist() == [2, 4]
+    assert df["value"].tolist() == [1, 2]
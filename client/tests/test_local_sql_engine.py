@@ -0,0 +1,115 @@
+import json
+
+import pandas as pd
+import pytest
+from featureform.local_sql import (
+    AutoSQLEngine,
+    DuckDBEngine,
+    PandasSQLEngine,
+    get_sql_engine,
+)
+from featureform.enums import SourceType
+from featureform.local_cache import LocalCache
+from featureform.resources import LocalConfig
+
+pytest.importorskip("duckdb")
+
+
+@pytest.fixture
+def tables():
+    return {
+        "dataframes_0": pd.DataFrame(
+            {"user": ["a", "b", "a", "c"], "amount": [1.0, 2.0, 3.0, 4.0]}
+        )
+    }
+
+
+QUERY = (
+    "SELECT user, SUM(amount) AS total FROM dataframes_0 GROUP BY user ORDER BY user"
+)
+
+
+@pytest.mark.local
+@pytest.mark.parametrize("engine", [PandasSQLEngine, DuckDBEngine, AutoSQLEngine])
+def test_engines_agree(engine, tables):
+    df = engine().execute(QUERY, tables)
+    pd.testing.assert_frame_equal(
+        df, pd.DataFrame({"user": ["a", "b", "c"], "total": [4.0, 2.0, 4.0]})
+    )
+
+
+@pytest.mark.local
+def test_auto_falls_back_to_pandasql_for_sqlite_only_queries(tables):
+    query = "SELECT user, DATETIME('2020-01-01', '+1 day') AS ts FROM dataframes_0"
+    df = AutoSQLEngine().execute(query, tables)
+    assert df["ts"].tolist() == ["2020-01-02 00:00:00"] * 4
+
+
+@pytest.mark.local
+def test_engine_selection(monkeypatch):
+    monkeypatch.delenv("FEATUREFORM_LOCAL_SQL_ENGINE", raising=False)
+    assert isinstance(get_sql_engine(), PandasSQLEngine)
+
+    monkeypatch.setenv("FEATUREFORM_LOCAL_SQL_ENGINE", "auto")
+    assert isinstance(get_sql_engine(), AutoSQLEngine)
+    assert isinstance(get_sql_engine("duckdb"), DuckDBEngine)
+
+    with pytest.raises(ValueError):
+        get_sql_engine("spark")
+
+
+@pytest.mark.local
+def test_local_config_serializes_sql_engine():
+    assert json.loads(LocalConfig().serialize()) == {}
+    assert json.loads(LocalConfig(sql_engine="duckdb").serialize()) == {
+        "SQLEngine": "duckdb"
+    }
+
+
+class SQLTransformationMetadata:
+    """
+    Metadata holding a single SQL transformation on a local provider with the given engine.
+    """
+
+    def __init__(self, sql_engine):
+        self.sql_engine = sql_engine
+
+    def get_source_variant(self, name, variant):
+        return {
+            "definition": "SELECT 7 / 2 AS ratio",
+            "inputs": "[]",
+            "provider": "local-mode",
+        }
+
+    def is_transformation(self, name, variant):
+        return SourceType.SQL_TRANSFORMATION.value
+
+    def get_provider(self, name, should_fetch_tags_properties):
+        return {
+            "serialized_config": LocalConfig(sql_engine=self.sql_engine).serialize()
+        }
+
+
+@pytest.mark.local
+def test_default_engine_keeps_sqlite_semantics(monkeypatch):
+    monkeypatch.delenv("FEATUREFORM_LOCAL_SQL_ENGINE", raising=False)
+    df = get_sql_engine().execute("SELECT 7 / 2 AS ratio", {})
+    assert df["ratio"].tolist() == [3]
+
+
+@pytest.mark.local
+def test_cache_keys_depend_on_the_engine(monkeypatch):
+    monkeypatch.delenv("FEATUREFORM_LOCAL_SQL_ENGINE", raising=False)
+    keys = {
+        sql_engine: LocalCache(SQLTransformationMetadata(sql_engine)).source_key(
+            "ratio", "v"
+        )
+        for sql_engine in ["", "pandasql", "duckdb"]
+    }
+    assert keys[""] == keys["pandasql"]
+    assert keys["duckdb"] != keys["pandasql"]
+
+    monkeypatch.setenv("FEATUREFORM_LOCAL_SQL_ENGINE", "duckdb")
+    assert LocalCache(SQLTransformationMetadata("")).source_key("ratio", "v") == (
+        keys["duckdb"]
+    )
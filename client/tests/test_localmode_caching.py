@@ -1,6 +1,8 @@
 import os.path
 import shutil
 import stat
+import subprocess
+import sys
 from typing import Tuple, Callable, Any
 
 import featureform as ff
@@ -8,6 +10,8 @@ import pandas as pd
 import pytest
 from dataclasses import dataclass
 from featureform import local, ServingClient
+from featureform import local_cache as local_cache_module
+from featureform.local_cache_storage import read_entry, write_entry
 
 real_path = os.path.realpath(__file__)
 dir_path = os.path.dirname(real_path)
@@ -102,6 +106,37 @@ def del_rw(action, name, exc):
         os.remove(name)
 
 
+def cache_file(fixture, resource_type, name, variant):
+    local_cache = fixture.serving_client.impl.local_cache
+    return local_cache.cache_file_path(resource_type, name, variant)
+
+
+FINGERPRINT_SCRIPT = """
+from featureform.local_cache import code_fingerprint
+
+def transformation(df):
+    # The set literal compiles to a frozenset, nested in the lambda's code
+    return df[df["state"].map(lambda state: state not in {"CA", "NY", "TX", "WA", "OR"})]
+
+print(code_fingerprint(transformation.__code__))
+"""
+
+
+def test_code_fingerprints_do_not_depend_on_the_hash_seed():
+    fingerprints = set()
+    for seed in ["1", "2"]:
+        result = subprocess.run(
+            [sys.executable, "-W", "ignore", "-c", FINGERPRINT_SCRIPT],
+            env={**os.environ, "PYTHONHASHSEED": seed},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        fingerprints.add(result.stdout.strip())
+
+    assert len(fingerprints) == 1
+
+
 class TestLocalCache:
     def test_cache_files_are_created(self, setup):
         """
@@ -112,10 +147,13 @@ class TestLocalCache:
         cache_files = os.listdir(".featureform/cache")
 
         expected_cache_files = [
-            "transformation__average_user_transaction__quickstart.pkl",
-            "feature__avg_transactions__quickstart.pkl",
-            "label__fraudulent__quickstart.pkl",
-            "training_set__fraud_training__quickstart.pkl",
+            os.path.basename(cache_file(setup, *resource))
+            for resource in [
+                ("transformation", "average_user_transaction", "quickstart"),
+                ("feature", "avg_transactions", "quickstart"),
+                ("label", "fraudulent", "quickstart"),
+                ("training_set", "fraud_training", "quickstart"),
+            ]
         ]
 
         assert os.path.exists(".featureform/cache")
@@ -129,11 +167,10 @@ class TestLocalCache:
         fixture = setup
 
         # make a change to the cached file
-        label_df = pd.read_pickle(
-            ".featureform/cache/label__fraudulent__quickstart.pkl"
-        )
+        cache_file_path = cache_file(fixture, "label", "fraudulent", "quickstart")
+        label_df = read_entry(cache_file_path)
         label_df["label"] = None
-        label_df.to_pickle(".featureform/cache/label__fraudulent__quickstart.pkl")
+        write_entry(cache_file_path, label_df)
 
         label = fixture.serving_client.impl.db.get_label_variant(
             "fraudulent", "quickstart"
@@ -147,13 +184,12 @@ class TestLocalCache:
         fixture = setup
 
         # make a change to the cached file
-        transformation_df = pd.read_pickle(
-            ".featureform/cache/transformation__average_user_transaction__quickstart.pkl"
+        cache_file_path = cache_file(
+            fixture, "transformation", "average_user_transaction", "quickstart"
         )
+        transformation_df = read_entry(cache_file_path)
         transformation_df["TransactionAmount"] = 0
-        transformation_df.to_pickle(
-            ".featureform/cache/transformation__average_user_transaction__quickstart.pkl"
-        )
+        write_entry(cache_file_path, transformation_df)
 
         transformation_df = fixture.serving_client.impl.process_transformation(
             "average_user_transaction", "quickstart"
@@ -166,13 +202,12 @@ class TestLocalCache:
         fixture = setup
 
         # make a change to the cached file
-        training_set_df = pd.read_pickle(
-            ".featureform/cache/training_set__fraud_training__quickstart.pkl"
+        cache_file_path = cache_file(
+            fixture, "training_set", "fraud_training", "quickstart"
         )
+        training_set_df = read_entry(cache_file_path)
         training_set_df["fraudulent"] = None
-        training_set_df.to_pickle(
-            ".featureform/cache/training_set__fraud_training__quickstart.pkl"
-        )
+        write_entry(cache_file_path, training_set_df)
 
         training_set = fixture.serving_client.training_set(
             "fraud_training", "quickstart"
@@ -254,3 +289,93 @@ class TestLocalCache:
 
         # ensure all values are 0
         assert feature_df["avg_transactions.quickstart"].all() == 0
+
+    def test_touching_a_file_keeps_the_cache(self, setup):
+        fixture = setup
+        cache_file_path = cache_file(fixture, "label", "fraudulent", "quickstart")
+
+        stat_result = os.stat(fixture.transactions_file)
+        os.utime(
+            fixture.transactions_file,
+            ns=(stat_result.st_atime_ns, stat_result.st_mtime_ns + 10**9),
+        )
+
+        assert (
+            cache_file(fixture, "label", "fraudulent", "quickstart") == cache_file_path
+        )
+
+    def test_identical_transformations_share_cache_entries(self, setup):
+        fixture = setup
+        transformation_file = cache_file(
+            fixture, "transformation", "average_user_transaction", "quickstart"
+        )
+
+        @local.df_transformation(
+            name="average_user_transaction",
+            variant="copy",
+            inputs=[("transactions", "quickstart")],
+        )
+        def average_user_transaction(transactions):
+            """the average transaction amount for a user"""
+            return transactions.groupby("CustomerID")["TransactionAmount"].mean()
+
+        @local.df_transformation(
+            name="average_user_transaction",
+            variant="max",
+            inputs=[("transactions", "quickstart")],
+        )
+        def max_user_transaction(transactions):
+            """the average transaction amount for a user"""
+            return transactions.groupby("CustomerID")["TransactionAmount"].max()
+
+        ff.ResourceClient(local=True).apply()
+
+        copy_file = cache_file(
+            fixture, "transformation", "average_user_transaction", "copy"
+        )
+        max_file = cache_file(
+            fixture, "transformation", "average_user_transaction", "max"
+        )
+        assert copy_file == transformation_file
+        assert max_file != transformation_file
+        assert fixture.serving_client.impl.local_cache.is_cached(
+            "transformation", "average_user_transaction", "copy"
+        )
+
+    def test_transformation_definitions_are_parsed_once(self, setup, monkeypatch):
+        local_cache = setup.serving_client.impl.local_cache
+        key = local_cache.source_key("average_user_transaction", "quickstart")
+        loads = []
+        dill_loads = local_cache_module.dill.loads
+        monkeypatch.setattr(
+            local_cache_module.dill,
+            "loads",
+            lambda *args: loads.append(args) or dill_loads(*args),
+        )
+
+        for _ in range(3):
+            assert (
+                local_cache.source_key("average_user_transaction", "quickstart") == key
+            )
+
+        assert loads == []
+
+    def test_frames_loaded_from_disk_can_be_modified(self, setup):
+        # A new client has an empty memory tier, like a fresh process, so frames come from disk
+        client = ff.Client(local=True)
+
+        # The transformation returns a Series of averages
+        averages = client.dataframe("average_user_transaction", "quickstart")
+        averages.iloc[0] = -1
+        training_set = client.training_set("fraud_training", "quickstart")
+        training_set_df = training_set.pandas()
+        training_set_df.iloc[0, 0] = -1
+        for row in training_set:
+            row.features()[0][0] = -1
+            break
+
+        averages = client.dataframe("average_user_transaction", "quickstart")
+        training_set_df = client.training_set("fraud_training", "quickstart").pandas()
+        assert (averages != -1).all()
+        assert (training_set_df.iloc[:, 0] != -1).all()
+        client.impl.db.close()
@@ -5,7 +5,6 @@ import pytest
 import pandas as pd
 import featureform as ff
 from featureform import local
-from featureform.serving import LocalClientImpl
 
 real_path = os.path.realpath(__file__)
 dir_path = os.path.dirname(real_path)
@@ -237,89 +236,3 @@ def test_local_lag_features(training_set_variant, expected_df_name, request):
     assert df.equals(
         expected_df
     ), f"The dataframes do not match. Expected: {expected_df.head()}, Got: {df.head()}, Expected Info: {expected_df.info()} Got: {df.info()}"
-
-
-@pytest.fixture()
-def no_lag_feature_sql():
-    return "SELECT * FROM source_0"
-
-
-@pytest.fixture()
-def one_lag_feature_sql():
-    return """SELECT entity_1, timestamp, "testing_feature.testing", "lag_1h", label FROM (SELECT * FROM (SELECT *, row_number FROM ( SELECT entity_1, timestamp, label, "testing_feature.testing", "lag_1h", ROW_NUMBER() over (PARTITION BY entity_1, label, timestamp ORDER BY timestamp DESC, t0_ts DESC) as row_number FROM (( SELECT * FROM source_0 ) 
-                         LEFT OUTER JOIN ( SELECT * FROM ( SELECT entity_1 AS t0_entity, "testing_feature.testing" AS "lag_1h", timestamp AS t0_ts
-                         FROM source_0) 
-                         ORDER BY t0_ts ASC) t0
-                         ON (t0_entity = entity_1 AND DATETIME(t0_ts, "+3600.0 seconds") <= timestamp)
-                         ) tt ) WHERE row_number=1 ORDER BY timestamp ASC ))"""
-
-
-@pytest.fixture()
-def two_lag_feature_sql():
-    return """SELECT entity_1, timestamp, "testing_feature.testing", "lag_1h", "lag_2h", label FROM (SELECT * FROM (SELECT *, row_number FROM ( SELECT entity_1, timestamp, label, "testing_feature.testing", "lag_1h", "lag_2h", ROW_NUMBER() over (PARTITION BY entity_1, label, timestamp ORDER BY timestamp DESC, t0_ts DESC, t1_ts DESC) as row_number FROM (( SELECT * FROM source_0 ) 
-                         LEFT OUTER JOIN ( SELECT * FROM ( SELECT entity_1 AS t0_entity, "testing_feature.testing" AS "lag_1h", timestamp AS t0_ts
-                         FROM source_0) 
-                         ORDER BY t0_ts ASC) t0
-                         ON (t0_entity = entity_1 AND DATETIME(t0_ts, "+3600.0 seconds") <= timestamp)
-                         
-                         LEFT OUTER JOIN ( SELECT * FROM ( SELECT entity_1 AS t1_entity, "testing_feature.testing" AS "lag_2h", timestamp AS t1_ts
-                         FROM source_0) 
-                         ORDER BY t1_ts ASC) t1
-                         ON (t1_entity = entity_1 AND DATETIME(t1_ts, "+7200.0 seconds") <= timestamp)
-                         ) tt ) WHERE row_number=1 ORDER BY timestamp ASC ))"""
-
-
-@pytest.mark.parametrize(
-    "lag_features, feature_columns, entity, label, ts, expected_sql_query",
-    [
-        ([], "", "", "", "", "no_lag_feature_sql"),
-        (
-            [
-                {
-                    "feature_name": "testing_feature",
-                    "feature_variant": "testing",
-                    "feature_lag": timedelta(hours=1).total_seconds(),
-                    "feature_new_name": "lag_1h",
-                }
-            ],
-            ["testing_feature.testing"],
-            "entity_1",
-            "label",
-            "timestamp",
-            "one_lag_feature_sql",
-        ),
-        (
-            [
-                {
-                    "feature_name": "testing_feature",
-                    "feature_variant": "testing",
-                    "feature_lag": timedelta(hours=1).total_seconds(),
-                    "feature_new_name": "lag_1h",
-                },
-                {
-                    "feature_name": "testing_feature",
-                    "feature_variant": "testing",
-                    "feature_lag": timedelta(hours=2).total_seconds(),
-                    "feature_new_name": "lag_2h",
-                },
-            ],
-            ["testing_feature.testing"],
-            "entity_1",
-            "label",
-            "timestamp",
-            "two_lag_feature_sql",
-        ),
-    ],
-)
-def test_get_lag_features_sql_query(
-    lag_features, feature_columns, entity, label, ts, expected_sql_query, request
-):
-    expected_sql_query = request.getfixturevalue(expected_sql_query)
-
-    local_client = LocalClientImpl()
-
-    lag_sql_query = local_client.get_lag_features_sql_query(
-        lag_features, feature_columns, entity, label, ts
-    )
-
-    assert lag_sql_query == expected_sql_query
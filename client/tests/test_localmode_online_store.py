@@ -0,0 +1,146 @@
+import os
+import shutil
+import stat
+import time
+from unittest import mock
+
+import featureform as ff
+import numpy as np
+import pandas as pd
+import pytest
+from featureform import serving
+from featureform.proto import serving_pb2
+from featureform.serving import HostedClientImpl
+from featureform.local_online_store import OnlineFeatureTable
+
+
+@pytest.fixture(scope="function")
+def online_store_setup(tmp_path_factory):
+    temp_dir = tmp_path_factory.mktemp("test_inputs")
+    source_file = temp_dir / "balances.csv"
+    pd.DataFrame(
+        {
+            "user": ["a", "b", "a"],
+            "balance": [1.0, 2.0, 3.0],
+        }
+    ).to_csv(source_file, index=False)
+
+    ff.register_user("featureformer").make_default_owner()
+    local = ff.register_local()
+    balances = local.register_file(
+        name="balances", variant="online", path=str(source_file)
+    )
+    user = ff.register_entity("user")
+    balances.register_resources(
+        entity=user,
+        entity_column="user",
+        inference_store=local,
+        features=[
+            {
+                "name": "balance",
+                "variant": "online",
+                "column": "balance",
+                "type": "float32",
+            },
+        ],
+    )
+    ff.ResourceClient(local=True).apply()
+
+    client = ff.ServingClient(local=True)
+    yield client, source_file
+
+    client.impl.db.close()
+    ff.clear_state()
+    shutil.rmtree(".featureform", onerror=del_rw)
+
+
+def del_rw(action, name, exc):
+    if os.path.exists(name):
+        os.chmod(name, stat.S_IWRITE)
+        os.remove(name)
+
+
+def test_online_table_keeps_latest_value():
+    df = pd.DataFrame({"user": ["a", "b", "a"], "value": [1, 2, 3]})
+    table = OnlineFeatureTable.from_dataframe(df, "user", "value")
+
+    assert len(table) == 2
+    assert table["a"] == 3
+    assert table["b"] == 2
+    assert "c" not in table
+
+
+@pytest.mark.local
+def test_features_are_served_from_the_online_store(online_store_setup):
+    client, _ = online_store_setup
+    with mock.patch.object(
+        serving, "feature_df_with_entity", wraps=serving.feature_df_with_entity
+    ) as read_source:
+        first = client.features([("balance", "online")], {"user": "a"})
+        second = client.features([("balance", "online")], {"user": "b"})
+
+    assert first.tolist() == [3.0]
+    assert second.tolist() == [2.0]
+    assert read_source.call_count == 1
+
+
+@pytest.mark.local
+def test_online_store_is_rebuilt_when_source_changes(online_store_setup):
+    client, source_file = online_store_setup
+    assert client.features([("balance", "online")], {"user": "a"}).tolist() == [3.0]
+
+    time.sleep(0.01)
+    pd.DataFrame({"user": ["a"], "balance": [10.0]}).to_csv(source_file, index=False)
+
+    assert client.features([("balance", "online")], {"user": "a"}).tolist() == [10.0]
+    with pytest.raises(Exception, match="No matching entities"):
+        client.features([("balance", "online")], {"user": "b"})
+
+
+def test_online_table_take_fills_missing_entities():
+    df = pd.DataFrame({"user": ["a", "b"], "value": [1, 2]})
+    table = OnlineFeatureTable.from_dataframe(df, "user", "value")
+
+    assert table.take(["b", "a"]).tolist() == [2, 1]
+    values = table.take(["a", "c"])
+    assert values[0] == 1.0 and np.isnan(values[1])
+
+
+@pytest.mark.local
+def test_features_batch(online_store_setup):
+    client, _ = online_store_setup
+    values = client.features_batch(
+        [("balance", "online"), ("balance", "online")], {"user": ["b", "a", "b"]}
+    )
+
+    assert values.shape == (3, 2)
+    assert values.tolist() == [[2.0, 2.0], [3.0, 3.0], [2.0, 2.0]]
+
+
+def test_hosted_features_batch_pipelines_requests():
+    class FakeFuture:
+        def __init__(self, value):
+            self._value = value
+
+        def result(self):
+            resp = serving_pb2.FeatureRow()
+            resp.values.add().double_value = self._value
+            return resp
+
+    class FakeFeatureServe:
+        def __init__(self):
+            self.requests = []
+
+        def future(self, req):
+            self.requests.append(req)
+            return FakeFuture(float(req.entities[0].value))
+
+    impl = HostedClientImpl.__new__(HostedClientImpl)
+    impl._stub = mock.Mock()
+    impl._stub.FeatureServe = FakeFeatureServe()
+    impl.MAX_IN_FLIGHT_REQUESTS = 2
+
+    values = impl.features_batch([("f", "v")], {"user": ["1", "2", "3"]})
+
+    assert values.tolist() == [[1.0], [2.0], [3.0]]
+    assert len(impl._stub.FeatureServe.requests) == 3
@@ -5,6 +5,7 @@ import pytest
 import numpy as np
 
 import featureform as ff
+from featureform.ondemand_cache import OnDemandFunctionCache, ondemand_function_cache
 from featureform.resources import OnDemandFeature, ResourceStatus
 
 
@@ -103,6 +104,40 @@ def test_serving_ondemand_precalculated_feature(features, entity, expected_outpu
     client.impl.db.close()  # TODO automatically do this
 
 
+@pytest.mark.local
+def test_ondemand_function_cache_is_keyed_by_code():
+    cache = OnDemandFunctionCache()
+    loads = []
+
+    def loader(serialized):
+        loads.append(serialized)
+        return lambda: serialized
+
+    assert cache.get("f", "v", b"code", loader)() == b"code"
+    assert cache.get("f", "v", b"code", loader)() == b"code"
+    assert cache.get("f", "v", b"changed", loader)() == b"changed"
+
+    assert loads == [b"code", b"changed"]
+    assert cache.stats() == {"hits": 1, "misses": 2, "size": 2}
+
+
+@pytest.mark.local
+def test_serving_ondemand_feature_skips_deserialization_on_repeat_calls():
+    register_resources()
+    client = ff.ServingClient(local=True)
+    ondemand_function_cache.clear()
+
+    for _ in range(3):
+        assert client.features([("pi", "default")], {"user": "C8837983"}).tolist() == [
+            3.141592653589793
+        ]
+
+    assert ondemand_function_cache.stats()["misses"] == 1
+    assert ondemand_function_cache.stats()["hits"] == 2
+
+    client.impl.db.close()
+
+
 def register_resources():
     ff.register_user("featureformer").make_default_owner()
 
@@ -0,0 +1,96 @@
+import os
+import shutil
+import stat
+from unittest import mock
+
+import pytest
+from featureform.local_sql import provider_sql_engine
+from featureform.sqlite_metadata import SQLiteMetadata
+
+
+@pytest.fixture(scope="function")
+def db():
+    db = SQLiteMetadata()
+    db.insert("feature_computation_mode", "feature", "v1", "PRECOMPUTED", 0)
+    yield db
+    db.close()
+    shutil.rmtree(".featureform", onerror=del_rw)
+
+
+def del_rw(action, name, exc):
+    if os.path.exists(name):
+        os.chmod(name, stat.S_IWRITE)
+        os.remove(name)
+
+
+def block_sqlite(db):
+    conn = mock.Mock(wraps=db._SQLiteMetadata__conn)
+    db._SQLiteMetadata__conn = conn
+    return conn
+
+
+@pytest.mark.local
+def test_warm_reads_do_not_query_sqlite(db):
+    assert db.get_feature_variant_mode("feature", "v1") == "PRECOMPUTED"
+    conn = block_sqlite(db)
+
+    for _ in range(3):
+        assert db.get_feature_variant_mode("feature", "v1") == "PRECOMPUTED"
+    assert conn.execute.call_count == 0
+
+
+@pytest.mark.local
+def test_bumping_the_version_invalidates_the_snapshot(db):
+    assert db.get_feature_variant_mode("feature", "v1") == "PRECOMPUTED"
+    conn = block_sqlite(db)
+
+    SQLiteMetadata.bump_version()
+
+    assert db.get_feature_variant_mode("feature", "v1") == "PRECOMPUTED"
+    assert conn.execute.call_count == 1
+
+
+@pytest.mark.local
+def test_writes_from_another_connection_are_visible(db):
+    assert db.get_feature_variant_on_demand("feature", "v1") is False
+
+    other = SQLiteMetadata()
+    other._SQLiteMetadata__conn.execute(
+        "UPDATE feature_computation_mode SET is_on_demand=1 WHERE name='feature'"
+    )
+    other._SQLiteMetadata__conn.commit()
+    other.close()
+
+    assert db.get_feature_variant_on_demand("feature", "v1") is True
+
+
+@pytest.mark.local
+def test_missing_resources_are_not_cached(db):
+    with pytest.raises(ValueError):
+        db.get_training_set_variant("missing", "v1")
+    db.insert(
+        "training_set_variant", "", "", "missing", "", "v1", "label", "v1", "ready"
+    )
+    assert db.get_training_set_variant("missing", "v1")["label_name"] == "label"
+
+
+@pytest.mark.local
+def test_provider_sql_engines_are_read_from_the_snapshot(db):
+    config = '{"SQLEngine": "duckdb"}'
+    db.insert(
+        "providers",
+        "local",
+        "Provider",
+        "",
+        "LOCAL",
+        "",
+        "",
+        "sources",
+        "ready",
+        config,
+    )
+    assert provider_sql_engine(db, "local") == "duckdb"
+    conn = block_sqlite(db)
+
+    assert provider_sql_engine(db, "local") == "duckdb"
+    assert conn.execute.call_count == 0
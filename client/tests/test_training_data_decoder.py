@@ -0,0 +1,63 @@
+import numpy as np
+import pyarrow as pa
+from featureform.proto import serving_pb2
+from featureform.serving import Stream
+from featureform.training_data_decoder import TrainingDataDecoder
+
+
+def proto_row(i):
+    row = serving_pb2.TrainingDataRow()
+    row.features.add().float_value = i * 0.5
+    row.features.add().int64_value = i
+    row.features.add().str_value = f"user_{i}"
+    row.label.bool_value = i % 2 == 1
+    return row
+
+
+def test_columns_are_typed_from_the_first_row():
+    chunks = list(TrainingDataDecoder(4).chunks(proto_row(i) for i in range(10)))
+
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    assert [column.dtype for column in chunks[0].columns] == [
+        np.float32,
+        np.int64,
+        object,
+        np.bool_,
+    ]
+    np.testing.assert_array_equal(chunks[2].features()[1], [8, 9])
+    np.testing.assert_array_equal(chunks[0].label(), [False, True, False, True])
+    assert chunks[0].features()[2].tolist() == ["user_0", "user_1", "user_2", "user_3"]
+
+
+def test_values_of_another_type_widen_the_column():
+    rows = [proto_row(i) for i in range(3)]
+    rows[2].features[1].str_value = "unknown"
+
+    chunk = TrainingDataDecoder().decode(rows, 3)
+
+    assert chunk.features()[1].dtype == object
+    assert chunk.features()[1].tolist() == [0, 1, "unknown"]
+    assert chunk.features()[0].dtype == np.float32
+
+
+def test_chunks_convert_to_arrays_and_record_batches():
+    chunk = TrainingDataDecoder().decode([proto_row(i) for i in range(2)], 2)
+
+    assert chunk.to_numpy().tolist() == [
+        [0.0, 0, "user_0", False],
+        [0.5, 1, "user_1", True],
+    ]
+    batch = chunk.to_arrow()
+    assert batch.schema.names == ["feature_0", "feature_1", "feature_2", "label"]
+    assert batch.schema.field("feature_0").type == pa.float32()
+    assert batch.schema.field("label").type == pa.bool_()
+
+
+def test_stream_exposes_chunks():
+    class FakeStub:
+        def TrainingData(self, req):
+            return iter([proto_row(i) for i in range(5)])
+
+    chunks = list(Stream(FakeStub(), "name", "variant").chunks(chunk_size=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
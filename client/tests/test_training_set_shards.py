@@ -0,0 +1,237 @@
+import functools
+import os
+import pickle
+import shutil
+import stat
+
+import featureform as ff
+import pandas as pd
+import pytest
+from featureform.proto import serving_pb2
+from featureform.serving import HostedClientImpl, check_shard, shard_bounds
+from featureform.training_adapters import (
+    ShardedTrainingSet,
+    combine_shards,
+    peek_first_pass,
+)
+from featureform.training_set_spool import TrainingSetSpool
+
+
+def proto_row(i):
+    row = serving_pb2.TrainingDataRow()
+    row.features.add().int64_value = i
+    row.label.bool_value = i % 2 == 0
+    return row
+
+
+class FakeStub:
+    def TrainingData(self, req):
+        return iter([proto_row(i) for i in range(10)])
+
+
+@pytest.fixture
+def hosted_client(tmp_path):
+    client = HostedClientImpl.__new__(HostedClientImpl)
+    client._stub = FakeStub()
+    client._spool = TrainingSetSpool(str(tmp_path))
+    return client
+
+
+def first_features(dataset):
+    return [int(row.features()[0][0]) for row in dataset]
+
+
+def test_shard_bounds_cover_every_row_once():
+    bounds = [shard_bounds(10, i, 3) for i in range(3)]
+
+    assert bounds == [(0, 3), (3, 6), (6, 10)]
+
+
+@pytest.mark.parametrize("shard_index, num_shards", [(2, 2), (-1, 2), (0, 0)])
+def test_invalid_shards_are_rejected(shard_index, num_shards):
+    with pytest.raises(ValueError):
+        check_shard(shard_index, num_shards)
+
+
+def test_combined_shards_are_disjoint():
+    shards = {
+        combine_shards(combine_shards((user, 2), (rank, 3)), (worker, 2))
+        for user in range(2)
+        for rank in range(3)
+        for worker in range(2)
+    }
+
+    assert shards == {(i, 12) for i in range(12)}
+
+
+def test_hosted_shards_interleave_rows(hosted_client):
+    shards = [
+        first_features(
+            hosted_client.training_set("fraud", "v1", False, None, False, i, 3)
+        )
+        for i in range(3)
+    ]
+
+    assert shards == [[0, 3, 6, 9], [1, 4, 7], [2, 5, 8]]
+
+
+def test_hosted_shards_restart_on_the_same_rows(hosted_client):
+    dataset = hosted_client.training_set("fraud", "v1", False, None, False, 1, 2)
+
+    assert first_features(dataset.repeat(1)) == [1, 3, 5, 7, 9] * 2
+
+
+def test_hosted_shards_are_spooled_separately(hosted_client):
+    for i in range(2):
+        list(hosted_client.training_set("fraud", "v1", False, None, True, i, 2))
+
+    spool = hosted_client._spool
+    assert not spool.exists("fraud", "v1")
+    assert spool.read("fraud", "v1", 0, 2)["feature_0"].tolist() == [0, 2, 4, 6, 8]
+    assert spool.read("fraud", "v1", 1, 2)["feature_0"].tolist() == [1, 3, 5, 7, 9]
+
+
+@pytest.fixture(scope="function")
+def local_training_set(tmp_path_factory):
+    source_file = tmp_path_factory.mktemp("test_inputs") / "users.csv"
+    pd.DataFrame(
+        {"user": [f"u{i}" for i in range(10)], "value": range(10), "label": range(10)}
+    ).to_csv(source_file, index=False)
+
+    ff.register_user("featureformer").make_default_owner()
+    local = ff.register_local()
+    users = local.register_file(name="users", variant="shards", path=str(source_file))
+    user = ff.register_entity("user")
+    users.register_resources(
+        entity=user,
+        entity_column="user",
+        inference_store=local,
+        features=[
+            {"name": "value", "variant": "shards", "column": "value", "type": "int"}
+        ],
+        labels=[
+            {"name": "label", "variant": "shards", "column": "label", "type": "int"}
+        ],
+    )
+    ff.register_training_set(
+        "users", "shards", label=("label", "shards"), features=[("value", "shards")]
+    )
+    ff.ResourceClient(local=True).apply()
+    client = ff.ServingClient(local=True)
+    yield client
+
+    client.impl.db.close()
+    ff.clear_state()
+    shutil.rmtree(".featureform", onerror=del_rw)
+
+
+def del_rw(action, name, exc):
+    if os.path.exists(name):
+        os.chmod(name, stat.S_IWRITE)
+        os.remove(name)
+
+
+@pytest.mark.local
+def test_local_shards_are_contiguous_row_ranges(local_training_set):
+    full = first_features(local_training_set.training_set("users", "shards"))
+    shards = [
+        first_features(
+            local_training_set.training_set(
+                "users", "shards", shard_index=i, num_shards=3
+            )
+        )
+        for i in range(3)
+    ]
+
+    assert sorted(full) == list(range(10))
+    assert shards == [full[0:3], full[3:6], full[6:10]]
+
+
+@pytest.mark.local
+def test_local_shard_arguments_are_validated(local_training_set):
+    with pytest.raises(ValueError):
+        local_training_set.training_set("users", "shards", shard_index=3, num_shards=3)
+
+
+class ShardClient:
+    created = 0
+
+    def __init__(self, spool_dir):
+        ShardClient.created += 1
+        self.client = HostedClientImpl.__new__(HostedClientImpl)
+        self.client._stub = FakeStub()
+        self.client._spool = TrainingSetSpool(spool_dir)
+
+    def training_set(self, name, variant, model=None, shard_index=0, num_shards=1):
+        return self.client.training_set(
+            name, variant, False, model, False, shard_index, num_shards
+        )
+
+
+def test_sharded_training_sets_build_their_client_per_process(tmp_path):
+    ShardClient.created = 0
+    dataset = ShardedTrainingSet(
+        functools.partial(ShardClient, str(tmp_path)), "fraud", "v1", num_shards=2
+    )
+
+    assert sorted(int(features[0]) for features, _ in dataset) == [0, 2, 4, 6, 8]
+    assert sorted(int(features[0]) for features, _ in dataset) == [0, 2, 4, 6, 8]
+    assert ShardClient.created == 1
+
+    unpickled = pickle.loads(pickle.dumps(dataset))
+    assert unpickled._client is None
+    assert [int(features[0]) for features, _ in unpickled] == [0, 2, 4, 6, 8]
+    assert ShardClient.created == 2
+
+
+def test_client_factories_must_be_callable(hosted_client):
+    with pytest.raises(TypeError):
+        ShardedTrainingSet(hosted_client, "fraud", "v1")
+
+
+def test_peeked_pass_is_the_first_epoch():
+    opened = []
+
+    def open_pass():
+        opened.append(True)
+        return iter(range(3))
+
+    first, passes = peek_first_pass(open_pass)
+
+    assert first == 0
+    assert list(passes()) == [0, 1, 2]
+    assert len(opened) == 1
+    assert list(passes()) == [0, 1, 2]
+    assert len(opened) == 2
+
+
+def test_torch_workers_read_disjoint_shards(tmp_path):
+    torch = pytest.importorskip("torch")
+    from featureform.training_adapters import TorchTrainingSet
+
+    dataset = TorchTrainingSet(
+        functools.partial(ShardClient, str(tmp_path)), "fraud", "v1"
+    )
+    loader = torch.utils.data.DataLoader(dataset, batch_size=None, num_workers=2)
+
+    assert sorted(int(features[0]) for features, _ in loader) == list(range(10))
+
+
+def test_tf_input_pipelines_read_disjoint_shards(tmp_path):
+    tf = pytest.importorskip("tensorflow")
+    from featureform.training_adapters import tf_training_set
+
+    rows = []
+    for pipeline in range(2):
+        context = tf.distribute.InputContext(
+            num_input_pipelines=2, input_pipeline_id=pipeline
+        )
+        dataset = tf_training_set(
+            functools.partial(ShardClient, str(tmp_path)),
+            "fraud",
+            "v1",
+            input_context=context,
+        )
+        rows += [int(features[0]) for features, _ in dataset]
+
+    assert sorted(rows) == list(range(10))
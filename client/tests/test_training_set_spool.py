@@ -0,0 +1,126 @@
+import gc
+import os
+
+import numpy as np
+import pytest
+from featureform.proto import serving_pb2
+from featureform.serving import HostedClientImpl, LocalShuffle
+from featureform.training_set_spool import TrainingSetSpool
+
+
+def proto_row(i):
+    row = serving_pb2.TrainingDataRow()
+    row.features.add().double_value = i * 0.5
+    row.features.add().str_value = f"user_{i}"
+    row.label.bool_value = i % 2 == 0
+    return row
+
+
+class FakeStub:
+    def __init__(self, num_rows):
+        self.num_rows = num_rows
+        self.requests = 0
+
+    def TrainingData(self, req):
+        self.requests += 1
+        return iter([proto_row(i) for i in range(self.num_rows)])
+
+
+@pytest.fixture
+def hosted_client(tmp_path):
+    client = HostedClientImpl.__new__(HostedClientImpl)
+    client._stub = FakeStub(5)
+    client._spool = TrainingSetSpool(str(tmp_path))
+    return client
+
+
+def test_epochs_after_the_first_read_the_spool(hosted_client):
+    dataset = hosted_client.training_set("fraud", "v1", False, spool=True)
+
+    rows = [row.to_numpy().tolist() for row in dataset.repeat(2)]
+
+    assert hosted_client._stub.requests == 1
+    assert len(rows) == 15
+    assert rows[:5] == rows[5:10] == rows[10:]
+    assert rows[1] == [0.5, "user_1", False]
+
+
+def test_batched_epochs_read_the_spool(hosted_client):
+    dataset = hosted_client.training_set("fraud", "v1", False, spool=True)
+
+    batches = list(dataset.repeat(1).batch(2))
+
+    assert hosted_client._stub.requests == 1
+    assert [len(batch) for batch in batches] == [2, 2, 2, 2, 2]
+    np.testing.assert_array_equal(batches[2].label(), [True, True])
+    np.testing.assert_array_equal(batches[3].features()[:, 0], [0.5, 1.0])
+
+
+def test_later_training_sets_are_served_locally(hosted_client):
+    list(hosted_client.training_set("fraud", "v1", False, spool=True))
+
+    df = hosted_client._spool.read("fraud", "v1")
+    assert df.columns.tolist() == ["feature_0", "feature_1", "label"]
+    assert df["label"].dtype == bool
+
+    dataset = hosted_client.training_set("fraud", "v1", False, spool=True)
+    assert isinstance(dataset.shuffle(10)._stream, LocalShuffle)
+    assert sorted(row.features()[0][1] for row in dataset) == [
+        f"user_{i}" for i in range(5)
+    ]
+    assert hosted_client._stub.requests == 1
+
+
+def test_partial_passes_are_not_spooled(hosted_client):
+    dataset = hosted_client.training_set("fraud", "v1", False, spool=True)
+    next(dataset)
+
+    assert not hosted_client._spool.exists("fraud", "v1")
+    hosted_client.training_set("fraud", "v1", False)
+    assert hosted_client._stub.requests == 2
+
+
+def spooled_frame(spool, batches):
+    writer = spool.writer("fraud", "v1")
+    for columns in batches:
+        writer.add_columns(columns)
+    assert writer.close()
+    return spool.read("fraud", "v1")
+
+
+def test_later_rows_widen_the_spooled_schema(tmp_path):
+    spool = TrainingSetSpool(str(tmp_path))
+
+    df = spooled_frame(
+        spool,
+        [
+            [np.array([None, None], dtype=object), np.array([1, 2])],
+            [np.array([0.5, 1.5]), np.array([3.5, 4.0])],
+        ],
+    )
+
+    assert df["feature_0"].tolist()[2:] == [0.5, 1.5]
+    assert df["feature_0"].isna().sum() == 2
+    assert df["label"].tolist() == [1.0, 2.0, 3.5, 4.0]
+
+
+def test_rows_that_cannot_be_spooled_stop_the_spool(tmp_path):
+    spool = TrainingSetSpool(str(tmp_path))
+    writer = spool.writer("fraud", "v1")
+    writer.add_columns([np.array([1.0]), np.array([1])])
+    writer.add_columns([np.array([{"a": 1}], dtype=object), np.array([2])])
+
+    assert not writer.close()
+    assert not spool.exists("fraud", "v1")
+    assert os.listdir(tmp_path) == []
+
+
+def test_abandoned_passes_leave_no_temporary_files(hosted_client, tmp_path):
+    dataset = hosted_client.training_set("fraud", "v1", False, spool=True).batch(2)
+    next(dataset)
+    assert len(os.listdir(tmp_path)) == 1
+
+    del dataset
+    gc.collect()
+
+    assert os.listdir(tmp_path) == []